@@ -15,6 +15,15 @@ from src.trading_strategies import (
     VolatilityBreakoutStrategy, PercentageStrategy, CombinedStrategy,
     find_best_k_and_coin
 )
+from src.candle_history import fetch_candle_history
+from src.candle_store import CandleStore
+from src.param_sweep import DEFAULT_GRIDS, insensitive_grids, run_sweep
+from src.walk_forward import walk_forward, summarize
+from src.dca_kernel import backtest_percentage
+from src.streaming_backtest import export_columns, stream_backtest
+from src.portfolio_backtest import backtest_portfolio
+from src.result_cache import ResultCache, cached_backtest_stats, data_fingerprint
+from src import robustness
 
 def parse_args():
     """명령행 인자 파싱"""
@@ -27,7 +36,38 @@ def parse_args():
     parser.add_argument("--initial-capital", type=int, default=1000000, help="초기 자본금 (원)")
     parser.add_argument("--find-best", action="store_true", help="최적의 코인과 K값 찾기")
     parser.add_argument("--k", type=float, default=0.5, help="변동성 돌파 전략의 K값 (0.1~0.9)")
+    parser.add_argument("--k-step", type=float, default=None, help="최적 K값 탐색 간격 (예: 0.01, 기본값: 0.5~0.9를 0.1 간격)")
+    parser.add_argument("--fee", type=float, default=0.0, help="최적 K값 탐색 시 매수/매도 수수료율 (예: 0.0005)")
+    parser.add_argument("--compound", action="store_true", help="최적 K값 탐색 시 수익률을 복리로 누적")
     parser.add_argument("--compare-all", action="store_true", help="모든 전략 비교")
+    parser.add_argument("--store", type=str, default="data/candles.db", help="로컬 캔들 저장소 경로")
+    parser.add_argument("--no-store", action="store_true", help="로컬 캔들 저장소를 사용하지 않고 매번 새로 조회")
+    parser.add_argument("--sweep", action="store_true", help="선택한 전략의 파라미터 격자 전체를 병렬로 백테스트")
+    parser.add_argument("--sweep-markets", type=str, default=None,
+                       help="파라미터 탐색 마켓 (쉼표로 구분, 'all'이면 전체 원화 마켓, 기본값: --market)")
+    parser.add_argument("--workers", type=int, default=None, help="파라미터 탐색 워커 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument("--top", type=int, default=20, help="파라미터 탐색 결과 중 출력할 상위 개수")
+    parser.add_argument("--walk-forward", action="store_true", help="학습/검증 구간을 이동하며 최적화하는 워크포워드 검증")
+    parser.add_argument("--train-days", type=int, default=14, help="워크포워드 학습 구간 (일)")
+    parser.add_argument("--test-days", type=int, default=7, help="워크포워드 검증 구간 (일)")
+    parser.add_argument("--anchored", action="store_true", help="워크포워드 학습 구간 시작을 처음 캔들에 고정")
+    parser.add_argument("--stream", action="store_true", help="저장소 캔들을 컬럼 파일로 내보내 구간별로 백테스트 (긴 분봉 기간용)")
+    parser.add_argument("--stream-unit", type=int, default=1, help="스트리밍 백테스트 분봉 단위 (분)")
+    parser.add_argument("--chunk-size", type=int, default=500000, help="스트리밍 백테스트 구간 크기 (캔들 수)")
+    parser.add_argument("--portfolio", type=str, default=None,
+                        help="하나의 원화 잔액으로 여러 마켓을 함께 백테스트 (쉼표로 구분, 'all'이면 전체 원화 마켓)")
+    parser.add_argument("--buy-amount-pct", type=float, default=0.3, help="포트폴리오 백테스트 매수 비율 (원화 잔액 대비)")
+    parser.add_argument("--trade-fee", type=float, default=0.0005, help="포트폴리오 백테스트 매수/매도 수수료율")
+    parser.add_argument("--cache", type=str, default="data/results.db", help="백테스트 결과 캐시 경로 (전략 비교, 파라미터 탐색)")
+    parser.add_argument("--no-cache", action="store_true", help="백테스트 결과 캐시를 사용하지 않음")
+    parser.add_argument("--cache-size", type=int, default=64, help="백테스트 결과 캐시 최대 크기 (MB)")
+    parser.add_argument("--robustness", action="store_true", help="가격 경로를 여러 개 만들어 전략의 수익률/낙폭/승률 분포 분석")
+    parser.add_argument("--paths", type=int, default=1000, help="강건성 분석 경로 수")
+    parser.add_argument("--method", type=str, choices=list(robustness.METHODS), default="bootstrap",
+                        help="강건성 분석 경로 생성 방법 (bootstrap: 블록 부트스트랩, start: 무작위 시작 시점)")
+    parser.add_argument("--block-days", type=int, default=1, help="블록 부트스트랩 블록 길이 (일)")
+    parser.add_argument("--window-days", type=int, default=None, help="강건성 분석 경로 길이 (일, 기본값: bootstrap은 전체, start는 절반)")
+    parser.add_argument("--seed", type=int, default=0, help="강건성 분석 난수 시드")
     
     return parser.parse_args()
 
@@ -60,6 +100,193 @@ def get_strategy(strategy_name, k=0.5):
     else:
         return "volatility_breakout"  # 문자열 반환 (내장 백테스트 로직 사용)
 
+def get_result_cache(args):
+    """백테스트 결과 캐시 (--no-cache면 None)"""
+    if args.no_cache:
+        return None
+    return ResultCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+
+def get_data_unit(strategy_name, days):
+    """전략에 맞는 캔들 단위와 개수"""
+    if strategy_name == "volatility" or strategy_name == "percentage":
+        # 일봉 데이터 가져오기 (변동성 돌파 전략용)
+        return 'day', days+1
+    # 15분 캔들 데이터 가져오기 (다른 전략용, 200개 제한 없이 페이지 단위 조회)
+    return 15, days*24*4
+
+def load_market_data(analyzer, market, unit, count, store_path, no_store=False):
+    """캔들 조회 후 전처리 및 지표 계산"""
+    if no_store:
+        candles = fetch_candle_history(market, unit=unit, count=count)
+    else:
+        # 로컬 저장소에 없는 캔들만 받아온 뒤 저장소에서 읽기
+        store = CandleStore(store_path)
+        store.sync(market, unit, count=count)
+        candles = store.get_candles(market, unit, count=count)
+    
+    df = analyzer.preprocess_candles(candles)
+    return analyzer.calculate_indicators(df)
+
+def sweep_parameters(args, api, analyzer):
+    """여러 마켓에 대해 전략 파라미터 격자를 병렬로 백테스트"""
+    if args.sweep_markets == "all":
+        markets = api.get_markets()
+    elif args.sweep_markets:
+        markets = [m.strip() for m in args.sweep_markets.split(",") if m.strip()]
+    else:
+        markets = [args.market]
+    
+    unit, count = get_data_unit(args.strategy, args.days)
+    frames = {}
+    for market in markets:
+        print(f"{market} 데이터 가져오는 중...")
+        df = load_market_data(analyzer, market, unit, count, args.store, args.no_store)
+        if len(df) > 0:
+            frames[market] = df
+    
+    grids = {args.strategy: DEFAULT_GRIDS[args.strategy]}
+    
+    def progress(done, total, result):
+        if done % 100 == 0 or done == total:
+            print(f"진행: {done}/{total}")
+    
+    print(f"{args.strategy} 전략 파라미터 탐색 중... (마켓 {len(frames)}개)")
+    cache = get_result_cache(args)
+    results_df = run_sweep(frames, grids, args.initial_capital, max_workers=args.workers, progress=progress, cache=cache)
+    if cache is not None:
+        print(f"캐시 사용: {cache.hits}개, 새로 계산: {cache.misses}개")
+    
+    print("\n===== 파라미터 탐색 결과 =====")
+    print(results_df.head(args.top).to_string())
+    for market, strategy in insensitive_grids(results_df):
+        print(f"⚠️ {market} {strategy}: 모든 파라미터 조합의 결과가 같습니다. 파라미터가 백테스트에 반영되는지 확인하세요.")
+    print("========================\n")
+    
+    results_df.to_csv(f'sweep_{args.strategy}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv', index=False)
+    return results_df
+
+def run_walk_forward(args, df):
+    """워크포워드 검증 실행 및 결과 출력"""
+    unit, _ = get_data_unit(args.strategy, args.days)
+    bars_per_day = 1 if unit == 'day' else 24 * 60 // unit
+    
+    print(f"{args.strategy} 전략 워크포워드 검증 중... (학습 {args.train_days}일, 검증 {args.test_days}일)")
+    result = walk_forward(
+        df, args.strategy,
+        train_size=args.train_days * bars_per_day,
+        test_size=args.test_days * bars_per_day,
+        anchored=args.anchored,
+        initial_capital=args.initial_capital,
+        max_workers=args.workers,
+    )
+    if result.empty:
+        print("데이터가 학습/검증 구간보다 짧습니다. --days를 늘려주세요.")
+        return result
+    
+    summary = summarize(result)
+    print("\n===== 워크포워드 결과 =====")
+    print(result.to_string())
+    print(f"구간 수: {summary['folds']}, 수익 구간: {summary['positive_folds']}")
+    print(f"검증 구간 누적 수익률: {summary['oos_return']:.2f}%")
+    print(f"검증 구간 평균 수익률: {summary['mean_test_return']:.2f}%")
+    print("========================\n")
+    
+    result.to_csv(f'walk_forward_{args.strategy}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv', index=False)
+    return result
+
+def run_portfolio_backtest(args, api, analyzer):
+    """여러 마켓이 원화 잔액을 나눠 쓰는 포트폴리오 백테스트"""
+    if args.portfolio == "all":
+        markets = api.get_markets()
+    else:
+        markets = [m.strip() for m in args.portfolio.split(",") if m.strip()]
+    
+    unit, count = get_data_unit(args.strategy, args.days)
+    frames = {}
+    for market in markets:
+        print(f"{market} 데이터 가져오는 중...")
+        df = load_market_data(analyzer, market, unit, count, args.store, args.no_store)
+        if len(df) > 0:
+            frames[market] = df
+    
+    print(f"{args.strategy} 전략 포트폴리오 백테스팅 중... (마켓 {len(frames)}개)")
+    curve, trades, stats = backtest_portfolio(
+        frames, get_strategy(args.strategy, args.k), args.initial_capital,
+        buy_amount_pct=args.buy_amount_pct, fee=args.trade_fee,
+    )
+    
+    print("\n===== 포트폴리오 백테스트 결과 =====")
+    print(f"마켓 수: {stats['markets']}")
+    print(f"초기 자본: {stats['initial_capital']:,.0f}원")
+    print(f"최종 자본: {stats['final_capital']:,.0f}원")
+    print(f"총 수익률: {stats['total_return']:.2f}%")
+    print(f"최대 낙폭: {stats['max_drawdown']:.2f}%")
+    print(f"매수 횟수: {stats['buy_count']}, 매도 횟수: {stats['sell_count']}")
+    if stats['win_rate'] is not None:
+        print(f"승률: {stats['win_rate']:.2f}%")
+    print("========================\n")
+    
+    suffix = f'{args.strategy}_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    curve.to_csv(f'portfolio_equity_{suffix}.csv')
+    trades.to_csv(f'portfolio_trades_{suffix}.csv', index=False)
+    return stats
+
+def run_stream_backtest(args):
+    """저장소 캔들을 메모리 맵 컬럼 파일로 내보낸 뒤 구간별 스트리밍 백테스트"""
+    count = args.days * 24 * 60 // args.stream_unit
+    store = CandleStore(args.store)
+    print(f"{args.market} {args.stream_unit}분봉 {count}개 동기화 중...")
+    store.sync(args.market, args.stream_unit, count=count)
+    
+    directory = os.path.join(os.path.dirname(args.store) or ".", "columns", f"{args.market}_{args.stream_unit}")
+    exported = export_columns(store, args.market, args.stream_unit, directory)
+    print(f"컬럼 파일 내보내기 완료: {directory} (캔들 {exported}개)")
+    
+    strategy = get_strategy(args.strategy, args.k)
+    stats = stream_backtest(directory, strategy, args.initial_capital, chunk_size=args.chunk_size)
+    
+    print("\n===== 스트리밍 백테스트 결과 =====")
+    print(f"초기 자본: {stats['initial_capital']:,.0f}원")
+    print(f"최종 자본: {stats['final_capital']:,.0f}원")
+    print(f"총 수익률: {stats['total_return']:.2f}%")
+    print(f"매수 횟수: {stats['buy_count']}, 매도 횟수: {stats['sell_count']}")
+    print("========================\n")
+    return stats
+
+def run_robustness_analysis(args, df):
+    """강건성(몬테카를로) 분석 실행 및 분포 출력"""
+    unit, _ = get_data_unit(args.strategy, args.days)
+    bars_per_day = 1 if unit == 'day' else 24 * 60 // unit
+    strategy = get_strategy(args.strategy, args.k)
+    
+    print(f"{args.strategy} 전략 강건성 분석 중... (경로 {args.paths}개, 방법: {args.method})")
+    result = robustness.run_robustness(
+        df, strategy,
+        n_paths=args.paths,
+        method=args.method,
+        length=args.window_days * bars_per_day if args.window_days else None,
+        block_size=args.block_days * bars_per_day,
+        initial_capital=args.initial_capital,
+        max_workers=args.workers,
+        seed=args.seed,
+    )
+    summary = robustness.summarize(result)
+    
+    print("\n===== 강건성 분석 결과 =====")
+    labels = {'total_return': '수익률', 'max_drawdown': '최대 낙폭', 'win_rate': '승률'}
+    for metric, label in labels.items():
+        dist = summary[metric]
+        if dist is None:
+            print(f"{label}: 거래 없음")
+            continue
+        print(f"{label}(%): 평균 {dist['mean']:.2f}, 표준편차 {dist['std']:.2f}, "
+              f"5% {dist['p5']:.2f}, 중앙값 {dist['p50']:.2f}, 95% {dist['p95']:.2f}")
+    print(f"손실 확률: {summary['loss_probability']:.1f}%")
+    print("========================\n")
+    
+    result.to_csv(f'robustness_{args.strategy}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv', index=False)
+    return result
+
 def plot_backtest_results(df, results, stats, strategy_name):
     """백테스팅 결과 시각화"""
     # 결과 및 원본 데이터 합치기
@@ -110,14 +337,17 @@ def plot_backtest_results(df, results, stats, strategy_name):
     print(f"총 수익률: {stats['total_return']:.2f}%")
     print(f"매수 횟수: {stats['buy_count']}")
     print(f"매도 횟수: {stats['sell_count']}")
+    if stats['win_rate'] is not None:
+        print(f"승률: {stats['win_rate']:.2f}%")
+    print(f"최대 낙폭: {stats['max_drawdown']:.2f}%")
     print("========================\n")
     
     plt.savefig(f'backtest_{strategy_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png')
     plt.show()
 
-def compare_strategies(df, initial_capital=1000000, k=0.5):
-    """여러 전략 백테스팅 및 비교"""
-    analyzer = DataAnalyzer()
+def compare_strategies(df, initial_capital=1000000, k=0.5, cache=None):
+    """여러 전략 백테스팅 및 비교 (cache가 있으면 같은 데이터/전략의 저장된 결과 사용)"""
+    fingerprint = data_fingerprint(df) if cache is not None else None
     strategies = {
         "MA Cross": MACrossStrategy(),
         "RSI": RSIStrategy(),
@@ -131,7 +361,7 @@ def compare_strategies(df, initial_capital=1000000, k=0.5):
     results = {}
     
     for name, strategy in strategies.items():
-        backtest_results, stats = analyzer.backtest_strategy(df, strategy, initial_capital)
+        stats = cached_backtest_stats(cache, df, strategy, initial_capital, fingerprint)
         results[name] = {
             'return': stats['total_return'],
             'trades': stats['buy_count'],
@@ -202,31 +432,50 @@ def main():
                 "KRW-BTC", "KRW-ETH", "KRW-XRP", "KRW-BCH", "KRW-EOS", 
                 "KRW-TRX", "KRW-ADA", "KRW-LTC", "KRW-LINK", "KRW-DOT"
             ]
-            best_coin, best_k, best_profit = find_best_k_and_coin(api, coins, days=args.days)
+            best_coin, best_k, best_profit = find_best_k_and_coin(
+                api, coins, days=args.days, k_step=args.k_step, fee=args.fee, compound=args.compound
+            )
             print(f"최적의 코인: {best_coin}, K값: {best_k}, 수익률: {best_profit:.2f}")
             
             # 최적의 코인으로 설정
             args.market = best_coin
             args.k = best_k
         
+        # 파라미터 격자 탐색
+        if args.sweep:
+            sweep_parameters(args, api, analyzer)
+            return
+        
+        # 여러 마켓 포트폴리오 백테스트
+        if args.portfolio:
+            run_portfolio_backtest(args, api, analyzer)
+            return
+        
+        # 저장소 전체 기간 스트리밍 백테스트
+        if args.stream:
+            run_stream_backtest(args)
+            return
+        
         # 데이터 가져오기
         print(f"{args.market} 데이터 가져오는 중...")
-        if args.strategy == "volatility" or args.strategy == "percentage":
-            # 일봉 데이터 가져오기 (변동성 돌파 전략용)
-            candles = api.get_day_candles(args.market, count=args.days+1)
-        else:
-            # 15분 캔들 데이터 가져오기 (다른 전략용)
-            candles = api.get_minute_candles(args.market, unit=15, count=min(args.days*24*4, 200))
+        unit, count = get_data_unit(args.strategy, args.days)
+        
+        # 데이터 전처리 및 지표 계산
+        df = load_market_data(analyzer, args.market, unit, count, args.store, args.no_store)
         
-        # 데이터 전처리
-        df = analyzer.preprocess_candles(candles)
+        # 워크포워드 검증
+        if args.walk_forward:
+            run_walk_forward(args, df)
+            return
         
-        # 지표 계산
-        df = analyzer.calculate_indicators(df)
+        # 강건성 분석
+        if args.robustness:
+            run_robustness_analysis(args, df)
+            return
         
         # 모든 전략 비교
         if args.compare_all:
-            compare_strategies(df, args.initial_capital, args.k)
+            compare_strategies(df, args.initial_capital, args.k, cache=get_result_cache(args))
             return
         
         # 전략 생성
@@ -236,6 +485,12 @@ def main():
         print(f"{args.strategy} 전략 백테스팅 중...")
         results, stats = analyzer.backtest_strategy(df, strategy, args.initial_capital)
         
+        if args.strategy == "percentage":
+            # 평균 매수가/추가 매수/수수료를 반영한 분할 매수 시뮬레이션
+            _, dca_stats = backtest_percentage(df, strategy, args.initial_capital)
+            print(f"분할 매수 시뮬레이션 수익률: {dca_stats['total_return']:.2f}% "
+                  f"(매수 {dca_stats['buy_count']}회, 추가 매수 {dca_stats['add_count']}회, 매도 {dca_stats['sell_count']}회)")
+        
         # 결과 시각화
         plot_backtest_results(df, results, stats, args.strategy)
         
@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_analyzer import DataAnalyzer
+from src.backtest_engine import backtest_stats
+from src.dca_kernel import HAS_NUMBA, backtest_percentage
+from src.indicator_engine import IncrementalIndicators
+from src.trading_strategies import CombinedStrategy, MACrossStrategy, PercentageStrategy, RSIStrategy
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Backtest Kernel Benchmark")
+    parser.add_argument("--bars", type=int, default=1000000, help="합성 1분봉 개수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 결과 사용)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    
+    return parser.parse_args()
+
+def make_candles(bars, seed=0):
+    """랜덤워크 합성 1분봉 데이터프레임"""
+    rng = np.random.default_rng(seed)
+    close = 50000000 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    opening = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, bars))
+    return pd.DataFrame({
+        'opening_price': opening,
+        'high_price': np.maximum(opening, close) * (1 + spread),
+        'low_price': np.minimum(opening, close) * (1 - spread),
+        'trade_price': close,
+        'datetime': pd.date_range('2024-01-01 09:00', periods=bars, freq='min'),
+    })
+
+def measure(func, repeat):
+    """가장 빠른 실행 시간 (초)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(name, bars, seconds):
+    print(f"{name:<32} {seconds * 1000:>9.1f}ms {bars / seconds / 1e6:>8.2f}M bars/s")
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+    df = make_candles(args.bars, args.seed)
+    analyzer = DataAnalyzer()
+    
+    print(f"합성 1분봉 {args.bars:,}개, numba: {'사용' if HAS_NUMBA else '없음 (순수 파이썬)'}")
+    print("\n===== 벤치마크 결과 =====")
+    
+    seconds = measure(lambda: analyzer.calculate_indicators(df.copy()), args.repeat)
+    report("지표 계산 (calculate_indicators)", args.bars, seconds)
+    indicators = analyzer.calculate_indicators(df.copy())
+    
+    for name, strategy in [("MA Cross", MACrossStrategy), ("RSI", RSIStrategy), ("Combined", CombinedStrategy)]:
+        seconds = measure(lambda: backtest_stats(indicators, strategy()), args.repeat)
+        report(f"벡터화 백테스트 ({name})", args.bars, seconds)
+    
+    # 첫 실행은 numba 컴파일 시간이 포함되므로 미리 한 번 실행
+    backtest_percentage(df.iloc[:1000], PercentageStrategy())
+    seconds = measure(lambda: backtest_percentage(df, PercentageStrategy(buy_pct=0.02, sell_pct=0.01)), args.repeat)
+    report("DCA 커널 (Percentage)", args.bars, seconds)
+    
+    updates = min(args.bars, 100000)
+    candles = df.iloc[:updates].to_dict('records')
+    
+    def incremental():
+        engine = IncrementalIndicators()
+        for candle in candles:
+            engine.update(candle, key=candle['datetime'])
+    
+    seconds = measure(incremental, 1)
+    report("증분 지표 (IncrementalIndicators)", updates, seconds)
+    print("========================\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import random
+import time
+
+from src.async_upbit_api import AsyncUpbitAPI
+from src.mock_upbit_server import MockUpbitServer, DEFAULT_PRICES
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Upbit API Load Test (Mock Server)")
+    parser.add_argument("--url", type=str, help="대상 서버 주소 (생략하면 모의 서버를 내부에서 실행)")
+    parser.add_argument("--duration", type=float, default=10.0, help="테스트 시간 (초)")
+    parser.add_argument("--workers", type=int, default=20, help="동시 요청 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="모의 서버 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="모의 서버 추가 랜덤 지연 (초)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="모의 서버 429 응답 비율")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="모의 서버 5xx 응답 비율")
+    
+    return parser.parse_args()
+
+async def run_load(url, duration, workers):
+    """시세 조회 API에 동시 요청을 보내고 결과 반환"""
+    markets = list(DEFAULT_PRICES)
+    deadline = time.monotonic() + duration
+    counts = {'ok': 0, 'error': 0}
+    
+    async with AsyncUpbitAPI(base_url=url, max_concurrency=workers, pool_size=workers) as api:
+        calls = [
+            lambda m: api.get_ticker(m),
+            lambda m: api.get_orderbook(m),
+            lambda m: api.get_minute_candles(m, unit=15, count=200),
+            lambda m: api.get_day_candles(m, count=30),
+        ]
+        
+        async def worker():
+            while time.monotonic() < deadline:
+                try:
+                    result = await random.choice(calls)(random.choice(markets))
+                    counts['error' if isinstance(result, dict) and 'error' in result else 'ok'] += 1
+                except Exception:
+                    counts['error'] += 1
+        
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return counts, api.get_latency_stats()
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+    
+    server = None
+    url = args.url
+    if url is None:
+        server = MockUpbitServer(latency=args.latency, jitter=args.jitter,
+                                 error_429_rate=args.error_429, error_5xx_rate=args.error_5xx).start()
+        url = server.url
+    
+    try:
+        print(f"부하 테스트 중: {url} ({args.workers}개 동시 요청, {args.duration}초)")
+        counts, stats = asyncio.run(run_load(url, args.duration, args.workers))
+    finally:
+        if server is not None:
+            server.stop()
+    
+    total = counts['ok'] + counts['error']
+    print("\n===== 부하 테스트 결과 =====")
+    print(f"총 요청: {total} ({total / args.duration:.1f} req/s), 실패: {counts['error']}")
+    for endpoint, stat in stats.items():
+        print(f"{endpoint}: {stat['count']}회, 평균 {stat['mean'] * 1000:.1f}ms")
+        for upper, count in stat['buckets'].items():
+            if count:
+                print(f"    <= {upper * 1000:.0f}ms: {count}")
+    print("==========================\n")
+
+if __name__ == "__main__":
+    main()
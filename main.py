@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import time
@@ -14,6 +15,7 @@ from src.trading_strategies import (
     find_best_k_and_coin
 )
 from src.trading_bot import TradingBot
+from src.multi_market_bot import MultiMarketBot
 
 def setup_logger(name):
     """로거 설정"""
@@ -48,13 +50,18 @@ def parse_args():
     parser = argparse.ArgumentParser(description='Bitcoin Automated Trading Bot')
     parser.add_argument('--config', type=str, default='config/config.ini', help='설정 파일 경로')
     parser.add_argument('--market', type=str, help='거래 마켓 (예: KRW-BTC)')
+    parser.add_argument('--markets', type=str,
+                        help="여러 마켓을 한 프로세스에서 거래 (쉼표로 구분, 'all'이면 전체 원화 마켓)")
     parser.add_argument('--interval', type=int, help='거래 간격 (초)')
+    parser.add_argument('--event-driven', action='store_true',
+                        help='고정 간격 대신 캔들 마감/09:00 리셋/목표가 돌파 이벤트에 맞춰 평가')
     parser.add_argument('--strategy', type=str, 
                         choices=['ma', 'rsi', 'macd', 'bb', 'volatility', 'percentage', 'combined'], 
                         help='거래 전략 선택')
     parser.add_argument('--k', type=float, help='변동성 돌파 전략의 K값 (0.1~0.9)')
     parser.add_argument('--slack', type=str, help='슬랙 웹훅 URL')
     parser.add_argument('--find-best', action='store_true', help='최적의 코인과 K값 찾기')
+    parser.add_argument('--k-step', type=float, help='최적 K값 탐색 간격 (예: 0.01)')
     parser.add_argument('--backtest', action='store_true', help='백테스트 모드 (backtest.py 실행)')
     
     return parser.parse_args()
@@ -135,7 +142,7 @@ def main():
                 "KRW-BTC", "KRW-ETH", "KRW-XRP", "KRW-BCH", "KRW-EOS", 
                 "KRW-TRX", "KRW-ADA", "KRW-LTC", "KRW-LINK", "KRW-DOT"
             ]
-            best_coin, best_k, best_profit = find_best_k_and_coin(api, coins)
+            best_coin, best_k, best_profit = find_best_k_and_coin(api, coins, k_step=args.k_step)
             logger.info(f"최적의 코인: {best_coin}, K값: {best_k}, 수익률: {best_profit:.2f}")
             
             # 최적의 코인으로 설정
@@ -186,6 +193,26 @@ def main():
         dashboard_thread.daemon = True  # 메인 프로그램 종료시 같이 종료
         dashboard_thread.start()
         
+        # 여러 마켓 동시 거래 (하나의 이벤트 루프, 공유 원화 잔액)
+        markets = args.markets or config.get('TRADING', 'markets', fallback=None)
+        if markets:
+            if markets == 'all':
+                markets = api.get_markets()
+            else:
+                markets = [m.strip() for m in markets.split(',') if m.strip()]
+            
+            bot = MultiMarketBot(
+                access_key, secret_key,
+                markets=markets,
+                strategy=strategy_name,
+                strategy_params=strategy_params,
+                slack_webhook_url=slack_webhook_url
+            )
+            
+            logger.info(f"멀티 마켓 자동매매 봇 시작 - 마켓 {len(markets)}개, 전략: {strategy_name}, 간격: {interval}초")
+            asyncio.run(bot.run(interval=interval))
+            return
+        
         # 트레이딩 봇 생성 및 실행
         bot = TradingBot(
             access_key, secret_key, 
@@ -195,6 +222,12 @@ def main():
             slack_webhook_url=slack_webhook_url
         )
         
+        # 이벤트 방식 실행 (캔들 마감, 09:00 리셋, WebSocket 시세의 목표가 돌파 시에만 평가)
+        if args.event_driven or config.getboolean('TRADING', 'event_driven', fallback=False):
+            logger.info(f"비트코인 자동매매 봇 시작 (이벤트 방식) - 마켓: {market}, 전략: {strategy_name}")
+            bot.run_events()
+            return
+        
         logger.info(f"비트코인 자동매매 봇 시작 - 마켓: {market}, 전략: {strategy_name}, 간격: {interval}초")
         
         # 실제 트레이딩 실행
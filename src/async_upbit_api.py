@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import time
+
+import aiohttp
+
+from src.upbit_api import UpbitAPI, LatencyHistogram, DEFAULT_BASE_URL
+from src.rate_limiter import get_rate_limiter, parse_remaining_req
+
+
+class AsyncUpbitAPI:
+    """
+    UpbitAPI의 asyncio 버전
+    
+    메서드 구성은 UpbitAPI와 같고 모두 코루틴이다. 여러 마켓을 동시에 조회하는
+    *_many 메서드는 max_concurrency 이하로 요청을 동시에 실행하므로 전체 소요 시간이
+    요청 수의 합이 아니라 가장 느린 요청에 가까워진다. 요청 수 제한기는 동기
+    UpbitAPI와 공유한다.
+    """
+    
+    RETRY_STATUS_CODES = UpbitAPI.RETRY_STATUS_CODES
+    
+    # JWT 서명과 백오프 계산은 동기 클라이언트와 동일
+    _get_headers = UpbitAPI._get_headers
+    backoff = UpbitAPI.backoff
+    
+    def __init__(self, access_key=None, secret_key=None, max_concurrency=10, pool_size=20,
+                 timeout=(3.05, 10), max_retries=3, backoff_factor=0.5, max_backoff=8.0, base_url=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.base_url = base_url or os.environ.get('UPBIT_API_URL', DEFAULT_BASE_URL)
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout  # (연결 타임아웃, 읽기 타임아웃)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.latency = LatencyHistogram()
+        self._session = None
+        self._semaphore = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self):
+        # aiohttp 세션은 실행 중인 이벤트 루프 안에서 만들어야 하므로 지연 생성
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    async def close(self):
+        """세션 종료"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _request(self, method, path, endpoint=None, params=None, body=None, auth=False,
+                       idempotent=True, group=None):
+        """
+        비동기 API 요청 후 JSON 응답 반환
+        
+        재시도 및 요청 수 제한 규칙은 UpbitAPI._request와 같다.
+        """
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        endpoint = endpoint or path
+        retries = self.max_retries if idempotent else 0
+        limiter = get_rate_limiter(group or ('exchange' if auth else 'quotation'))
+        
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                wait = limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                
+                # nonce가 재사용되지 않도록 시도마다 새 토큰 발급
+                headers = self._get_headers(params or body) if auth else None
+                start = time.perf_counter()
+                try:
+                    async with session.request(method, url, params=params, json=body, headers=headers) as response:
+                        status = response.status
+                        remaining = parse_remaining_req(response.headers.get('Remaining-Req')).get('sec')
+                        text = await response.text()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    self.latency.observe(endpoint, time.perf_counter() - start)
+                    if attempt >= retries:
+                        raise
+                    await asyncio.sleep(self.backoff(attempt))
+                    continue
+                
+                self.latency.observe(endpoint, time.perf_counter() - start)
+                
+                # 서버가 알려준 남은 요청 수로 제한기 보정
+                if remaining is not None:
+                    limiter.update_remaining(remaining)
+                if status == 429:
+                    limiter.penalize()
+                
+                # 429/5xx는 본문이 JSON이 아닐 수 있으므로(502 HTML 등) 파싱 전에 재시도 여부 확인
+                if status in self.RETRY_STATUS_CODES and attempt < retries:
+                    await asyncio.sleep(self.backoff(attempt))
+                    continue
+                
+                try:
+                    return json.loads(text)
+                except ValueError:
+                    if attempt >= retries:
+                        # 다른 요청 오류와 같이 aiohttp.ClientError로 알림
+                        raise aiohttp.ClientPayloadError(f"JSON이 아닌 응답 (HTTP {status}): {text[:200]}")
+                    await asyncio.sleep(self.backoff(attempt))
+    
+    def get_latency_stats(self):
+        """엔드포인트별 지연시간 통계"""
+        return self.latency.snapshot()
+    
+    async def get_accounts(self):
+        """계좌 조회"""
+        try:
+            data = await self._request("GET", "/accounts", auth=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"API 요청 중 오류 발생: {e}")
+            return []  # 오류 발생 시 빈 리스트 반환
+        if not isinstance(data, list):
+            print(f"API 요청 중 오류 발생: {data}")
+            return []
+        return data
+    
+    async def get_ticker(self, markets):
+        """현재가 조회"""
+        params = {'markets': markets}
+        return await self._request("GET", "/ticker", params=params)
+    
+    async def get_orderbook(self, markets):
+        """호가 정보 조회"""
+        params = {'markets': markets}
+        return await self._request("GET", "/orderbook", params=params)
+    
+    async def get_minute_candles(self, market, unit=1, count=200, to=None):
+        """분 캔들 조회"""
+        params = {'market': market, 'count': count}
+        if to:
+            params['to'] = to  # 마지막 캔들 시각 (exclusive, UTC)
+        return await self._request("GET", f"/candles/minutes/{unit}", endpoint="/candles/minutes", params=params)
+    
+    async def get_day_candles(self, market, count=200, to=None):
+        """일 캔들 조회"""
+        params = {'market': market, 'count': count}
+        if to:
+            params['to'] = to  # 마지막 캔들 시각 (exclusive, UTC)
+        return await self._request("GET", "/candles/days", params=params)
+    
+    async def buy_market_order(self, market, price):
+        """시장가 매수"""
+        query = {
+            'market': market,
+            'side': 'bid',
+            'price': str(price),
+            'ord_type': 'price',
+        }
+        return await self._request("POST", "/orders", body=query, auth=True,
+                                   idempotent=False, group="order")
+    
+    async def sell_market_order(self, market, volume):
+        """시장가 매도"""
+        query = {
+            'market': market,
+            'side': 'ask',
+            'volume': str(volume),
+            'ord_type': 'market',
+        }
+        return await self._request("POST", "/orders", body=query, auth=True,
+                                   idempotent=False, group="order")
+    
+    async def get_order(self, uuid_value):
+        """주문 조회"""
+        query = {'uuid': uuid_value}
+        return await self._request("GET", "/order", params=query, auth=True)
+    
+    async def _gather_markets(self, markets, fetch):
+        """마켓별 요청을 동시에 실행하고 {마켓: 결과} 반환 (실패한 마켓은 예외 객체)"""
+        results = await asyncio.gather(*(fetch(market) for market in markets), return_exceptions=True)
+        return dict(zip(markets, results))
+    
+    async def get_minute_candles_many(self, markets, unit=1, count=200):
+        """여러 마켓의 분 캔들 동시 조회"""
+        return await self._gather_markets(markets, lambda m: self.get_minute_candles(m, unit=unit, count=count))
+    
+    async def get_day_candles_many(self, markets, count=200):
+        """여러 마켓의 일 캔들 동시 조회"""
+        return await self._gather_markets(markets, lambda m: self.get_day_candles(m, count=count))
+    
+    async def get_tickers_many(self, markets):
+        """여러 마켓의 현재가 동시 조회 (마켓별 개별 요청)"""
+        results = await self._gather_markets(markets, self.get_ticker)
+        return {m: r[0] if isinstance(r, list) and r else r for m, r in results.items()}
+    
+    async def get_orderbooks_many(self, markets):
+        """여러 마켓의 호가 동시 조회 (마켓별 개별 요청)"""
+        results = await self._gather_markets(markets, self.get_orderbook)
+        return {m: r[0] if isinstance(r, list) and r else r for m, r in results.items()}
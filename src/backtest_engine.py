@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+from src.data_analyzer import DataAnalyzer
+from src.trading_strategies import BUY, HOLD, SELL
+
+# 백테스트 결과 계산 방식이 바뀌면 올려서 저장된 결과와 구분
+ENGINE_VERSION = 5
+
+# 기술적 지표 계산에 필요한 데이터 확보를 위해 20번째 캔들부터 신호 평가
+START_INDEX = 20
+
+INDICATOR_COLUMNS = ('ma5', 'ma20', 'upper_band', 'lower_band', 'rsi', 'macd', 'macd_signal')
+
+
+def ensure_indicators(df):
+    if all(column in df for column in INDICATOR_COLUMNS):
+        return df
+    return DataAnalyzer().calculate_indicators(df.copy())
+
+
+def strategy_signals(df, strategy, current_time=None):
+    """
+    전략의 캔들별 신호 배열 (1: 매수, -1: 매도, 0: 홀드)
+    
+    기존 루프와 같이 START_INDEX번째 캔들부터 평가한다. 변동성 돌파 목표가에 전일 변동폭이
+    들어가도록 직전 캔들부터 generate_signals에 넘긴다.
+    df에는 calculate_indicators로 계산한 지표 컬럼이 있어야 한다.
+    """
+    signals = np.zeros(len(df), dtype=np.int8)
+    if len(df) <= START_INDEX:
+        return signals
+    
+    if hasattr(strategy, 'generate_signals'):
+        signals[START_INDEX - 1:] = strategy.generate_signals(df.iloc[START_INDEX - 1:], current_time=current_time)
+        signals[:START_INDEX] = HOLD
+        return signals
+    
+    # generate_signals가 없는 전략은 캔들마다 generate_signal 호출 (지표는 한 번만 계산)
+    analyzer = DataAnalyzer()
+    close = df['trade_price'].to_numpy()
+    values = {'buy': BUY, 'sell': SELL}
+    for i in range(START_INDEX, len(df)):
+        trend = analyzer.analyze_trend(df.iloc[i - 1:i + 1])
+        signals[i] = values.get(strategy.generate_signal(trend, close[i]), HOLD)
+    return signals
+
+
+def _position_trades(signals, start=START_INDEX, holding=False):
+    """
+    보유 중이 아닐 때의 매수 신호와 보유 중일 때의 매도 신호만 체결되도록 거래 인덱스 계산
+    
+    Args:
+        holding: signals 이전부터 보유 중인지 여부 (나눠서 처리할 때 이전 구간의 포지션)
+    
+    Returns:
+        (매수 인덱스 배열, 매도 인덱스 배열)
+    """
+    idx = np.flatnonzero(signals[start:]) + start
+    values = signals[idx]
+    # 같은 신호가 연속되면 첫 신호만 체결되고, 보유 전의 매도 신호와 보유 중의 매수 신호는 무시된다
+    previous = np.empty_like(values)
+    if len(values):
+        previous[0] = BUY if holding else SELL
+        previous[1:] = values[:-1]
+    keep = values != previous
+    idx, values = idx[keep], values[keep]
+    return idx[values == BUY], idx[values == SELL]
+
+
+def _volatility_breakout_trades(df, k=0.5, start=START_INDEX):
+    """
+    문자열 'volatility_breakout' 전략: 목표가 돌파 시 목표가에 매수, 다음 캔들에서 다음 시가로 매도
+    
+    Returns:
+        (매수 인덱스, 매수가, 매도 인덱스, 매도가) 배열
+    """
+    n = len(df)
+    opening = df['opening_price'].to_numpy()
+    high = df['high_price'].to_numpy()
+    low = df['low_price'].to_numpy()
+    
+    target = np.full(n, np.nan)
+    target[1:] = opening[1:] + (high[:-1] - low[:-1]) * k
+    breakout = np.flatnonzero(high[start:] >= target[start:]) + start
+    
+    buys, sells = [], []
+    next_free = start
+    for i in breakout:
+        if i < next_free:
+            continue
+        buys.append(i)
+        # 보유 중이면 다음 캔들에서 무조건 매도 (마지막 캔들이면 청산으로 넘김)
+        if i + 1 < n - 1:
+            sells.append(i + 1)
+            next_free = i + 2
+        else:
+            break
+    
+    buys = np.asarray(buys, dtype=np.int64)
+    sells = np.asarray(sells, dtype=np.int64)
+    return buys, target[buys], sells, opening[sells + 1]
+
+
+def _equity_curve(close, buy_idx, buy_prices, sell_idx, closed_profits, holding=False, entry_price=np.nan,
+                  realized=0.0):
+    """
+    캔들별 평가 자산 비율 (1 + 실현 수익률 합 + 보유 중 평가 수익률)
+    
+    수익률을 더해서 누적하는 _stats와 같은 방식이며, 매도 캔들에서 그 거래의 수익률이 실현된다.
+    나눠서 처리할 때는 이전 구간의 보유 여부(holding), 매수가(entry_price), 실현 수익률 합(realized)을 넘긴다.
+    """
+    n = len(close)
+    steps = np.zeros(n)
+    steps[sell_idx] = closed_profits
+    if n:
+        steps[0] += realized
+    realized_curve = np.cumsum(steps)
+    
+    position = np.zeros(n, dtype=np.int64)
+    np.add.at(position, buy_idx, 1)
+    np.add.at(position, sell_idx, -1)
+    held = (np.cumsum(position) + int(holding)) > 0
+    
+    # 보유 구간마다 직전 매수가를 이어 씀
+    entry = np.full(n, np.nan)
+    if n:
+        entry[0] = entry_price
+    entry[buy_idx] = buy_prices
+    last = np.where(~np.isnan(entry), np.arange(n), 0)
+    entry = entry[np.maximum.accumulate(last)] if n else entry
+    
+    unrealized = np.zeros(n)
+    unrealized[held] = (close[held] - entry[held]) / entry[held]
+    return 1 + realized_curve + unrealized
+
+
+def _max_drawdown(equity, peak=1.0):
+    """평가 자산 비율 배열의 최대 낙폭 (%), peak는 이전까지의 최고값"""
+    if not len(equity):
+        return 0.0
+    running_peak = np.maximum(np.maximum.accumulate(equity), peak)
+    return float(np.max((running_peak - equity) / running_peak) * 100)
+
+
+def _simulate(df, strategy, start=START_INDEX, stop=None):
+    """
+    거래 인덱스와 거래별 수익률 계산
+    
+    신호는 df 전체에서 계산하고 [start, stop) 구간에서만 거래한다.
+    
+    Returns:
+        (매수 인덱스, 매도 인덱스, 수익률 리스트, 최대 낙폭) - 청산되지 않은 마지막 매수는 구간 마지막 가격으로 청산한 수익률 포함
+    """
+    stop = len(df) if stop is None else stop
+    start = max(start, START_INDEX)
+    close = df['trade_price'].to_numpy(dtype=np.float64)[:stop]
+    
+    if isinstance(strategy, str) and strategy == 'volatility_breakout':
+        buy_idx, buy_prices, sell_idx, sell_prices = _volatility_breakout_trades(df.iloc[:stop], start=start)
+    else:
+        signals = strategy_signals(ensure_indicators(df), strategy)[:stop]
+        buy_idx, sell_idx = _position_trades(signals, start=start)
+        buy_prices, sell_prices = close[buy_idx], close[sell_idx]
+    
+    profits = ((sell_prices - buy_prices[:len(sell_idx)]) / buy_prices[:len(sell_idx)]).tolist()
+    max_drawdown = _max_drawdown(_equity_curve(close, buy_idx, buy_prices, sell_idx, profits))
+    if len(buy_idx) > len(sell_idx):
+        # 마지막 거래 이후 포지션이 남아있는 경우 청산 (마지막 가격으로)
+        profits.append((close[-1] - buy_prices[-1]) / buy_prices[-1])
+    return buy_idx, sell_idx, profits, max_drawdown
+
+
+def _stats(buy_count, profits, initial_capital, max_drawdown=0.0):
+    # 매도 시점마다 수익률을 순서대로 누적 (기존 루프와 같은 부동소수점 결과)
+    total_profit = 0
+    for profit in profits:
+        total_profit += profit
+    
+    final_capital = initial_capital * (1 + total_profit)
+    total_return = (final_capital - initial_capital) / initial_capital * 100
+    wins = sum(1 for profit in profits if profit > 0)
+    
+    return {
+        'initial_capital': initial_capital,
+        'final_capital': final_capital,
+        'total_return': total_return,
+        'buy_count': buy_count,
+        'sell_count': len(profits),
+        'win_rate': wins / len(profits) * 100 if profits else None,
+        'max_drawdown': max_drawdown,
+    }
+
+
+def backtest_stats(df, strategy, initial_capital=1000000, start=START_INDEX, stop=None):
+    """
+    캔들별 결과 데이터프레임 없이 통계만 계산 (파라미터 탐색용)
+    
+    start/stop을 주면 지표와 신호는 df 전체에서 계산하고 [start, stop) 구간에서만 거래한다
+    (워크포워드 구간 평가용, 구간 앞 캔들은 지표/목표가 계산에만 쓰임).
+    """
+    buy_idx, _, profits, max_drawdown = _simulate(df, strategy, start, stop)
+    return _stats(len(buy_idx), profits, initial_capital, max_drawdown)
+
+
+def run_backtest(df, strategy, initial_capital=1000000):
+    """
+    벡터화 백테스트
+    
+    지표를 한 번만 계산하고 전략 신호를 배열로 평가한 뒤 포지션을 한 번에 결정한다.
+    DataAnalyzer.backtest_strategy의 기존 캔들별 루프와 같은 거래 목록과 통계를 만든다.
+    
+    Args:
+        df: 전처리된 캔들 데이터프레임 (지표 컬럼이 없으면 계산)
+        strategy: 전략 객체 또는 'volatility_breakout'
+        initial_capital: 초기 자본금
+    
+    Returns:
+        (results, stats): 캔들별 가격/신호 데이터프레임, 통계 dict
+    """
+    buy_idx, sell_idx, profits, max_drawdown = _simulate(df, strategy)
+    
+    signal_column = np.full(len(df), 'hold', dtype=object)
+    signal_column[buy_idx] = 'buy'
+    signal_column[sell_idx] = 'sell'
+    results = pd.DataFrame({'price': df['trade_price'], 'signal': signal_column}, index=df.index)
+    
+    return results, _stats(len(buy_idx), profits, initial_capital, max_drawdown)
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from src.data_analyzer import CANDLE_VALUE_FIELDS, parse_candles
+from src.indicator_engine import IncrementalIndicators
+
+# 캔들 단위별 링버퍼 크기 (기존 분석에서 한 번에 받던 캔들 수)
+DEFAULT_CAPACITY = {'day': 10}
+MINUTE_CAPACITY = 120
+
+# 워밍업 이후 주기마다 받는 캔들 수 (직전 캔들 확정값 + 진행 중인 캔들)
+DELTA_COUNT = 2
+
+
+def default_capacity(unit):
+    """캔들 단위별 기본 링버퍼 크기 (일봉 10개, 분봉 120개)"""
+    return DEFAULT_CAPACITY.get(unit, MINUTE_CAPACITY)
+
+
+class CandleBuffer:
+    """
+    고정 크기 배열 기반 캔들 링버퍼 (마켓/캔들 단위별 하나)
+    
+    가격/거래량은 (필드 수, capacity) float64 배열, 캔들 시각은 int64 배열에 보관하고
+    가득 차면 가장 오래된 캔들 자리를 덮어쓴다. merge()로 받은 캔들을 시각 기준으로 합치며,
+    이미 있는 캔들(진행 중인 마지막 캔들 포함)은 제자리에서 갱신한다.
+    """
+    
+    def __init__(self, capacity, fields=CANDLE_VALUE_FIELDS):
+        if capacity < 2:
+            raise ValueError("링버퍼 크기는 2 이상이어야 합니다.")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._values = np.full((len(self.fields), capacity), np.nan)
+        self._times = np.zeros(capacity, dtype=np.int64)  # KST 캔들 시각 (datetime64[s] 정수값)
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._start = 0
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    @property
+    def last_time(self):
+        """마지막 캔들 시각 (비어 있으면 None)"""
+        if not self.count:
+            return None
+        return self._times[(self._start + self.count - 1) % self.capacity]
+    
+    def clear(self):
+        self._start = 0
+        self.count = 0
+    
+    def _slot(self, time):
+        """시각이 time인 캔들의 배열 위치 (없으면 None)"""
+        order = self._order()
+        i = np.searchsorted(self._times[order], time)
+        if i < len(order) and self._times[order[i]] == time:
+            return order[i]
+        return None
+    
+    def _order(self):
+        """오래된 캔들부터의 배열 위치"""
+        return (self._start + np.arange(self.count)) % self.capacity
+    
+    def _write(self, slot, columns, i):
+        for row, field in enumerate(self.fields):
+            values = columns.get(field)
+            self._values[row, slot] = values[i] if values is not None else np.nan
+        self._timestamps[slot] = columns['timestamp'][i]
+    
+    def merge(self, candles):
+        """
+        캔들 병합
+        
+        새 캔들은 뒤에 추가하고(가득 차면 가장 오래된 캔들을 덮어씀), 이미 있는 시각의 캔들은
+        제자리에서 갱신한다. 버퍼가 비어 있지 않은데 받은 캔들이 모두 마지막 캔들보다 새로우면
+        중간 캔들이 빠졌을 수 있으므로 병합하지 않는다.
+        
+        Args:
+            candles: 캔들 API 응답 (dict 리스트) 또는 같은 필드를 가진 데이터프레임
+        
+        Returns:
+            병합 전 마지막 캔들 이후(같은 시각 포함)의 캔들 dict 목록 (시간 오름차순),
+            이어지지 않아 병합하지 않았으면 None
+        """
+        columns = parse_candles(candles)
+        times = columns['datetime'].view(np.int64)
+        if not len(times):
+            return []
+        
+        last = self.last_time
+        if last is not None and times[0] > last:
+            return None
+        
+        rows = []
+        for i, time in enumerate(times):
+            if last is not None and time < last:
+                # 이미 확정된 이전 캔들: 버퍼에 남아 있으면 최종값으로 갱신
+                slot = self._slot(time)
+                if slot is not None:
+                    self._write(slot, columns, i)
+                continue
+            
+            if self.count and time == self.last_time:
+                slot = (self._start + self.count - 1) % self.capacity
+            elif self.count < self.capacity:
+                slot = (self._start + self.count) % self.capacity
+                self.count += 1
+            else:
+                slot = self._start
+                self._start = (self._start + 1) % self.capacity
+            self._times[slot] = time
+            self._write(slot, columns, i)
+            
+            row = {field: float(columns[field][i]) for field in self.fields if field in columns}
+            row['datetime'] = columns['datetime'][i]
+            rows.append(row)
+        return rows
+    
+    def frame(self):
+        """버퍼의 캔들 데이터프레임 (preprocess_candles와 같은 컬럼, 시간 오름차순)"""
+        order = self._order()
+        columns = {field: self._values[row, order] for row, field in enumerate(self.fields)}
+        columns['timestamp'] = self._timestamps[order]
+        columns['datetime'] = self._times[order].astype('datetime64[s]').astype('datetime64[ns]')
+        return pd.DataFrame(columns)
+
+
+class CandleFeed:
+    """
+    실시간 매매용 마켓 캔들 상태 (링버퍼 + 증분 지표)
+    
+    처음 한 번 capacity개 캔들로 워밍업한 뒤에는 주기마다 최근 DELTA_COUNT개 캔들만 받아
+    merge()로 합친다. 지표는 IncrementalIndicators가 새 캔들 추가와 진행 중인 캔들 갱신만
+    반영하므로 주기마다 데이터프레임을 다시 만들지 않는다. EMA 계열은 워밍업 이후 전체 이력을
+    이어서 계산하므로 매번 최근 capacity개로 다시 계산하던 값과 조금 다를 수 있다.
+    ma_windows로 추가 이동평균 창을 지정하면 capacity는 가장 긴 창 이상으로 잡는다.
+    
+    사용 예:
+        feed = CandleFeed(15)
+        if feed.needs_warmup or not feed.merge(api.get_minute_candles(market, unit=15, count=DELTA_COUNT)):
+            feed.warm(api.get_minute_candles(market, unit=15, count=feed.capacity))
+        trend = feed.trend()
+    """
+    
+    def __init__(self, unit, capacity=None, ma_windows=()):
+        self.unit = unit
+        self.capacity = capacity or max((default_capacity(unit),) + tuple(ma_windows))
+        self.ma_windows = tuple(ma_windows)
+        self.buffer = CandleBuffer(self.capacity)
+        self.indicators = None
+    
+    @property
+    def needs_warmup(self):
+        """아직 워밍업하지 않았는지 여부"""
+        return self.indicators is None
+    
+    def warm(self, candles):
+        """받은 캔들로 링버퍼와 지표를 처음부터 다시 채움"""
+        self.buffer.clear()
+        self.indicators = IncrementalIndicators(ma_windows=self.ma_windows)
+        self._apply(self.buffer.merge(candles))
+    
+    def merge(self, candles):
+        """
+        주기마다 받은 캔들 병합
+        
+        Returns:
+            병합했으면 True, 워밍업 전이거나 받은 캔들이 버퍼와 이어지지 않으면 False (warm 필요)
+        """
+        if self.indicators is None:
+            return False
+        rows = self.buffer.merge(candles)
+        if rows is None:
+            return False
+        self._apply(rows)
+        return True
+    
+    def _apply(self, rows):
+        for row in rows:
+            self.indicators.update(row, key=row['datetime'])
+    
+    def trend(self):
+        """DataAnalyzer.analyze_trend와 같은 구조의 추세 분석 결과"""
+        return self.indicators.trend()
@@ -0,0 +1,109 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from src.async_upbit_api import AsyncUpbitAPI
+
+# 업비트 캔들 API 한 번에 조회 가능한 최대 개수
+MAX_CANDLES_PER_REQUEST = 200
+
+
+def unit_delta(unit):
+    """캔들 단위('day' 또는 분 단위 정수)의 길이"""
+    if unit == 'day':
+        return timedelta(days=1)
+    return timedelta(minutes=int(unit))
+
+
+def floor_time(dt, unit):
+    """UTC 시각을 캔들 시작 시각으로 내림"""
+    dt = dt.astimezone(timezone.utc)
+    if unit == 'day':
+        # 일봉은 UTC 00:00(KST 09:00)에 시작
+        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    step = int(unit) * 60
+    epoch = int(dt.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % step, tz=timezone.utc)
+
+
+def _format_to(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _to_utc(dt):
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+async def fetch_candle_history_async(api, market, unit=1, count=None, to=None, since=None):
+    """
+    200개 제한을 넘는 과거 캔들 조회
+    
+    to 커서로 겹치지 않는 페이지를 미리 나눈 뒤 요청 수 제한 안에서 동시에 조회하고,
+    중복을 제거해 시간 오름차순으로 정렬된 하나의 데이터프레임으로 반환한다.
+    
+    Args:
+        api: AsyncUpbitAPI 객체
+        market: 마켓 코드 (예: 'KRW-BTC')
+        unit: 분 단위(1, 3, 5, 15, 30, 60, 240) 또는 'day'
+        count: 조회할 캔들 개수 (since와 둘 중 하나는 필요)
+        to: 마지막 캔들 시각 (exclusive, 생략하면 현재 진행 중인 캔들까지 포함)
+        since: 이 시각 이후 캔들만 조회 (inclusive)
+    
+    Returns:
+        캔들 API 응답 필드를 그대로 가진 데이터프레임 (오름차순)
+    """
+    delta = unit_delta(unit)
+    end = _to_utc(to) if to is not None else floor_time(datetime.now(timezone.utc), unit) + delta
+    
+    if since is not None:
+        since = _to_utc(since)
+        span = math.ceil((end - since) / delta)
+        count = span if count is None else min(count, span)
+    if count is None:
+        raise ValueError("count 또는 since 중 하나는 지정해야 합니다.")
+    if count <= 0:
+        return pd.DataFrame()
+    
+    # 시간 기준으로 페이지를 나누므로 거래가 없어 비어 있는 캔들이 있어도 페이지가 겹치지 않는다
+    pages = []
+    for i in range(math.ceil(count / MAX_CANDLES_PER_REQUEST)):
+        page_to = end - delta * (i * MAX_CANDLES_PER_REQUEST)
+        page_count = min(MAX_CANDLES_PER_REQUEST, count - i * MAX_CANDLES_PER_REQUEST)
+        pages.append((_format_to(page_to), page_count))
+    
+    if unit == 'day':
+        fetches = [api.get_day_candles(market, count=c, to=t) for t, c in pages]
+    else:
+        fetches = [api.get_minute_candles(market, unit=unit, count=c, to=t) for t, c in pages]
+    results = await asyncio.gather(*fetches)
+    
+    candles = []
+    for result in results:
+        if not isinstance(result, list):
+            raise ValueError(f"캔들 조회 실패 ({market}): {result}")
+        candles.extend(result)
+    
+    df = pd.DataFrame(candles)
+    if df.empty:
+        return df
+    df = df.drop_duplicates(subset='candle_date_time_utc', keep='first')
+    df = df.sort_values(by='candle_date_time_utc').reset_index(drop=True)
+    if since is not None:
+        start = since.strftime("%Y-%m-%dT%H:%M:%S")
+        df = df[df['candle_date_time_utc'] >= start].reset_index(drop=True)
+    return df
+
+
+def fetch_candle_history(market, unit=1, count=None, to=None, since=None, api=None, max_concurrency=10):
+    """fetch_candle_history_async의 동기 버전 (시세 조회에는 API 키가 필요 없음)"""
+    async def run():
+        if api is not None:
+            return await fetch_candle_history_async(api, market, unit, count, to, since)
+        async with AsyncUpbitAPI(max_concurrency=max_concurrency) as client:
+            return await fetch_candle_history_async(client, market, unit, count, to, since)
+    
+    return asyncio.run(run())
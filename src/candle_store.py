@@ -0,0 +1,172 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.candle_history import fetch_candle_history, floor_time, unit_delta
+
+# 저장하는 캔들 필드
+CANDLE_FIELDS = (
+    'candle_date_time_utc', 'candle_date_time_kst',
+    'opening_price', 'high_price', 'low_price', 'trade_price',
+    'timestamp', 'candle_acc_trade_price', 'candle_acc_trade_volume',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    market TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    candle_date_time_utc TEXT NOT NULL,
+    candle_date_time_kst TEXT,
+    opening_price REAL,
+    high_price REAL,
+    low_price REAL,
+    trade_price REAL,
+    timestamp INTEGER,
+    candle_acc_trade_price REAL,
+    candle_acc_trade_volume REAL,
+    PRIMARY KEY (market, unit, candle_date_time_utc)
+) WITHOUT ROWID
+"""
+
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class CandleStore:
+    """
+    (마켓, 캔들 단위)별 캔들을 SQLite 파일에 저장하는 로컬 캔들 저장소
+    
+    sync()는 마지막으로 저장된 캔들 이후의 캔들만 받아오고, 요청한 개수만큼의
+    과거 구간이 비어 있을 때만 그 구간을 추가로 받아온다.
+    """
+    
+    def __init__(self, path="data/candles.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with closing(self._connect()) as conn:
+            conn.execute(_SCHEMA)
+            conn.commit()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    
+    def time_range(self, market, unit):
+        """저장된 첫 캔들과 마지막 캔들의 UTC 시각 (없으면 (None, None))"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(candle_date_time_utc), MAX(candle_date_time_utc) FROM candles "
+                "WHERE market = ? AND unit = ?",
+                (market, str(unit)),
+            ).fetchone()
+        return row[0], row[1]
+    
+    def upsert(self, market, unit, candles):
+        """캔들 저장 (같은 시각의 캔들은 덮어씀)"""
+        df = pd.DataFrame(candles)
+        if df.empty:
+            return 0
+        rows = df.reindex(columns=CANDLE_FIELDS).itertuples(index=False, name=None)
+        placeholders = ", ".join("?" * (len(CANDLE_FIELDS) + 2))
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO candles (market, unit, {', '.join(CANDLE_FIELDS)}) "
+                f"VALUES ({placeholders})",
+                ((market, str(unit)) + tuple(row) for row in rows),
+            )
+            conn.commit()
+        return len(df)
+    
+    def sync(self, market, unit, count=200, api=None):
+        """
+        최근 count개 구간의 캔들을 저장소에 맞춤
+        
+        마지막 저장 캔들(아직 진행 중이었을 수 있음)부터 현재까지만 새로 받아오고,
+        저장된 첫 캔들보다 과거 구간이 필요할 때만 그 구간을 받아온다.
+        마지막 동기화 후 count개 구간보다 오래 지났어도 저장소에 빈 구간이 생기지 않도록
+        마지막 저장 캔들부터 이어서 받아온다.
+        
+        Returns:
+            새로 저장한 캔들 수
+        """
+        delta = unit_delta(unit)
+        needed_start = floor_time(datetime.now(timezone.utc), unit) - delta * (count - 1)
+        first, last = self.time_range(market, unit)
+        
+        if last is None:
+            return self.upsert(market, unit, fetch_candle_history(market, unit, since=needed_start, api=api))
+        
+        written = 0
+        last_time = datetime.strptime(last, _TIME_FORMAT).replace(tzinfo=timezone.utc)
+        written += self.upsert(market, unit, fetch_candle_history(market, unit, since=last_time, api=api))
+        
+        first_time = datetime.strptime(first, _TIME_FORMAT).replace(tzinfo=timezone.utc)
+        if first_time > needed_start:
+            older = fetch_candle_history(market, unit, to=first_time, since=needed_start, api=api)
+            written += self.upsert(market, unit, older)
+        
+        return written
+    
+    def count(self, market, unit):
+        """저장된 캔들 수"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM candles WHERE market = ? AND unit = ?",
+                (market, str(unit)),
+            ).fetchone()
+        return row[0]
+    
+    def iter_candles(self, market, unit, batch_size=100000):
+        """
+        저장된 캔들을 시간 오름차순으로 batch_size개씩 나눠 읽음
+        
+        전체 기간을 한 번에 메모리에 올리지 않고 내보낼 때 사용한다.
+        
+        Yields:
+            get_candles와 같은 형식의 데이터프레임
+        """
+        query = f"SELECT market, {', '.join(CANDLE_FIELDS)} FROM candles WHERE market = ? AND unit = ?"
+        last = None
+        with closing(self._connect()) as conn:
+            while True:
+                if last is None:
+                    params = [market, str(unit), int(batch_size)]
+                    batch_query = query + " ORDER BY candle_date_time_utc LIMIT ?"
+                else:
+                    params = [market, str(unit), last, int(batch_size)]
+                    batch_query = query + " AND candle_date_time_utc > ? ORDER BY candle_date_time_utc LIMIT ?"
+                df = pd.read_sql_query(batch_query, conn, params=params)
+                if df.empty:
+                    return
+                yield df
+                last = df['candle_date_time_utc'].iloc[-1]
+    
+    def get_candles(self, market, unit, count=None, since=None, until=None):
+        """
+        저장된 캔들 조회
+        
+        Returns:
+            캔들 API 응답과 같은 필드를 가진 데이터프레임 (시간 오름차순)
+            DataAnalyzer.preprocess_candles에 그대로 넘길 수 있다.
+        """
+        query = f"SELECT market, {', '.join(CANDLE_FIELDS)} FROM candles WHERE market = ? AND unit = ?"
+        params = [market, str(unit)]
+        if since is not None:
+            query += " AND candle_date_time_utc >= ?"
+            params.append(since.strftime(_TIME_FORMAT))
+        if until is not None:
+            query += " AND candle_date_time_utc < ?"
+            params.append(until.strftime(_TIME_FORMAT))
+        query += " ORDER BY candle_date_time_utc DESC"
+        if count is not None:
+            query += " LIMIT ?"
+            params.append(int(count))
+        
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+        return df.iloc[::-1].reset_index(drop=True)
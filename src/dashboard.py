@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 
 from src.upbit_api import UpbitAPI
 from src.data_analyzer import DataAnalyzer
+from src.candle_store import CandleStore
+from src.portfolio import value_portfolio
 from src.trading_strategies import MACrossStrategy, RSIStrategy, MACDStrategy, BollingerBandStrategy, CombinedStrategy
 from src.trading_bot import TradingBot
 
@@ -89,12 +91,12 @@ def get_recent_trades(limit=10):
 
 # 캔들 데이터 가져오기
 def get_candle_data(market='KRW-BTC', count=100):
-    access_key, secret_key = get_api_keys()
-    api = UpbitAPI(access_key, secret_key)
     analyzer = DataAnalyzer()
     
-    # 15분 캔들 가져오기
-    candles = api.get_minute_candles(market, unit=15, count=count)
+    # 15분 캔들 가져오기 (로컬 저장소에 없는 최신 캔들만 새로 조회)
+    store = CandleStore()
+    store.sync(market, 15, count=count)
+    candles = store.get_candles(market, 15, count=count)
     
     # 데이터 전처리
     df = analyzer.preprocess_candles(candles)
@@ -161,28 +163,14 @@ def plot_candle_chart(df):
     return fig
 
 # 자산 현황 차트
-def plot_assets_chart(accounts):
-    labels = []
-    values = []
+def plot_assets_chart(portfolio):
+    labels = ['KRW (원화)']
+    values = [portfolio['krw_balance']]
     
-    for account in accounts:
-        currency = account['currency']
-        balance = float(account['balance'])
-        
-        if currency == 'KRW':
-            labels.append('KRW (원화)')
-            values.append(balance)
-        else:
-            # 현재가 조회
-            access_key, secret_key = get_api_keys()
-            api = UpbitAPI(access_key, secret_key)
-            ticker = api.get_ticker(f'KRW-{currency}')
-            
-            if ticker and len(ticker) > 0:
-                current_price = ticker[0]['trade_price']
-                krw_value = balance * current_price
-                labels.append(f'{currency} ({balance:.8f})')
-                values.append(krw_value)
+    for holding in portfolio['holdings']:
+        if holding['krw_value'] is not None:
+            labels.append(f"{holding['currency']} ({holding['balance']:.8f})")
+            values.append(holding['krw_value'])
     
     # 파이 차트
     fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.3)])
@@ -213,53 +201,46 @@ def main():
     
     total_krw = 0
     total_asset_value = 0
+    portfolio = None
     
     if accounts and len(accounts) > 0:
-        for account in accounts:
-            currency = account['currency']
-            balance = float(account['balance'])
+        # 보유 코인 현재가를 한 번에 조회해 평가 (사이드바와 포트폴리오 차트에서 공유)
+        access_key, secret_key = get_api_keys()
+        api = UpbitAPI(access_key, secret_key)
+        portfolio = value_portfolio(api, accounts)
+        
+        total_krw = portfolio['krw_balance']
+        total_asset_value = portfolio['total_value']
+        
+        # 원화 잔액 강조 표시 (배경색 변경)
+        st.sidebar.markdown(f"""
+        <div style="background-color:#222222;padding:12px;border-radius:5px;margin-bottom:10px;border:1px solid #444444">
+            <h3 style="margin:0;font-size:16px;color:#CCCCCC">원화(KRW) 잔액</h3>
+            <p style="font-size:20px;font-weight:bold;color:#00FF9D;margin:8px 0">{total_krw:,.0f}원</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # 코인 정보 표시
+        for holding in portfolio['holdings']:
+            currency = holding['currency']
             
-            if currency == 'KRW':
-                total_krw = balance
-                total_asset_value += balance
-                # 원화 잔액 강조 표시 (배경색 변경)
-                st.sidebar.markdown(f"""
-                <div style="background-color:#222222;padding:12px;border-radius:5px;margin-bottom:10px;border:1px solid #444444">
-                    <h3 style="margin:0;font-size:16px;color:#CCCCCC">원화(KRW) 잔액</h3>
-                    <p style="font-size:20px;font-weight:bold;color:#00FF9D;margin:8px 0">{balance:,.0f}원</p>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                # 코인 정보 표시
-                try:
-                    # 현재가 조회
-                    access_key, secret_key = get_api_keys()
-                    api = UpbitAPI(access_key, secret_key)
-                    ticker = api.get_ticker(f'KRW-{currency}')
-                    
-                    if ticker and len(ticker) > 0:
-                        current_price = ticker[0]['trade_price']
-                        avg_buy_price = float(account['avg_buy_price'])
-                        krw_value = balance * current_price
-                        profit_loss = (current_price - avg_buy_price) / avg_buy_price * 100
-                        
-                        total_asset_value += krw_value
-                        
-                        # 수익률에 따라 색상 결정
-                        color = "#00FF9D" if profit_loss >= 0 else "#FF5252"
-                        
-                        st.sidebar.markdown(f"""
-                        <div style="background-color:#222222;padding:12px;border-radius:5px;margin-bottom:10px;border:1px solid #444444">
-                            <h3 style="margin:0;font-size:16px;color:#CCCCCC">{currency} 보유량</h3>
-                            <p style="font-size:16px;margin:8px 0;color:#FFFFFF">{balance:.8f} {currency}</p>
-                            <p style="font-size:16px;margin:8px 0;color:#DDDDDD">평가금액: {krw_value:,.0f}원</p>
-                            <p style="font-size:16px;margin:8px 0;color:#DDDDDD">매수가: {avg_buy_price:,.0f}원</p>
-                            <p style="font-size:16px;margin:8px 0;color:#DDDDDD">현재가: {current_price:,.0f}원</p>
-                            <p style="font-size:16px;font-weight:bold;color:{color};margin:8px 0">수익률: {profit_loss:.2f}%</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                except Exception as e:
-                    st.sidebar.error(f"코인 정보 조회 중 오류: {e}")
+            if holding['current_price'] is None:
+                st.sidebar.error(f"코인 정보 조회 중 오류: {holding['market']} 현재가를 가져올 수 없습니다.")
+                continue
+            
+            # 수익률에 따라 색상 결정
+            color = "#00FF9D" if holding['profit_loss'] >= 0 else "#FF5252"
+            
+            st.sidebar.markdown(f"""
+            <div style="background-color:#222222;padding:12px;border-radius:5px;margin-bottom:10px;border:1px solid #444444">
+                <h3 style="margin:0;font-size:16px;color:#CCCCCC">{currency} 보유량</h3>
+                <p style="font-size:16px;margin:8px 0;color:#FFFFFF">{holding['balance']:.8f} {currency}</p>
+                <p style="font-size:16px;margin:8px 0;color:#DDDDDD">평가금액: {holding['krw_value']:,.0f}원</p>
+                <p style="font-size:16px;margin:8px 0;color:#DDDDDD">매수가: {holding['avg_buy_price']:,.0f}원</p>
+                <p style="font-size:16px;margin:8px 0;color:#DDDDDD">현재가: {holding['current_price']:,.0f}원</p>
+                <p style="font-size:16px;font-weight:bold;color:{color};margin:8px 0">수익률: {holding['profit_loss']:.2f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
     else:
         st.sidebar.error("계정 정보를 가져올 수 없습니다. API 키를 확인하세요.")
     
@@ -468,8 +449,8 @@ def main():
         st.header("포트폴리오 분석")
         
         # 자산 차트
-        if accounts:
-            portfolio_chart = plot_assets_chart(accounts)
+        if portfolio:
+            portfolio_chart = plot_assets_chart(portfolio)
             st.plotly_chart(portfolio_chart, use_container_width=True)
         else:
             st.info("계정 정보를 가져올 수 없습니다.")
@@ -2,16 +2,60 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+# 분석에 사용하는 캔들 가격/거래량 필드
+CANDLE_VALUE_FIELDS = (
+    'opening_price', 'high_price', 'low_price', 'trade_price',
+    'candle_acc_trade_price', 'candle_acc_trade_volume',
+)
+
+def parse_candles(candles):
+    """
+    캔들 응답을 타입이 지정된 NumPy 컬럼으로 변환
+    
+    가격/거래량은 float64, timestamp는 int64(ms), datetime은 KST 캔들 시각(datetime64)으로
+    변환하고 나머지 문자열 필드는 버린다. API 응답처럼 최신순으로 정렬된 데이터는 정렬 없이
+    뒤집기만 하고, 순서가 섞인 경우에만 정렬한다.
+    
+    Args:
+        candles: 캔들 API 응답(dict 리스트) 또는 같은 필드를 가진 데이터프레임
+    
+    Returns:
+        {컬럼명: NumPy 배열} (시간 오름차순)
+    """
+    if isinstance(candles, pd.DataFrame):
+        columns = {f: candles[f].to_numpy(dtype=np.float64) for f in CANDLE_VALUE_FIELDS if f in candles}
+        columns['timestamp'] = candles['timestamp'].to_numpy(dtype=np.int64)
+        kst = candles['candle_date_time_kst'].to_numpy()
+    else:
+        n = len(candles)
+        fields = [f for f in CANDLE_VALUE_FIELDS if n and f in candles[0]]
+        columns = {f: np.fromiter((c[f] for c in candles), dtype=np.float64, count=n) for f in fields}
+        columns['timestamp'] = np.fromiter((c['timestamp'] for c in candles), dtype=np.int64, count=n)
+        kst = [c['candle_date_time_kst'] for c in candles]
+    columns['datetime'] = np.asarray(kst).astype('datetime64[s]')
+    
+    times = columns['datetime'].view(np.int64)
+    steps = np.diff(times)
+    if len(times) > 1 and (steps < 0).all():
+        order = slice(None, None, -1)  # 최신순 -> 오름차순
+    elif (steps >= 0).all():
+        order = None
+    else:
+        order = np.argsort(times, kind='stable')
+    
+    if order is not None:
+        columns = {name: values[order] for name, values in columns.items()}
+    return columns
+
 class DataAnalyzer:
     def __init__(self):
         pass
     
     def preprocess_candles(self, candles):
         """캔들 데이터 전처리"""
-        df = pd.DataFrame(candles)
-        df = df.sort_values(by='timestamp', ascending=True).reset_index(drop=True)
-        df['datetime'] = pd.to_datetime(df['candle_date_time_kst'])
-        return df
+        columns = parse_candles(candles)
+        columns['datetime'] = columns['datetime'].astype('datetime64[ns]')
+        return pd.DataFrame(columns)
     
     def calculate_indicators(self, df):
         """기술적 지표 계산"""
@@ -88,85 +132,6 @@ class DataAnalyzer:
         return target_price
     
     def backtest_strategy(self, df, strategy, initial_capital=1000000):
-        """전략 백테스팅"""
-        # 백테스팅 결과 저장 데이터프레임
-        results = pd.DataFrame(index=df.index)
-        results['price'] = df['trade_price']
-        results['signal'] = 'hold'  # 초기값은 모두 홀드
-        
-        # 포지션 및 자본금 추적
-        position = False
-        capital = initial_capital
-        buy_price = 0
-        buy_count = 0
-        sell_count = 0
-        total_profit = 0
-        
-        # 각 날짜/시간에 대해 신호 생성 및 포지션 추적
-        for i in range(20, len(df)):  # 기술적 지표 계산에 필요한 데이터 확보를 위해 20개 이후부터 시작
-            subset = df.iloc[:i+1]
-            trend = self.analyze_trend(subset)
-            
-            current_price = df.iloc[i]['trade_price']
-            
-            if isinstance(strategy, str) and strategy == 'volatility_breakout':
-                # 변동성 돌파 전략 구현
-                if i > 0:  # 전일 데이터가 있어야 계산 가능
-                    k = 0.5  # 기본 k값
-                    yesterday = df.iloc[i-1]
-                    today_open = df.iloc[i]['opening_price']
-                    target_price = today_open + (yesterday['high_price'] - yesterday['low_price']) * k
-                    
-                    # 당일 고가가 목표가 이상이면 매수 신호
-                    if df.iloc[i]['high_price'] >= target_price and not position:
-                        results.iloc[i, results.columns.get_loc('signal')] = 'buy'
-                        position = True
-                        buy_price = target_price
-                        buy_count += 1
-                    
-                    # 다음날 시가에 매도
-                    elif position and i < len(df) - 1:
-                        next_day_open = df.iloc[i+1]['opening_price'] if i+1 < len(df) else current_price
-                        results.iloc[i, results.columns.get_loc('signal')] = 'sell'
-                        position = False
-                        profit = (next_day_open - buy_price) / buy_price
-                        total_profit += profit
-                        sell_count += 1
-            else:
-                # 일반 전략의 경우 (MA, RSI, MACD 등)
-                signal = strategy.generate_signal(trend, current_price)
-                
-                if signal == 'buy' and not position:
-                    results.iloc[i, results.columns.get_loc('signal')] = 'buy'
-                    position = True
-                    buy_price = current_price
-                    buy_count += 1
-                
-                elif signal == 'sell' and position:
-                    results.iloc[i, results.columns.get_loc('signal')] = 'sell'
-                    position = False
-                    profit = (current_price - buy_price) / buy_price
-                    total_profit += profit
-                    sell_count += 1
-        
-        # 마지막 거래 이후 포지션이 남아있는 경우 청산 (마지막 가격으로)
-        if position:
-            last_price = df.iloc[-1]['trade_price']
-            profit = (last_price - buy_price) / buy_price
-            total_profit += profit
-            sell_count += 1
-        
-        # 최종 수익률 계산
-        final_capital = capital * (1 + total_profit)
-        total_return = (final_capital - initial_capital) / initial_capital * 100
-        
-        stats = {
-            'initial_capital': initial_capital,
-            'final_capital': final_capital,
-            'total_return': total_return,
-            'buy_count': buy_count,
-            'sell_count': sell_count,
-            'win_rate': None  # 승률 계산은 좀 더 복잡한 로직이 필요
-        }
-        
-        return results, stats
\ No newline at end of file
+        """전략 백테스팅 (지표 배열 기반 벡터화 엔진 사용)"""
+        from src.backtest_engine import run_backtest
+        return run_backtest(df, strategy, initial_capital)
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba가 없으면 같은 코드를 순수 파이썬으로 실행
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# 일봉 기준 리셋 시각(KST 09:00) 이후 매수하지 않는 구간 (분)
+RESET_WINDOW_MINUTES = 5
+
+
+@njit(cache=True)
+def dca_kernel(opening, close, entry, breakout, reset, buy_pct, sell_pct, buy_amount_pct,
+               fee, initial_capital, min_order, max_adds, equity):
+    """
+    퍼센트 기반 분할 매수(DCA) 전략의 포지션/손익 상태 머신
+    
+    캔들마다 다음 순서로 처리한다.
+        1. 리셋 캔들(09:00)이면 보유 물량을 시가에 전량 매도
+        2. 보유 중이 아니고 변동성 돌파(breakout)면 entry 가격에 매수
+        3. 보유 중이면 종가 기준 평균 매수가 대비 +sell_pct 이상에서 전량 매도,
+           -buy_pct 이하에서 추가 매수 (최대 max_adds번)
+    매수 금액은 현금의 buy_amount_pct이며, 매수/매도 모두 fee만큼 수수료를 뗀다.
+    평균 매수가는 업비트와 같이 수수료를 제외한 체결가로 계산한다.
+    
+    numba가 있으면 컴파일되고, 없으면 배열 대신 리스트를 넘겨 순수 파이썬으로 실행한다.
+    equity에 캔들별 평가금액을 기록한다.
+    
+    Returns:
+        (현금, 보유 수량, 평균 매수가, 매수 횟수, 추가 매수 횟수, 매도 횟수, 수익 매도 횟수)
+    """
+    cash = initial_capital
+    volume = 0.0
+    avg_price = 0.0
+    cost = 0.0  # 현재 포지션에 들어간 원화 (수수료 포함)
+    adds = 0
+    buy_count = 0
+    add_count = 0
+    sell_count = 0
+    win_count = 0
+    
+    for i in range(len(close)):
+        if volume > 0 and reset[i]:
+            proceeds = volume * opening[i] * (1 - fee)
+            cash += proceeds
+            sell_count += 1
+            if proceeds > cost:
+                win_count += 1
+            volume = 0.0
+            avg_price = 0.0
+            cost = 0.0
+            adds = 0
+        
+        if volume == 0:
+            if breakout[i]:
+                spend = cash * buy_amount_pct
+                if spend >= min_order:
+                    volume = spend * (1 - fee) / entry[i]
+                    avg_price = entry[i]
+                    cost = spend
+                    cash -= spend
+                    buy_count += 1
+        else:
+            price = close[i]
+            change = (price - avg_price) / avg_price
+            if change >= sell_pct:
+                proceeds = volume * price * (1 - fee)
+                cash += proceeds
+                sell_count += 1
+                if proceeds > cost:
+                    win_count += 1
+                volume = 0.0
+                avg_price = 0.0
+                cost = 0.0
+                adds = 0
+            elif change <= -buy_pct and adds < max_adds:
+                spend = cash * buy_amount_pct
+                if spend >= min_order:
+                    added = spend * (1 - fee) / price
+                    avg_price = (avg_price * volume + price * added) / (volume + added)
+                    volume += added
+                    cost += spend
+                    cash -= spend
+                    adds += 1
+                    add_count += 1
+        
+        equity[i] = cash + volume * close[i]
+    
+    return cash, volume, avg_price, buy_count, add_count, sell_count, win_count
+
+
+@njit(cache=True)
+def percentage_signal_kernel(close, breakout, reset, buy_pct, sell_pct, buy_amount_pct, max_adds,
+                             avg_price, signals):
+    """
+    dca_kernel과 같은 순서로 평균 매수가를 따라가며 캔들별 신호 기록 (1: 매수/추가 매수, -1: 매도)
+    
+    체결가는 종가로 본다. 매수 금액은 남은 현금의 buy_amount_pct이므로 평균 매수가는 현금 규모와
+    관계없이 회차별 매수 비중((1 - buy_amount_pct)^회차)만으로 정해진다.
+    avg_price가 0보다 크면 그 평균 매수가로 보유 중인 상태에서 시작한다.
+    """
+    volume = 0.0  # 첫 매수 금액을 1로 본 보유 수량
+    spend = 1.0  # 다음 매수 금액 (첫 매수 금액 대비)
+    adds = 0
+    if avg_price > 0:
+        volume = 1.0 / avg_price
+        spend = 1.0 - buy_amount_pct
+    
+    for i in range(len(close)):
+        if volume > 0 and reset[i]:
+            signals[i] = -1
+            volume = 0.0
+            avg_price = 0.0
+        
+        if volume == 0:
+            if breakout[i]:
+                signals[i] = 1
+                volume = 1.0 / close[i]
+                avg_price = close[i]
+                spend = 1.0 - buy_amount_pct
+                adds = 0
+        else:
+            price = close[i]
+            change = (price - avg_price) / avg_price
+            if change >= sell_pct:
+                signals[i] = -1
+                volume = 0.0
+                avg_price = 0.0
+            elif change <= -buy_pct and adds < max_adds:
+                signals[i] = 1
+                added = spend / price
+                avg_price = (avg_price * volume + price * added) / (volume + added)
+                volume += added
+                spend *= 1.0 - buy_amount_pct
+                adds += 1
+
+
+def breakout_inputs(df, k=0.5):
+    """
+    거래일별 변동성 돌파 목표가 배열 (시가, 고가, 종가, 목표가, 매수 가능 여부, 리셋 여부)
+    
+    거래일은 KST 09:00에 바뀐다. 목표가는 당일 첫 시가 + 전일 (고가 - 저가) * k이며 첫 거래일은 NaN이다.
+    분봉처럼 하루에 캔들이 여러 개면 거래일의 첫 캔들이 리셋 캔들이고 09:00~09:05에는 매수하지 않는다.
+    datetime 컬럼이 없으면 캔들 하나를 하루로 본다.
+    """
+    n = len(df)
+    opening = df['opening_price'].to_numpy(dtype=np.float64)
+    high = df['high_price'].to_numpy(dtype=np.float64)
+    low = df['low_price'].to_numpy(dtype=np.float64)
+    close = df['trade_price'].to_numpy(dtype=np.float64)
+    
+    if 'datetime' in df:
+        # datetime은 KST 캔들 시각이므로 9시간을 빼서 거래일 경계를 자정에 맞춤
+        times = pd.DatetimeIndex(df['datetime']) - pd.Timedelta(hours=9)
+        day = times.floor('D').asi8
+        minute_of_day = np.asarray(times.hour * 60 + times.minute)
+    else:
+        day = np.arange(n)
+        minute_of_day = np.full(n, RESET_WINDOW_MINUTES + 1)
+    
+    new_day = np.ones(n, dtype=bool)
+    new_day[1:] = day[1:] != day[:-1]
+    day_index = np.cumsum(new_day) - 1
+    starts = np.flatnonzero(new_day)
+    
+    # 거래일별 시가/고가/저가
+    day_open = opening[starts]
+    day_high = np.maximum.reduceat(high, starts) if n else high
+    day_low = np.minimum.reduceat(low, starts) if n else low
+    prev_range = np.full(len(starts), np.nan)
+    prev_range[1:] = day_high[:-1] - day_low[:-1]
+    
+    target = (day_open + prev_range * k)[day_index] if n else close
+    tradable = np.ones(n, dtype=bool)
+    if len(starts) < n:
+        tradable = minute_of_day >= RESET_WINDOW_MINUTES
+    
+    reset = new_day.copy()
+    if n:
+        reset[0] = False
+    return opening, high, close, target, tradable, reset
+
+
+def percentage_inputs(df, k=0.5):
+    """
+    dca_kernel 입력 배열 (시가, 종가, 매수가, 돌파 여부, 리셋 여부)
+    
+    목표가와 리셋 캔들은 breakout_inputs와 같다. 캔들 고가가 목표가에 닿으면 돌파로 보고
+    목표가(시가가 더 높으면 시가)에 매수한다.
+    """
+    opening, high, close, target, tradable, reset = breakout_inputs(df, k)
+    breakout = (high >= target) & tradable
+    entry = np.maximum(target, opening)
+    return opening, close, entry, breakout, reset
+
+
+def percentage_signals(df, strategy, avg_buy_price=None, buy_amount_pct=0.3, max_adds=10):
+    """
+    PercentageStrategy의 캔들별 신호 배열 (평균 매수가를 시뮬레이션)
+    
+    보유하지 않았을 때는 종가가 목표가 이상이면 매수하고, 보유 중에는 평균 매수가 대비 +sell_pct에서
+    매도, -buy_pct에서 추가 매수(최대 max_adds번)하며, 다음 거래일 첫 캔들에서 매도한다.
+    같은 캔들에서 리셋 매도 후 다시 돌파하면 매수 신호가 된다.
+    """
+    _, _, close, target, tradable, reset = breakout_inputs(df, strategy.k)
+    breakout = (close >= target) & tradable
+    args = (close, breakout, reset)
+    signals = np.zeros(len(close), dtype=np.int8)
+    if not HAS_NUMBA:
+        args = tuple(a.tolist() for a in args)
+        signals = [0] * len(close)
+    
+    percentage_signal_kernel(*args, strategy.buy_pct, strategy.sell_pct, buy_amount_pct, max_adds,
+                             float(avg_buy_price or 0), signals)
+    return np.asarray(signals, dtype=np.int8)
+
+
+def backtest_percentage(df, strategy, initial_capital=1000000, buy_amount_pct=0.3, fee=0.0005,
+                        min_order=5000, max_adds=10, start=0, stop=None):
+    """
+    PercentageStrategy 백테스트 (평균 매수가, 추가 매수, 수수료, 09:00 리셋 반영)
+    
+    Args:
+        df: 전처리된 캔들 데이터프레임
+        strategy: PercentageStrategy (buy_pct, sell_pct, k 사용)
+        buy_amount_pct: 매수 시 사용할 현금 비율 (TradingBot의 buy_amount_pct와 같음)
+        fee: 매수/매도 수수료율
+        min_order: 최소 주문 금액
+        max_adds: 포지션당 최대 추가 매수 횟수
+        start, stop: 거래할 캔들 구간 [start, stop) (목표가는 df 전체에서 계산, 워크포워드 구간 평가용)
+    
+    Returns:
+        (equity, stats): 구간 캔들별 평가금액 배열, 통계 dict (남은 물량은 마지막 종가로 평가,
+        max_drawdown은 평가금액 곡선 기준)
+    """
+    window = slice(start, stop)
+    opening, close, entry, breakout, reset = (a[window] for a in percentage_inputs(df, strategy.k))
+    args = (opening, close, entry, breakout, reset)
+    equity = np.empty(len(close))
+    if not HAS_NUMBA:
+        # 순수 파이썬 실행 시 NumPy 원소 접근보다 리스트 접근이 훨씬 빠름
+        args = tuple(a.tolist() for a in args)
+        equity = [0.0] * len(close)
+    
+    cash, volume, avg_price, buy_count, add_count, sell_count, win_count = dca_kernel(
+        *args, strategy.buy_pct, strategy.sell_pct, buy_amount_pct, fee,
+        float(initial_capital), min_order, max_adds, equity
+    )
+    equity = np.asarray(equity, dtype=np.float64)
+    
+    final_capital = float(equity[-1]) if len(equity) else float(initial_capital)
+    max_drawdown = 0.0
+    if len(equity):
+        # 최대 낙폭: 초기 자본금을 포함한 이전 최고 평가금액 대비 (%)
+        running_peak = np.maximum(np.maximum.accumulate(equity), initial_capital)
+        max_drawdown = float(np.max((running_peak - equity) / running_peak) * 100)
+    stats = {
+        'initial_capital': initial_capital,
+        'final_capital': final_capital,
+        'total_return': (final_capital - initial_capital) / initial_capital * 100,
+        'buy_count': buy_count,
+        'add_count': add_count,
+        'sell_count': sell_count,
+        'win_rate': win_count / sell_count * 100 if sell_count else None,
+        'max_drawdown': max_drawdown,
+        'open_volume': volume,
+        'avg_buy_price': avg_price,
+    }
+    return equity, stats
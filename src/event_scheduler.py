@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.candle_history import floor_time, unit_delta
+from src.trading_strategies import MACrossStrategy, PercentageStrategy, VolatilityBreakoutStrategy
+
+# 캔들 마감 후 거래소에 마감 캔들이 반영될 때까지 기다리는 시간 (초)
+SETTLE_DELAY = 1.0
+
+# 일봉 리셋 시각 (KST 09:00 = UTC 00:00)과 변동성 돌파 매수 금지 구간이 끝나는 시각 (KST 09:05 직후)
+RESET_OFFSET = timedelta(0)
+RESET_END_OFFSET = timedelta(minutes=5, seconds=1)
+
+# 같은 시각에 여러 이벤트가 겹치면 앞의 종류부터 발생
+EVENT_PRIORITY = ('reset', 'reset_end', 'candle')
+
+
+def candle_unit(strategy):
+    """전략이 분석에 쓰는 캔들 단위 (변동성 돌파/퍼센트 전략은 일봉, 나머지는 15분봉)"""
+    if isinstance(strategy, (VolatilityBreakoutStrategy, PercentageStrategy)):
+        return 'day'
+    return 15
+
+
+def ma_windows(strategy):
+    """전략이 실시간 추세에서 쓰는 추가 이동평균 창 (이동평균 교차 전략의 단기/장기 창)"""
+    ma = strategy if isinstance(strategy, MACrossStrategy) else getattr(strategy, 'ma_strategy', None)
+    if ma is None:
+        return ()
+    return (ma.short_window, ma.long_window)
+
+
+def next_candle_close(now, unit):
+    """now 이후 처음 마감되는 캔들의 마감 시각 (UTC)"""
+    return floor_time(now, unit) + unit_delta(unit)
+
+
+def next_timer_event(now, unit, settle_delay=SETTLE_DELAY):
+    """
+    now 이후 다음 시각 이벤트
+    
+    Returns:
+        (UTC 시각, 이벤트 종류) - 종류는 'candle' (캔들 마감), 'reset' (09:00 리셋), 'reset_end' (09:05 이후)
+    """
+    now = now.astimezone(timezone.utc)
+    day = floor_time(now, 'day')
+    candidates = []
+    
+    settle = timedelta(seconds=settle_delay)
+    candidates.append((next_candle_close(now - settle, unit) + settle, 'candle'))
+    for offset, kind in ((RESET_OFFSET, 'reset'), (RESET_END_OFFSET, 'reset_end')):
+        at = day + offset
+        if at <= now:
+            at += timedelta(days=1)
+        candidates.append((at, kind))
+    
+    return min(candidates, key=lambda candidate: (candidate[0], EVENT_PRIORITY.index(candidate[1])))
+
+
+def price_triggers(strategy, position):
+    """
+    전략 신호가 바뀔 수 있는 가격 (이상, 이하) - 해당 없으면 None
+    
+    보유하지 않았을 때는 변동성 돌파 목표가, 퍼센트 전략이 보유 중일 때는 평균 매수가 대비 +sell_pct
+    매도 가격이다. 봇은 보유 중 추가 매수를 하지 않으므로 -buy_pct 가격은 지정하지 않는다.
+    지표 기반 전략은 캔들 마감에만 신호가 바뀐다.
+    """
+    has_position = position.get('has_position', False)
+    avg_buy_price = position.get('avg_buy_price') or 0
+    
+    if isinstance(strategy, PercentageStrategy):
+        if has_position and avg_buy_price:
+            return avg_buy_price * (1 + strategy.sell_pct), None
+        if not has_position:
+            return strategy.vb_strategy.target_price, None
+        return None, None
+    
+    if isinstance(strategy, VolatilityBreakoutStrategy) and not has_position:
+        return strategy.target_price, None
+    
+    return None, None
+
+
+class EventScheduler:
+    """
+    캔들 마감 시각과 가격 이벤트로 전략 평가 시점을 알려주는 스케줄러
+    
+    다음 이벤트를 {'type', 'market', 'price', 'time'} dict로 생성한다.
+        - 'candle': 전략 캔들 단위(unit)의 캔들이 마감된 직후 (market은 None)
+        - 'reset' / 'reset_end': KST 09:00 일봉 리셋과 09:05 매수 금지 구간 종료
+        - 'price': WebSocket ticker 가격이 set_triggers로 지정한 가격 이상/이하가 된 경우
+    가격 이벤트는 한 번 발생하면 해제되므로 평가 후 set_triggers로 다시 지정해야 한다.
+    
+    사용 예:
+        scheduler = EventScheduler(['KRW-BTC'], 15, websocket=UpbitWebSocket(['KRW-BTC'], channels=('ticker',)))
+        async for event in scheduler:
+            ...
+    """
+    
+    def __init__(self, markets, unit, websocket=None, settle_delay=SETTLE_DELAY):
+        self.markets = list(markets)
+        self.unit = unit
+        self.websocket = websocket
+        self.settle_delay = settle_delay
+        self.triggers = {}
+        self.last_prices = {}
+        self._queue = None
+        self._tasks = []
+    
+    def set_triggers(self, market, above=None, below=None):
+        """market 가격이 above 이상 또는 below 이하가 되면 'price' 이벤트 발생 (None이면 해제)"""
+        if above is None and below is None:
+            self.triggers.pop(market, None)
+        else:
+            self.triggers[market] = (above, below)
+    
+    def on_ticker(self, event):
+        """WebSocket ticker 이벤트 처리 (가격 조건을 만족하면 이벤트를 큐에 넣음)"""
+        market = event.get('code')
+        price = event.get('trade_price')
+        if market is None or price is None:
+            return
+        self.last_prices[market] = price
+        
+        trigger = self.triggers.get(market)
+        if trigger is None:
+            return
+        above, below = trigger
+        if (above is not None and price >= above) or (below is not None and price <= below):
+            # 평가가 끝나 다시 지정될 때까지 같은 조건으로 이벤트가 반복되지 않도록 해제
+            del self.triggers[market]
+            self._emit('price', market, price)
+    
+    def _emit(self, kind, market=None, price=None):
+        if self._queue is not None:
+            self._queue.put_nowait({
+                'type': kind,
+                'market': market,
+                'price': price,
+                'time': datetime.now(timezone.utc),
+            })
+    
+    async def _timer(self):
+        while True:
+            at, kind = next_timer_event(datetime.now(timezone.utc), self.unit, self.settle_delay)
+            await asyncio.sleep(max(0.0, (at - datetime.now(timezone.utc)).total_seconds()))
+            # 같은 이벤트가 다시 계산되지 않도록 이벤트 시각이 지난 것을 확인한 뒤 발생
+            while datetime.now(timezone.utc) < at:
+                await asyncio.sleep(0.001)
+            self._emit(kind)
+    
+    async def _prices(self):
+        async for event in self.websocket:
+            self.on_ticker(event)
+    
+    async def __aiter__(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._timer())]
+        if self.websocket is not None:
+            self._tasks.append(asyncio.ensure_future(self._prices()))
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """타이머와 가격 스트림 중지"""
+        if self.websocket is not None:
+            self.websocket.stop()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
@@ -0,0 +1,361 @@
+import math
+
+import pandas as pd
+
+# DataAnalyzer.calculate_indicators와 같은 지표 파라미터
+MA_WINDOWS = (5, 10, 20, 60, 120)
+BB_WINDOW = 20
+RSI_WINDOW = 14
+EMA_SPANS = (12, 26)
+SIGNAL_SPAN = 9
+
+NAN = float('nan')
+
+
+def _divide(numerator, denominator):
+    """NumPy/pandas와 같은 방식의 나눗셈 (0으로 나누면 inf 또는 nan)"""
+    if denominator == 0 or denominator != denominator:
+        if numerator != numerator or numerator == 0 or denominator != denominator:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class _CompensatedSum:
+    """추가/제거를 반복해도 오차가 누적되지 않도록 보정(Neumaier)하는 누적합"""
+    
+    __slots__ = ('total', 'compensation')
+    
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+    
+    def add(self, value):
+        t = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - t) + value
+        else:
+            self.compensation += (value - t) + self.total
+        self.total = t
+    
+    def value(self):
+        return self.total + self.compensation
+    
+    def reset(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+
+class _RollingWindow:
+    """고정 길이 창의 합/제곱합 (평균과 표본 표준편차를 O(1)로 계산)"""
+    
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.shift = None  # 큰 가격에서 제곱합 상쇄 오차를 줄이기 위한 기준값
+        self._sum = _CompensatedSum()
+        self._sumsq = _CompensatedSum()
+    
+    def add(self, value):
+        if self.shift is None:
+            self.shift = value
+        d = value - self.shift
+        self._sum.add(d)
+        self._sumsq.add(d * d)
+        self.count += 1
+    
+    def remove(self, value):
+        d = value - self.shift
+        self._sum.add(-d)
+        self._sumsq.add(-d * d)
+        self.count -= 1
+    
+    def replace(self, old, new):
+        self.remove(old)
+        self.add(new)
+    
+    def recenter(self, values):
+        """기준값을 현재 창 평균 근처로 옮기고 합을 다시 계산"""
+        self.shift = values[-1]
+        self._sum.reset()
+        self._sumsq.reset()
+        for value in values:
+            d = value - self.shift
+            self._sum.add(d)
+            self._sumsq.add(d * d)
+    
+    def mean(self):
+        if self.count < self.window:
+            return NAN
+        return self.shift + self._sum.value() / self.count
+    
+    def std(self):
+        if self.count < self.window:
+            return NAN
+        s = self._sum.value()
+        var = (self._sumsq.value() - s * s / self.count) / (self.count - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class _EMA:
+    """pandas ewm(span, adjust=False).mean()과 같은 계산식의 지수이동평균"""
+    
+    __slots__ = ('alpha', 'value')
+    
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+    
+    def next(self, prev, x):
+        """이전 값 prev에 x를 반영한 새 값 (상태는 바꾸지 않음)"""
+        if prev is None:
+            return x
+        if prev == x:
+            return prev
+        old_wt = 1.0 - self.alpha
+        return (old_wt * prev + self.alpha * x) / (old_wt + self.alpha)
+
+
+class IncrementalIndicators:
+    """
+    실시간 매매용 증분 지표 엔진
+    
+    MA5~MA120(과 ma_windows로 지정한 추가 창), 볼린저 밴드 표준편차, RSI, EMA12/26, MACD 시그널을 누적합과 EMA 상태로
+    유지해 새 캔들 추가와 진행 중인 마지막 캔들 갱신을 모두 캔들당 O(1)로 처리한다.
+    trend()는 DataAnalyzer.analyze_trend와 같은 구조의 dict를 반환하며, 이동평균 계열은
+    누적합 방식 차이로 부동소수점 마지막 자릿수 정도만 다를 수 있다.
+    
+    사용 예:
+        engine = IncrementalIndicators.from_frame(df)   # 과거 캔들로 초기화
+        engine.update(candle)                            # 새 캔들 또는 갱신된 마지막 캔들
+        trend = engine.trend()
+    """
+    
+    CANDLE_FIELDS = ('opening_price', 'high_price', 'low_price', 'trade_price')
+    
+    def __init__(self, recenter_interval=1000, ma_windows=()):
+        windows = MA_WINDOWS + (BB_WINDOW,) + tuple(ma_windows)
+        self.capacity = max(windows) + 1
+        self.recenter_interval = recenter_interval
+        self.count = 0
+        self.last_key = None
+        
+        self._closes = [0.0] * self.capacity  # 종가 링버퍼
+        self._windows = {w: _RollingWindow(w) for w in sorted(set(windows))}
+        self._gains = [0.0] * (RSI_WINDOW + 1)  # RSI 상승폭/하락폭 링버퍼
+        self._losses = [0.0] * (RSI_WINDOW + 1)
+        self._gain_sum = _CompensatedSum()
+        self._loss_sum = _CompensatedSum()
+        self._gain_count = 0  # 창 안의 0이 아닌 값 수 (0이면 합을 정확히 0으로)
+        self._loss_count = 0
+        self._same_run = 0  # 같은 종가가 연속된 횟수 (창 전체가 같으면 평균/표준편차를 정확히 계산)
+        
+        self._ema_fast = _EMA(EMA_SPANS[0])
+        self._ema_slow = _EMA(EMA_SPANS[1])
+        self._ema_signal = _EMA(SIGNAL_SPAN)
+        self._prev_emas = (None, None, None)  # 마지막 캔들 반영 전 EMA 상태 (갱신 시 되돌림용)
+        self._emas = (None, None, None)
+        
+        self._candles = []  # 최근 2개 캔들 (변동성 돌파 목표가 계산용)
+        self._prev = None  # 직전 캔들의 지표값
+        self._current = None
+    
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        """전처리된 캔들 데이터프레임으로 초기화"""
+        engine = cls(**kwargs)
+        columns = [df[f].to_numpy() for f in cls.CANDLE_FIELDS]
+        keys = df['datetime'].to_numpy() if 'datetime' in df else range(len(df))
+        for key, *values in zip(keys, *columns):
+            engine.append(dict(zip(cls.CANDLE_FIELDS, map(float, values))), key=key)
+        return engine
+    
+    def _close_at(self, back):
+        """back개 이전 캔들의 종가 (0이면 마지막 캔들)"""
+        return self._closes[(self.count - 1 - back) % self.capacity]
+    
+    def update(self, candle, key=None):
+        """캔들 시각(key)을 보고 새 캔들이면 추가, 마지막 캔들과 같으면 갱신"""
+        if key is None:
+            key = candle.get('candle_date_time_utc', candle.get('datetime'))
+        if self.count and key == self.last_key:
+            self.revise(candle)
+        else:
+            self.append(candle, key=key)
+    
+    def append(self, candle, key=None):
+        """새 캔들 추가"""
+        close = float(candle['trade_price'])
+        i = self.count
+        
+        # 이동평균/표준편차 창: 새 값 추가, 창을 벗어난 값 제거
+        for w, window in self._windows.items():
+            window.add(close)
+            if i >= w:
+                window.remove(self._closes[(i - w) % self.capacity])
+        
+        # RSI: 첫 캔들의 변화량은 pandas와 같이 0으로 취급
+        prev_close = self._closes[(i - 1) % self.capacity] if i else close
+        self._push_delta(i, close - prev_close if i else 0.0)
+        
+        self._same_run = self._same_run + 1 if i and close == prev_close else 1
+        self._closes[i % self.capacity] = close
+        self.count += 1
+        self.last_key = key
+        
+        if self.recenter_interval and self.count % self.recenter_interval == 0:
+            for w, window in self._windows.items():
+                window.recenter([self._close_at(b) for b in range(min(w, self.count) - 1, -1, -1)])
+        
+        # EMA: 마지막 캔들 반영 전 상태를 보관
+        self._prev_emas = self._emas
+        self._emas = self._next_emas(self._prev_emas, close)
+        
+        self._candles = (self._candles + [self._candle_values(candle)])[-2:]
+        self._prev = self._current
+        self._current = self._values()
+    
+    def revise(self, candle):
+        """아직 진행 중인 마지막 캔들 갱신"""
+        if not self.count:
+            raise ValueError("갱신할 캔들이 없습니다.")
+        close = float(candle['trade_price'])
+        i = self.count - 1
+        old = self._closes[i % self.capacity]
+        
+        if close != old:
+            for window in self._windows.values():
+                window.replace(old, close)
+            prev_close = self._closes[(i - 1) % self.capacity] if i else close
+            self._replace_delta(i, close - prev_close if i else 0.0)
+            if i and close == prev_close:
+                self._same_run = self._run_length_before(i) + 1
+            else:
+                self._same_run = 1
+            self._closes[i % self.capacity] = close
+            self._emas = self._next_emas(self._prev_emas, close)
+        
+        self._candles[-1] = self._candle_values(candle)
+        self._current = self._values()
+    
+    def _run_length_before(self, i):
+        """i번째 캔들 직전까지 같은 종가가 연속된 횟수"""
+        run = 1
+        value = self._closes[(i - 1) % self.capacity]
+        while run < min(i, self.capacity - 1) and self._closes[(i - 1 - run) % self.capacity] == value:
+            run += 1
+        return run
+    
+    def _push_delta(self, i, delta):
+        slot = i % len(self._gains)
+        if i >= RSI_WINDOW:
+            old_slot = (i - RSI_WINDOW) % len(self._gains)
+            self._remove_gain_loss(self._gains[old_slot], self._losses[old_slot])
+        gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta if delta < 0 else 0.0)
+        self._gains[slot], self._losses[slot] = gain, loss
+        self._add_gain_loss(gain, loss)
+    
+    def _replace_delta(self, i, delta):
+        slot = i % len(self._gains)
+        self._remove_gain_loss(self._gains[slot], self._losses[slot])
+        gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta if delta < 0 else 0.0)
+        self._gains[slot], self._losses[slot] = gain, loss
+        self._add_gain_loss(gain, loss)
+    
+    def _add_gain_loss(self, gain, loss):
+        if gain:
+            self._gain_sum.add(gain)
+            self._gain_count += 1
+        if loss:
+            self._loss_sum.add(loss)
+            self._loss_count += 1
+    
+    def _remove_gain_loss(self, gain, loss):
+        if gain:
+            self._gain_sum.add(-gain)
+            self._gain_count -= 1
+            if not self._gain_count:
+                self._gain_sum.reset()
+        if loss:
+            self._loss_sum.add(-loss)
+            self._loss_count -= 1
+            if not self._loss_count:
+                self._loss_sum.reset()
+    
+    def _next_emas(self, emas, close):
+        fast = self._ema_fast.next(emas[0], close)
+        slow = self._ema_slow.next(emas[1], close)
+        signal = self._ema_signal.next(emas[2], fast - slow)
+        return fast, slow, signal
+    
+    def _candle_values(self, candle):
+        return {f: float(candle[f]) for f in self.CANDLE_FIELDS if f in candle}
+    
+    def _values(self):
+        """마지막 캔들 기준 지표값"""
+        close = self._close_at(0)
+        values = {'trade_price': close}
+        for w, window in self._windows.items():
+            if self._same_run >= w and window.count >= w:
+                values[f'ma{w}'] = close
+            else:
+                values[f'ma{w}'] = window.mean()
+        
+        window = self._windows[BB_WINDOW]
+        std = 0.0 if self._same_run >= BB_WINDOW and window.count >= BB_WINDOW else window.std()
+        ma = values[f'ma{BB_WINDOW}']
+        values['upper_band'] = ma + std * 2
+        values['lower_band'] = ma - std * 2
+        
+        if self.count >= RSI_WINDOW:
+            avg_gain = self._gain_sum.value() / RSI_WINDOW if self._gain_count else 0.0
+            avg_loss = self._loss_sum.value() / RSI_WINDOW if self._loss_count else 0.0
+            rs = _divide(avg_gain, avg_loss)
+            values['rsi'] = 100 - _divide(100, 1 + rs) if rs == rs else NAN
+        else:
+            values['rsi'] = NAN
+        
+        fast, slow, signal = self._emas
+        values['macd'] = fast - slow
+        values['macd_signal'] = signal
+        values['macd_hist'] = values['macd'] - signal
+        return values
+    
+    def indicators(self):
+        """마지막 캔들의 지표값 dict (calculate_indicators 컬럼명과 같음)"""
+        return dict(self._current) if self._current else {}
+    
+    def trend(self):
+        """
+        DataAnalyzer.analyze_trend와 같은 구조의 추세 분석 결과
+        
+        'ma'에는 유지 중인 모든 이동평균 창의 마지막 값이 {창: 값}으로 들어 있다.
+        """
+        if self.count < 2:
+            raise ValueError("추세 분석에는 캔들이 2개 이상 필요합니다.")
+        latest = self._current
+        prev = self._prev
+        price = latest['trade_price']
+        
+        return {
+            'current_price': price,
+            'price_change': price - prev['trade_price'],
+            'ma_trend': {
+                'above_ma5': price > latest['ma5'],
+                'above_ma20': price > latest['ma20'],
+                'above_ma60': price > latest['ma60'],
+                'ma5_above_ma20': latest['ma5'] > latest['ma20'],
+                'ma20_above_ma60': latest['ma20'] > latest['ma60'],
+            },
+            'ma': {w: latest[f'ma{w}'] for w in self._windows},
+            'bb_position': _divide(price - latest['lower_band'], latest['upper_band'] - latest['lower_band']),
+            'rsi': latest['rsi'],
+            'macd': {
+                'macd': latest['macd'],
+                'signal': latest['macd_signal'],
+                'hist': latest['macd_hist'],
+                'bullish_crossover': prev['macd'] < prev['macd_signal'] and latest['macd'] > latest['macd_signal'],
+                'bearish_crossover': prev['macd'] > prev['macd_signal'] and latest['macd'] < latest['macd_signal'],
+            },
+            'candle_data': pd.DataFrame(self._candles)  # 변동성 돌파 목표가 계산용 최근 2개 캔들
+        }
@@ -0,0 +1,483 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl, urlencode, unquote
+
+import jwt
+
+from src.candle_history import floor_time, unit_delta
+
+# 시장가 주문 수수료율
+FEE_RATE = 0.0005
+
+DEFAULT_PRICES = {
+    'KRW-BTC': 50000000.0, 'KRW-ETH': 3000000.0, 'KRW-XRP': 700.0, 'KRW-BCH': 400000.0,
+    'KRW-EOS': 1000.0, 'KRW-TRX': 100.0, 'KRW-ADA': 500.0, 'KRW-LTC': 100000.0,
+    'KRW-LINK': 20000.0, 'KRW-DOT': 9000.0,
+}
+
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class MockUpbitExchange:
+    """
+    모의 거래소 상태
+    
+    합성 시세(시각에 대해 결정적인 가격 경로) 또는 CandleStore에 기록된 캔들로 시세를 제공하고,
+    시장가 주문을 현재가로 즉시 체결해 잔고를 갱신한다. fill_delay를 지정하면 주문 조회 결과는
+    그 시간 동안 체결 전('wait') 상태로 보인다.
+    """
+    
+    def __init__(self, access_key="mock-access-key", secret_key="mock-secret-key-for-local-testing-only",
+                 prices=None, krw_balance=10000000.0, candle_store=None, seed=0, fill_delay=0.0):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.base_prices = dict(prices or DEFAULT_PRICES)
+        self.candle_store = candle_store
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.balances = {'KRW': {'balance': float(krw_balance), 'avg_buy_price': 0.0}}
+        self.orders = {}
+        self.fill_delay = fill_delay
+        self._fill_times = {}  # 주문 uuid -> 주문 조회에 체결로 보이기 시작하는 시각
+        self.used_nonces = set()
+    
+    # ----- 시세 -----
+    
+    def _noise(self, market, key):
+        digest = hashlib.sha256(f"{self.seed}:{market}:{key}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64 - 0.5
+    
+    def price_at(self, market, t):
+        """시각 t(UTC epoch 초)의 합성 가격"""
+        base = self.base_prices[market]
+        phase = self._noise(market, 'phase') * 2 * math.pi
+        log_move = (0.08 * math.sin(2 * math.pi * t / (86400 * 7) + phase)
+                    + 0.02 * math.sin(2 * math.pi * t / 86400 + 2 * phase)
+                    + 0.004 * math.sin(2 * math.pi * t / 3600 + 3 * phase)
+                    + 0.002 * self._noise(market, int(t) // 60))
+        return base * math.exp(log_move)
+    
+    def current_price(self, market):
+        return self.price_at(market, time.time())
+    
+    def make_candle(self, market, unit, start):
+        """시작 시각 start(UTC datetime)의 합성 캔들"""
+        delta = unit_delta(unit)
+        t0 = start.timestamp()
+        t1 = min((start + delta).timestamp(), time.time())
+        opening = self.price_at(market, t0)
+        closing = self.price_at(market, t1)
+        spread = abs(self._noise(market, f"range:{unit}:{int(t0)}")) * 0.01
+        volume = (abs(self._noise(market, f"vol:{unit}:{int(t0)}")) + 0.1) * delta.total_seconds() / 60
+        candle = {
+            'market': market,
+            'candle_date_time_utc': start.strftime(_TIME_FORMAT),
+            'candle_date_time_kst': (start + timedelta(hours=9)).strftime(_TIME_FORMAT),
+            'opening_price': opening,
+            'high_price': max(opening, closing) * (1 + spread),
+            'low_price': min(opening, closing) * (1 - spread),
+            'trade_price': closing,
+            'timestamp': int(t1 * 1000),
+            'candle_acc_trade_price': volume * closing,
+            'candle_acc_trade_volume': volume,
+        }
+        if unit != 'day':
+            candle['unit'] = int(unit)
+        return candle
+    
+    def candles(self, market, unit, count, to=None):
+        """to(exclusive) 이전 캔들 count개 (최신순)"""
+        delta = unit_delta(unit)
+        end = to or floor_time(datetime.now(timezone.utc), unit) + delta
+        
+        if self.candle_store is not None:
+            recorded = self.candle_store.get_candles(market, unit, count=count, until=end)
+            if len(recorded):
+                return recorded.iloc[::-1].to_dict('records')
+        
+        start = floor_time(end - timedelta(seconds=1), unit)  # to 이전에 시작하는 마지막 캔들
+        return [self.make_candle(market, unit, start - delta * i) for i in range(count)]
+    
+    def ticker(self, market):
+        price = self.current_price(market)
+        today = floor_time(datetime.now(timezone.utc), 'day')
+        opening = self.price_at(market, today.timestamp())
+        return {
+            'market': market,
+            'trade_price': price,
+            'opening_price': opening,
+            'high_price': max(price, opening),
+            'low_price': min(price, opening),
+            'prev_closing_price': opening,
+            'change': 'RISE' if price > opening else 'FALL' if price < opening else 'EVEN',
+            'signed_change_rate': (price - opening) / opening,
+            'timestamp': int(time.time() * 1000),
+        }
+    
+    def orderbook(self, market):
+        price = self.current_price(market)
+        units = [
+            {'ask_price': price * (1 + 0.0005 * (i + 1)), 'bid_price': price * (1 - 0.0005 * (i + 1)),
+             'ask_size': 1.0 + i, 'bid_size': 1.0 + i}
+            for i in range(15)
+        ]
+        return {
+            'market': market,
+            'timestamp': int(time.time() * 1000),
+            'total_ask_size': sum(u['ask_size'] for u in units),
+            'total_bid_size': sum(u['bid_size'] for u in units),
+            'orderbook_units': units,
+        }
+    
+    # ----- 계좌/주문 -----
+    
+    def accounts(self):
+        with self.lock:
+            return [
+                {
+                    'currency': currency,
+                    'balance': f"{info['balance']:.8f}",
+                    'locked': '0',
+                    'avg_buy_price': f"{info['avg_buy_price']:.8f}",
+                    'avg_buy_price_modified': False,
+                    'unit_currency': 'KRW',
+                }
+                for currency, info in self.balances.items()
+                if currency == 'KRW' or info['balance'] > 0
+            ]
+    
+    def place_market_order(self, market, side, price=None, volume=None):
+        """시장가 주문 즉시 체결 (실패 시 (None, 오류 dict))"""
+        currency = market.split('-')[1]
+        fill_price = self.current_price(market)
+        with self.lock:
+            krw = self.balances['KRW']
+            if side == 'bid':
+                funds = float(price)
+                fee = funds * FEE_RATE
+                if funds < 5000:
+                    return None, {'name': 'under_min_total_bid', 'message': '최소주문금액 이상으로 주문해주세요'}
+                if funds + fee > krw['balance']:
+                    return None, {'name': 'insufficient_funds_bid', 'message': '주문가능한 금액(KRW)이 부족합니다.'}
+                executed = funds / fill_price
+                holding = self.balances.setdefault(currency, {'balance': 0.0, 'avg_buy_price': 0.0})
+                total_cost = holding['balance'] * holding['avg_buy_price'] + funds
+                holding['balance'] += executed
+                holding['avg_buy_price'] = total_cost / holding['balance']
+                krw['balance'] -= funds + fee
+            else:
+                executed = float(volume)
+                holding = self.balances.get(currency)
+                if holding is None or executed > holding['balance'] + 1e-8:
+                    return None, {'name': 'insufficient_funds_ask', 'message': '주문가능한 금액이 부족합니다.'}
+                funds = executed * fill_price
+                fee = funds * FEE_RATE
+                holding['balance'] -= executed
+                if holding['balance'] < 1e-8:  # 소수점 8자리 미만 잔량 정리
+                    holding['balance'] = 0.0
+                    holding['avg_buy_price'] = 0.0
+                krw['balance'] += funds - fee
+            
+            created_at = datetime.now(timezone(timedelta(hours=9))).isoformat(timespec='seconds')
+            order = {
+                'uuid': str(uuid.uuid4()),
+                'side': side,
+                'ord_type': 'price' if side == 'bid' else 'market',
+                'price': str(price) if price is not None else None,
+                'state': 'done',
+                'market': market,
+                'created_at': created_at,
+                'volume': str(volume) if volume is not None else None,
+                'remaining_volume': '0',
+                'reserved_fee': f"{fee:.8f}",
+                'remaining_fee': '0',
+                'paid_fee': f"{fee:.8f}",
+                'locked': '0',
+                'executed_volume': f"{executed:.8f}",
+                'trades_count': 1,
+                'trades': [{
+                    'market': market,
+                    'uuid': str(uuid.uuid4()),
+                    'price': f"{fill_price:.8f}",
+                    'volume': f"{executed:.8f}",
+                    'funds': f"{funds:.8f}",
+                    'side': side,
+                    'created_at': created_at,
+                }],
+            }
+            self.orders[order['uuid']] = order
+            self._fill_times[order['uuid']] = time.monotonic() + self.fill_delay
+            summary = {k: v for k, v in order.items() if k != 'trades'}
+            return summary, None
+    
+    def get_order(self, order_uuid):
+        with self.lock:
+            order = self.orders.get(order_uuid)
+            if order is None or time.monotonic() >= self._fill_times[order_uuid]:
+                return order
+            return {**order, 'state': 'wait', 'executed_volume': '0', 'paid_fee': '0',
+                    'trades_count': 0, 'trades': []}
+    
+    def verify_token(self, authorization, query):
+        """JWT 인증 헤더 검증 (실패 시 오류 dict 반환)"""
+        if not authorization or not authorization.startswith('Bearer '):
+            return {'name': 'jwt_verification', 'message': '잘못된 엑세스 키입니다.'}
+        try:
+            payload = jwt.decode(authorization[len('Bearer '):], self.secret_key, algorithms=['HS256'])
+        except jwt.PyJWTError:
+            return {'name': 'jwt_verification', 'message': 'Jwt 토큰 검증에 실패했습니다.'}
+        if payload.get('access_key') != self.access_key:
+            return {'name': 'invalid_access_key', 'message': '잘못된 엑세스 키입니다.'}
+        
+        nonce = payload.get('nonce')
+        with self.lock:
+            if not nonce or nonce in self.used_nonces:
+                return {'name': 'invalid_query_payload', 'message': '이미 요청한 nonce값이 다시 전송되었습니다.'}
+            self.used_nonces.add(nonce)
+        
+        if query:
+            query_string = unquote(urlencode(query, doseq=True)).encode('utf-8')
+            if payload.get('query_hash') != hashlib.sha512(query_string).hexdigest():
+                return {'name': 'invalid_query_payload', 'message': 'query_hash가 일치하지 않습니다.'}
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockUpbit/1.0"
+    
+    def log_message(self, format, *args):
+        pass  # 부하 테스트 중 콘솔 출력 방지
+    
+    def _send(self, status, body, group='default'):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Remaining-Req', f"group={group}; min=1800; sec={self.server.remaining(group)}")
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _error(self, status, name, message, group='default'):
+        self._send(status, {'error': {'name': name, 'message': message}}, group)
+    
+    def _inject_faults(self, group):
+        """지연 및 429/5xx 오류 주입 (오류를 보냈으면 True)"""
+        config = self.server.config
+        delay = config['latency'] + random.uniform(0, config['jitter'])
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < config['error_429_rate']:
+            self._error(429, 'too_many_requests', 'Too many API requests.', group)
+            return True
+        if random.random() < config['error_5xx_rate']:
+            self._error(random.choice((500, 502, 503)), 'server_error', 'Internal server error', group)
+            return True
+        return False
+    
+    def _markets(self, query):
+        exchange = self.server.exchange
+        markets = [m for m in query.get('markets', '').split(',') if m]
+        if not markets or any(m not in exchange.base_prices for m in markets):
+            return None
+        return markets
+    
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        pairs = parse_qsl(parsed.query)
+        query = dict(pairs)
+        exchange = self.server.exchange
+        private = path in ('/v1/accounts', '/v1/order')
+        group = 'default' if private else path.split('/')[2] if path.count('/') >= 2 else 'market'
+        
+        if self._inject_faults(group):
+            return
+        
+        if private:
+            error = exchange.verify_token(self.headers.get('Authorization'), pairs)
+            if error:
+                return self._send(401, {'error': error}, group)
+        
+        if path == '/v1/accounts':
+            return self._send(200, exchange.accounts(), group)
+        
+        if path == '/v1/order':
+            order = exchange.get_order(query.get('uuid'))
+            if order is None:
+                return self._error(404, 'order_not_found', '주문을 찾지 못했습니다.', group)
+            return self._send(200, order, group)
+        
+        if path == '/v1/market/all':
+            return self._send(200, [
+                {'market': m, 'korean_name': m.split('-')[1], 'english_name': m.split('-')[1]}
+                for m in exchange.base_prices
+            ], group)
+        
+        if path in ('/v1/ticker', '/v1/orderbook'):
+            markets = self._markets(query)
+            if markets is None:
+                return self._error(404, '404', 'Code not found', group)
+            build = exchange.ticker if path == '/v1/ticker' else exchange.orderbook
+            return self._send(200, [build(m) for m in markets], group)
+        
+        if path.startswith('/v1/candles/'):
+            market = query.get('market')
+            if market not in exchange.base_prices:
+                return self._error(404, '404', 'Code not found', group)
+            if path == '/v1/candles/days':
+                unit = 'day'
+            elif path.startswith('/v1/candles/minutes/'):
+                unit = int(path.rsplit('/', 1)[1])
+            else:
+                return self._error(404, '404', 'Not found', group)
+            count = min(int(query.get('count', 1)), 200)
+            to = query.get('to')
+            if to:
+                to = datetime.fromisoformat(to.replace('Z', '+00:00').replace(' ', 'T'))
+                if to.tzinfo is None:
+                    to = to.replace(tzinfo=timezone.utc)
+            return self._send(200, exchange.candles(market, unit, count, to or None), group)
+        
+        self._error(404, '404', 'Not found', group)
+    
+    def do_POST(self):
+        path = urlparse(self.path).path
+        exchange = self.server.exchange
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        
+        if self._inject_faults('order'):
+            return
+        if path != '/v1/orders':
+            return self._error(404, '404', 'Not found', 'order')
+        
+        error = exchange.verify_token(self.headers.get('Authorization'), list(body.items()))
+        if error:
+            return self._send(401, {'error': error}, 'order')
+        
+        market = body.get('market')
+        if market not in exchange.base_prices:
+            return self._error(400, 'market_does_not_exist', '마켓이 존재하지 않습니다.', 'order')
+        side, ord_type = body.get('side'), body.get('ord_type')
+        if side == 'bid' and ord_type == 'price' and body.get('price'):
+            order, error = exchange.place_market_order(market, 'bid', price=body['price'])
+        elif side == 'ask' and ord_type == 'market' and body.get('volume'):
+            order, error = exchange.place_market_order(market, 'ask', volume=body['volume'])
+        else:
+            return self._error(400, 'invalid_parameter', '잘못된 주문 파라미터입니다.', 'order')
+        
+        if error:
+            return self._send(400, {'error': error}, 'order')
+        self._send(201, order, 'order')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address, exchange, config):
+        super().__init__(address, _Handler)
+        self.exchange = exchange
+        self.config = config
+        self._windows = {}
+        self._windows_lock = threading.Lock()
+    
+    def remaining(self, group):
+        """그룹별 현재 1초 구간에 남은 요청 수 (Remaining-Req 헤더용)"""
+        limit = self.config['rate_limits'].get(group, 10)
+        second = int(time.time())
+        with self._windows_lock:
+            window, used = self._windows.get(group, (second, 0))
+            if window != second:
+                used = 0
+            used += 1
+            self._windows[group] = (second, used)
+        return max(0, limit - used)
+
+
+class MockUpbitServer:
+    """
+    오프라인 부하/지연 테스트용 모의 업비트 REST 서버
+    
+    accounts, ticker, orderbook, 분/일 캔들, 주문 생성, 주문 조회 엔드포인트를 제공한다.
+    지연(latency + 0~jitter초)과 429/5xx 오류를 지정한 비율로 주입할 수 있다.
+    
+    사용 예:
+        with MockUpbitServer(latency=0.02, error_429_rate=0.01) as server:
+            api = UpbitAPI(server.exchange.access_key, server.exchange.secret_key, base_url=server.url)
+    """
+    
+    def __init__(self, host="127.0.0.1", port=0, exchange=None, latency=0.0, jitter=0.0,
+                 error_429_rate=0.0, error_5xx_rate=0.0, rate_limits=None):
+        self.exchange = exchange or MockUpbitExchange()
+        self.config = {
+            'latency': latency,
+            'jitter': jitter,
+            'error_429_rate': error_429_rate,
+            'error_5xx_rate': error_5xx_rate,
+            'rate_limits': rate_limits or {'default': 30, 'order': 8},
+        }
+        self._server = _Server((host, port), self.exchange, self.config)
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Upbit REST server")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--access-key", type=str, default="mock-access-key")
+    parser.add_argument("--secret-key", type=str, default="mock-secret-key-for-local-testing-only")
+    parser.add_argument("--krw", type=float, default=10000000.0, help="초기 원화 잔고")
+    parser.add_argument("--store", type=str, help="기록된 캔들을 제공할 CandleStore 경로")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 랜덤 지연 최대값 (초)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="5xx 응답 비율 (0~1)")
+    args = parser.parse_args()
+    
+    store = None
+    if args.store:
+        from src.candle_store import CandleStore
+        store = CandleStore(args.store)
+    
+    exchange = MockUpbitExchange(args.access_key, args.secret_key, krw_balance=args.krw, candle_store=store)
+    server = MockUpbitServer(args.host, args.port, exchange, latency=args.latency, jitter=args.jitter,
+                             error_429_rate=args.error_429, error_5xx_rate=args.error_5xx)
+    print(f"Mock Upbit 서버 실행 중: {server.url} (UPBIT_API_URL={server.url} 로 연결)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
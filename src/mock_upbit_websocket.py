@@ -0,0 +1,133 @@
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+
+class MockUpbitWebSocketServer:
+    """
+    테스트용 업비트 WebSocket 시세 서버
+    
+    클라이언트가 보낸 구독 메시지의 채널과 마켓에 맞춰 합성 ticker/trade/orderbook
+    이벤트를 interval 간격으로 보낸다. push()로 원하는 이벤트를 직접 보내거나
+    drop_connections()로 연결을 끊어 재연결 동작을 확인할 수 있다.
+    
+    사용 예:
+        async with MockUpbitWebSocketServer(prices={'KRW-BTC': 50000000}) as server:
+            ws = UpbitWebSocket(['KRW-BTC'], url=server.url)
+    """
+    
+    def __init__(self, host="127.0.0.1", port=0, prices=None, interval=0.1, volatility=0.001, seed=None):
+        self.host = host
+        self.port = port
+        self.prices = dict(prices or {'KRW-BTC': 50000000.0})
+        self.interval = interval
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self._server = None
+        self._subscriptions = {}  # 연결 -> [(채널, 마켓 목록)]
+    
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+    
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def drop_connections(self):
+        """연결된 모든 클라이언트 연결 종료"""
+        for connection in list(self._subscriptions):
+            await connection.close()
+    
+    async def push(self, event):
+        """해당 채널/마켓을 구독한 모든 클라이언트에 이벤트 전송"""
+        payload = json.dumps(event).encode('utf-8')
+        for connection, subscriptions in list(self._subscriptions.items()):
+            for channel, codes in subscriptions:
+                if channel == event.get('type') and event.get('code') in codes:
+                    try:
+                        await connection.send(payload)
+                    except websockets.ConnectionClosed:
+                        pass
+                    break
+    
+    def _next_price(self, market):
+        price = self.prices.get(market, 10000.0)
+        price *= 1 + self.random.gauss(0, self.volatility)
+        self.prices[market] = price
+        return price
+    
+    def make_event(self, channel, market):
+        """합성 시세 이벤트 생성"""
+        price = self._next_price(market)
+        now = int(time.time() * 1000)
+        if channel == 'ticker':
+            return {
+                'type': 'ticker', 'code': market, 'trade_price': price,
+                'opening_price': price, 'high_price': price, 'low_price': price,
+                'trade_volume': self.random.random(), 'timestamp': now, 'stream_type': 'REALTIME',
+            }
+        if channel == 'trade':
+            return {
+                'type': 'trade', 'code': market, 'trade_price': price,
+                'trade_volume': self.random.random(),
+                'ask_bid': self.random.choice(('ASK', 'BID')),
+                'trade_timestamp': now, 'timestamp': now, 'stream_type': 'REALTIME',
+            }
+        units = [
+            {'ask_price': price * (1 + 0.0005 * (i + 1)), 'bid_price': price * (1 - 0.0005 * (i + 1)),
+             'ask_size': self.random.random(), 'bid_size': self.random.random()}
+            for i in range(15)
+        ]
+        return {
+            'type': 'orderbook', 'code': market, 'orderbook_units': units,
+            'total_ask_size': sum(u['ask_size'] for u in units),
+            'total_bid_size': sum(u['bid_size'] for u in units),
+            'timestamp': now, 'stream_type': 'REALTIME',
+        }
+    
+    async def _stream(self, connection):
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                for channel, codes in self._subscriptions.get(connection, []):
+                    for market in codes:
+                        event = self.make_event(channel, market)
+                        await connection.send(json.dumps(event).encode('utf-8'))
+        except websockets.ConnectionClosed:
+            pass
+    
+    async def _handler(self, connection):
+        streamer = None
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                # 새 구독 요청은 이전 구독을 대체
+                self._subscriptions[connection] = [
+                    (item['type'], list(item.get('codes', [])))
+                    for item in request if isinstance(item, dict) and 'type' in item
+                ]
+                if streamer is None and self.interval:
+                    streamer = asyncio.ensure_future(self._stream(connection))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if streamer is not None:
+                streamer.cancel()
+            self._subscriptions.pop(connection, None)
@@ -0,0 +1,138 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockWebhook/1.0"
+    
+    def log_message(self, format, *args):
+        pass  # 테스트 중 콘솔 출력 방지
+    
+    def _reply(self, status, text, headers=None):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        
+        config = server.config
+        delay = config['latency'] + random.uniform(0, config['jitter'])
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < config['error_429_rate']:
+            return self._reply(429, 'rate_limited', {'Retry-After': str(config['retry_after'])})
+        if random.random() < config['error_5xx_rate']:
+            return self._reply(500, 'internal_error')
+        
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._reply(400, 'invalid_payload')
+        if not isinstance(payload, dict) or not payload.get('text'):
+            return self._reply(400, 'no_text')
+        
+        with server.lock:
+            server.messages.append({'time': time.time(), **payload})
+        self._reply(200, 'ok')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address, config):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.messages = []
+        self.lock = threading.Lock()
+
+
+class MockWebhookServer:
+    """
+    슬랙 수신 웹훅(Incoming Webhook)을 흉내 내는 로컬 서버
+    
+    POST로 받은 JSON payload를 messages에 기록하고 슬랙처럼 200 'ok'로 응답한다.
+    지연(latency + 0~jitter초)과 429(Retry-After 포함)/500 응답을 지정한 비율로 주입할 수 있다.
+    
+    사용 예:
+        with MockWebhookServer(latency=2.0) as server:
+            notifier = SlackNotifier(server.url)
+            ...
+            print(server.messages)
+    """
+    
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_429_rate=0.0, error_5xx_rate=0.0, retry_after=1):
+        self.config = {
+            'latency': latency,
+            'jitter': jitter,
+            'error_429_rate': error_429_rate,
+            'error_5xx_rate': error_5xx_rate,
+            'retry_after': retry_after,
+        }
+        self._server = _Server((host, port), self.config)
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/services/mock"
+    
+    @property
+    def messages(self):
+        """받은 payload 목록 (받은 시각 'time' 포함)"""
+        with self._server.lock:
+            return list(self._server.messages)
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Slack webhook server")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 랜덤 지연 최대값 (초)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    args = parser.parse_args()
+    
+    server = MockWebhookServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                               error_429_rate=args.error_429, error_5xx_rate=args.error_5xx)
+    print(f"Mock 웹훅 서버 실행 중: {server.url} (--slack {server.url} 로 연결)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        for message in server.messages:
+            print(message.get('text'))
+
+
+if __name__ == "__main__":
+    main()
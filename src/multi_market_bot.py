@@ -0,0 +1,368 @@
+import asyncio
+import contextlib
+import time
+import traceback
+from datetime import datetime
+
+from src.async_upbit_api import AsyncUpbitAPI
+from src.candle_buffer import DELTA_COUNT, CandleFeed
+from src.data_analyzer import DataAnalyzer
+from src.notifier import SlackNotifier
+from src.event_scheduler import candle_unit, ma_windows
+from src.order_tracker import FINAL_STATES, AsyncOrderTracker, fill_price, order_fills
+from src.trading_bot import TradingBot, create_strategy, setup_logger
+from src.upbit_api import LatencyHistogram
+
+# TradingBot.execute_trade와 같은 매수 조건 (원화 잔액이 이보다 적으면 매수하지 않음)
+MIN_BALANCE = 10000
+
+# 업비트 최소 주문 금액
+MIN_ORDER = 5000
+
+
+class CashAllocator:
+    """
+    여러 마켓이 함께 쓰는 원화 잔액 배분기
+    
+    매수 주문 전에 reserve()로 금액을 예약하므로 동시에 매수하는 마켓들이 같은 잔액을 중복해서 쓰지 않는다.
+    마켓마다 그 시점의 사용 가능 금액(잔액 - 예약 금액)의 pct만큼 받으므로 백테스트의
+    backtest_portfolio와 같이 앞선 매수만큼 줄어든 잔액 기준으로 차례로 배분된다.
+    """
+    
+    def __init__(self, balance=0.0, min_balance=MIN_BALANCE, min_order=MIN_ORDER):
+        self.balance = float(balance)
+        self.reserved = 0.0
+        self.min_balance = min_balance
+        self.min_order = min_order
+        self._lock = asyncio.Lock()
+    
+    @property
+    def available(self):
+        return self.balance - self.reserved
+    
+    def update(self, balance):
+        """계좌 조회로 받은 원화 잔액 반영 (진행 중인 주문의 예약 금액은 유지)"""
+        self.balance = float(balance)
+    
+    async def reserve(self, pct):
+        """사용 가능 금액의 pct를 예약하고 예약 금액 반환 (매수 조건을 만족하지 않으면 0)"""
+        async with self._lock:
+            available = self.available
+            amount = available * pct
+            if available < self.min_balance or amount < self.min_order:
+                return 0.0
+            self.reserved += amount
+            return amount
+    
+    async def commit(self, amount, spent=None):
+        """체결된 주문의 예약 금액을 풀고 실제 지불 금액(spent, 없으면 예약 금액)을 잔액에서 차감"""
+        async with self._lock:
+            self.reserved -= amount
+            self.balance -= amount if spent is None else spent
+    
+    async def deposit(self, amount):
+        """매도 체결 금액을 잔액에 더함"""
+        async with self._lock:
+            self.balance += amount
+    
+    async def release(self, amount):
+        """주문이 실패한 예약 금액 반환"""
+        async with self._lock:
+            self.reserved -= amount
+
+
+class MarketState:
+    """
+    마켓별 전략과 포지션 상태
+    
+    포지션은 AsyncOrderTracker가 주문 체결 내역으로 제자리에서 갱신한다. order_seq는 주문을
+    시작하고 마칠 때마다 1씩 늘어나므로 홀수이면 주문 중이다.
+    """
+    
+    def __init__(self, market, strategy, api=None, logger=None):
+        self.market = market
+        self.currency = market.split('-')[1]
+        self.strategy = strategy
+        self.orders = AsyncOrderTracker(api, market, logger=logger)
+        self.position = self.orders.position
+        self.order_seq = 0
+        self.candles = CandleFeed(candle_unit(strategy), ma_windows=ma_windows(strategy))
+        self.last_trend = None
+    
+    @contextlib.contextmanager
+    def ordering(self):
+        """주문 중 표시 (그동안 시작된 계좌 조회 결과는 이 마켓 포지션과 원화 잔액을 덮어쓰지 않음)"""
+        self.order_seq += 1
+        try:
+            yield
+        finally:
+            self.order_seq += 1
+
+
+class MultiMarketBot:
+    """
+    하나의 이벤트 루프에서 여러 마켓을 거래하는 봇
+    
+    마켓마다 TradingBot.run과 같은 주기(분석 -> 신호 -> 주문)를 코루틴으로 실행한다.
+        - 시세/주문 요청은 하나의 AsyncUpbitAPI로 동시에 보내며, 요청 수 제한기는 프로세스 전체가 공유한다.
+        - 마켓별 시작 시점을 interval 안에서 고르게 나눠 요청이 한꺼번에 몰리지 않게 한다.
+        - 계좌 조회는 account_max_age초 동안 재사용하고, 동시에 요청한 마켓들은 한 번의 조회 결과를 같이 쓴다.
+        - 매수 금액은 CashAllocator가 하나의 원화 잔액에서 배분한다.
+        - 주문 후에는 마켓별 AsyncOrderTracker가 get_order로 체결을 확인해 포지션과 원화 잔액에 반영한다.
+    """
+    
+    # 슬랙 알림은 TradingBot과 같은 백그라운드 전송기로 전송
+    send_notification = TradingBot.send_notification
+    close_notifier = TradingBot.close_notifier
+    
+    def __init__(self, access_key, secret_key, markets, strategy=None, strategy_params=None,
+                 slack_webhook_url=None, max_concurrency=10, account_max_age=2.0, base_url=None):
+        if not markets:
+            raise ValueError("거래할 마켓이 없습니다.")
+        self.api = AsyncUpbitAPI(access_key, secret_key, max_concurrency=max_concurrency,
+                                 pool_size=max_concurrency, base_url=base_url)
+        self.analyzer = DataAnalyzer()
+        self.strategy_name = strategy if isinstance(strategy, str) else "combined"
+        self.strategy_params = strategy_params or {}
+        self.logger = setup_logger("multi_market_bot")
+        self.markets = {
+            market: MarketState(market, create_strategy(self.strategy_name, self.strategy_params),
+                                api=self.api, logger=self.logger)
+            for market in markets
+        }
+        self.cash = CashAllocator()
+        self.account_max_age = account_max_age
+        self.latency = LatencyHistogram()
+        self.slack_webhook_url = slack_webhook_url
+        self.notifier = SlackNotifier(slack_webhook_url, logger=self.logger) if slack_webhook_url else None
+        self._accounts_task = None
+        self._accounts_time = None
+    
+    async def notify(self, message, category='info'):
+        """슬랙 알림 (전송기 대기열에 넣기만 하므로 이벤트 루프를 막지 않음)"""
+        self.send_notification(message, category)
+    
+    async def _fetch_accounts(self):
+        # 조회하는 동안 주문이 있었던 마켓은 조회 결과가 체결 반영 전 값일 수 있음
+        seqs = {market: state.order_seq for market, state in self.markets.items()}
+        accounts = await self.api.get_accounts()
+        if not accounts:
+            self.logger.warning("계정 정보를 가져올 수 없습니다.")
+            return accounts
+        
+        balances = {account['currency']: account for account in accounts if isinstance(account, dict)}
+        settled = True
+        for market, state in self.markets.items():
+            if state.order_seq != seqs[market] or state.order_seq % 2:
+                # 주문 중이거나 조회 중에 체결이 반영된 마켓은 체결 내역으로 관리하는 포지션 유지
+                settled = False
+                continue
+            account = balances.get(state.currency)
+            if account and float(account['balance']) > 0:
+                state.position.update({
+                    'has_position': True,
+                    'volume': float(account['balance']),
+                    'avg_buy_price': float(account['avg_buy_price']),
+                })
+            else:
+                state.position.update({'has_position': False, 'volume': 0, 'avg_buy_price': 0})
+        if settled:
+            krw = balances.get('KRW')
+            self.cash.update(float(krw['balance']) if krw else 0.0)
+        self._accounts_time = time.monotonic()
+        return accounts
+    
+    async def refresh_accounts(self, force=False):
+        """
+        계좌 조회로 원화 잔액과 마켓별 포지션 갱신
+        
+        최근 account_max_age초 안에 조회했으면 다시 조회하지 않고, 조회 중이면 그 결과를 기다린다.
+        """
+        if self._accounts_task is not None and not self._accounts_task.done():
+            return await self._accounts_task
+        if (not force and self._accounts_time is not None
+                and time.monotonic() - self._accounts_time < self.account_max_age):
+            return None
+        self._accounts_task = asyncio.ensure_future(self._fetch_accounts())
+        return await self._accounts_task
+    
+    async def _fetch_candles(self, state, count):
+        """마켓 전략 캔들 단위의 최근 캔들 count개"""
+        if state.candles.unit == 'day':
+            return await self.api.get_day_candles(state.market, count=count)
+        return await self.api.get_minute_candles(state.market, unit=state.candles.unit, count=count)
+    
+    async def analyze_market(self, state):
+        """시장 분석 (TradingBot.analyze_market과 같은 캔들/지표)"""
+        try:
+            # 워밍업 이후에는 최근 캔들만 받아 마켓별 링버퍼와 증분 지표에 병합
+            if state.candles.needs_warmup or not state.candles.merge(await self._fetch_candles(state, DELTA_COUNT)):
+                state.candles.warm(await self._fetch_candles(state, state.candles.capacity))
+            
+            trend = state.candles.trend()
+            state.last_trend = trend
+            return trend
+        
+        except Exception as e:
+            self.logger.error(f"[{state.market}] 시장 분석 중 오류 발생: {e}")
+            return None
+    
+    async def execute_trade(self, state, signal, trend):
+        """거래 실행 (매수 금액은 공유 원화 잔액에서 배분)"""
+        current_price = trend['current_price']
+        
+        if signal == 'buy' and not state.position['has_position']:
+            amount = await self.cash.reserve(self.strategy_params.get("buy_amount_pct", 0.3))
+            if amount <= 0:
+                self.logger.warning(f"[{state.market}] 매수에 필요한 KRW가 부족합니다: {self.cash.available}")
+                return
+            with state.ordering():
+                await self._buy(state, amount, current_price)
+        
+        elif signal == 'sell' and state.position['has_position']:
+            with state.ordering():
+                await self._sell(state, current_price)
+    
+    async def _settle(self, state, order):
+        """
+        주문 체결을 확인해 포지션에 반영
+        
+        Returns:
+            (마지막으로 조회한 주문, 체결 내역 (수량, 금액, 수수료) - 계좌 조회로 맞췄으면 None)
+        """
+        last_reconcile = state.orders.last_reconcile
+        order = await state.orders.track(order)
+        volume, funds, fee = order_fills(order)
+        if order.get('state') in FINAL_STATES and (volume <= 0 or funds > 0):
+            return order, (volume, funds, fee)
+        # 체결 내역 대신 계좌 조회로 포지션을 맞춘 경우 (원화 잔액도 조회 결과 사용)
+        if state.orders.last_reconcile != last_reconcile:
+            self.cash.update(state.orders.krw_balance)
+        return order, None
+    
+    async def _buy(self, state, amount, current_price):
+        """예약한 amount원으로 시장가 매수 (체결 금액만 잔액에서 차감)"""
+        self.logger.info(f"[{state.market}] 매수 주문 실행: {amount} KRW (가격: {current_price})")
+        try:
+            result = await self.api.buy_market_order(state.market, amount)
+        except Exception as e:
+            result = {'error': str(e)}
+        
+        if not isinstance(result, dict) or 'error' in result:
+            await self.cash.release(amount)
+            error = result.get('error') if isinstance(result, dict) else result
+            self.logger.error(f"[{state.market}] 매수 주문 실패: {error}")
+            await self.notify(f"🚨 매수 주문 실패: {state.market} - {error}", "error")
+            return
+        
+        order, fills = await self._settle(state, result)
+        if fills is None:
+            await self.cash.release(amount)
+        else:
+            _, funds, fee = fills
+            await self.cash.commit(amount, funds + fee)
+        price = fill_price(order) or current_price
+        self.logger.info(f"[{state.market}] 매수 주문 성공: {order['uuid']} ({order.get('state')}), "
+                         f"체결가: {price}, 포지션: {state.position}")
+        await self.notify(f"🟢 매수 체결: {state.market} - {amount:,.0f}원 (가격: {price:,.0f}원)", "trade")
+    
+    async def _sell(self, state, current_price):
+        """보유 수량 전체 시장가 매도 (체결 금액을 잔액에 더함)"""
+        volume = state.position['volume']
+        avg_buy_price = state.position['avg_buy_price']
+        
+        self.logger.info(f"[{state.market}] 매도 주문 실행: {volume} {state.currency} (가격: {current_price})")
+        try:
+            result = await self.api.sell_market_order(state.market, volume)
+        except Exception as e:
+            result = {'error': str(e)}
+        
+        if not isinstance(result, dict) or 'error' in result:
+            error = result.get('error') if isinstance(result, dict) else result
+            self.logger.error(f"[{state.market}] 매도 주문 실패: {error}")
+            await self.notify(f"🚨 매도 주문 실패: {state.market} - {error}", "error")
+            return
+        
+        # 체결 확인 후 포지션 반영, 손익은 실제 체결가 기준
+        order, fills = await self._settle(state, result)
+        if fills is not None:
+            _, funds, fee = fills
+            await self.cash.deposit(funds - fee)
+        price = fill_price(order) or current_price
+        profit_pct = (price - avg_buy_price) / avg_buy_price * 100 if avg_buy_price else 0.0
+        self.logger.info(f"[{state.market}] 매도 주문 성공: {order['uuid']} ({order.get('state')}), "
+                         f"체결가: {price}, 손익: {profit_pct:.2f}%")
+        emoji = "🔴" if profit_pct < 0 else "🟢"
+        await self.notify(f"{emoji} 매도 체결: {state.market} - {volume} 개 "
+                          f"(가격: {price:,.0f}원, 손익: {profit_pct:.2f}%)", "trade")
+    
+    async def step(self, state):
+        """마켓 하나의 한 주기 (분석 -> 신호 -> 주문), 소요 시간은 마켓별 지연시간에 기록"""
+        start = time.perf_counter()
+        try:
+            await self.refresh_accounts()
+            trend = await self.analyze_market(state)
+            if trend is None:
+                return None
+            
+            current_price = trend['current_price']
+            avg_buy_price = state.position.get('avg_buy_price', 0)
+            current_time = datetime.now().time()
+            signal = state.strategy.generate_signal(trend, current_price, avg_buy_price, current_time)
+            self.logger.info(f"[{state.market}] 현재 가격: {current_price}, 생성된 신호: {signal}")
+            
+            await self.execute_trade(state, signal, trend)
+            return signal
+        finally:
+            self.latency.observe(state.market, time.perf_counter() - start)
+    
+    async def run_cycle(self):
+        """모든 마켓의 한 주기를 동시에 실행하고 {마켓: 신호 또는 예외} 반환"""
+        states = list(self.markets.values())
+        results = await asyncio.gather(*(self.step(state) for state in states), return_exceptions=True)
+        for state, result in zip(states, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"[{state.market}] 거래 주기 중 오류 발생: {result}")
+        return {state.market: result for state, result in zip(states, results)}
+    
+    async def _run_market(self, state, interval, offset):
+        await asyncio.sleep(offset)
+        while True:
+            start = time.monotonic()
+            try:
+                await self.step(state)
+            except Exception as e:
+                self.logger.error(f"[{state.market}] 거래 주기 중 오류 발생: {e}", exc_info=True)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+    
+    async def run(self, interval=60):
+        """모든 마켓을 interval초 주기로 실행 (취소될 때까지)"""
+        markets = ", ".join(self.markets)
+        self.logger.info(f"Multi-Market Bot 시작 - 마켓: {markets}, 전략: {self.strategy_name}")
+        await self.notify(f"🤖 Multi-Market Bot 시작 - 마켓 {len(self.markets)}개, 전략: {self.strategy_name}", "status")
+        
+        try:
+            await self.refresh_accounts(force=True)
+            spacing = interval / len(self.markets)
+            await asyncio.gather(*(
+                self._run_market(state, interval, i * spacing)
+                for i, state in enumerate(self.markets.values())
+            ))
+        
+        except asyncio.CancelledError:
+            self.logger.info("사용자에 의한 프로그램 종료")
+            await self.notify("🛑 사용자에 의한 Multi-Market Bot 종료", "status")
+        
+        except Exception as e:
+            error_msg = f"오류 발생: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            await self.notify(f"🚨 Multi-Market Bot 오류: {error_msg}\n{traceback.format_exc()}", "error")
+        
+        finally:
+            await self.api.close()
+            await asyncio.to_thread(self.close_notifier)
+            self.logger.info("Multi-Market Bot 종료")
+    
+    def get_latency_stats(self):
+        """마켓별 주기 소요 시간 통계"""
+        return self.latency.snapshot()
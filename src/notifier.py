@@ -0,0 +1,251 @@
+import collections
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# 종류별 최소 전송 간격 (초) - 간격 안에 들어온 같은 종류 알림은 한 메시지로 묶어 보냄
+DEFAULT_INTERVALS = {
+    'trade': 1.0,
+    'status': 1.0,
+    'error': 300.0,
+}
+DEFAULT_INTERVAL = 1.0
+
+# 슬랙 웹훅은 초당 1건 정도로 제한되므로 종류와 관계없이 전송 사이에 두는 간격 (초)
+MIN_POST_GAP = 1.0
+
+
+def retry_after_seconds(value, default=1.0):
+    """Retry-After 헤더 값(초 또는 HTTP 날짜)을 기다릴 시간(초)으로 변환 (해석할 수 없으면 default)"""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def format_digest(messages, max_lines=20):
+    """여러 알림을 한 메시지로 합침 (max_lines개까지 싣고 나머지는 건수만 표시)"""
+    if len(messages) == 1:
+        return messages[0]
+    lines = [f"📋 알림 {len(messages)}건"]
+    lines.extend(messages[:max_lines])
+    if len(messages) > max_lines:
+        lines.append(f"... 외 {len(messages) - max_lines}건")
+    return "\n".join(lines)
+
+
+class SlackNotifier:
+    """
+    백그라운드 스레드에서 슬랙 웹훅으로 알림을 보내는 전송기
+    
+    notify()는 대기열에 넣고 바로 반환하므로 매매 루프가 웹훅 응답을 기다리지 않는다.
+        - 종류(category)별로 intervals초에 한 번만 보내고, 그 사이에 들어온 같은 종류 알림은
+          batch_window초 동안 모은 뒤 다이제스트 한 건으로 보낸다 (알림이 버려지지 않음).
+        - 대기열은 max_queue건으로 제한하고, 가득 차면 가장 오래된 알림을 버린 뒤 버린 건수를
+          다음 메시지에 덧붙인다.
+        - 요청마다 timeout초 제한을 두고, 429 응답은 Retry-After만큼 미뤄 다시 보낸다.
+    
+    사용 예:
+        notifier = SlackNotifier(webhook_url)
+        notifier.notify("🟢 매수 체결: KRW-BTC", category='trade')
+        notifier.close()  # 종료 시 남은 알림 전송
+    """
+    
+    def __init__(self, webhook_url, username="TradingBot", icon_emoji=":chart_with_upwards_trend:",
+                 intervals=None, max_queue=1000, batch_window=0.5, timeout=5.0, max_lines=20,
+                 min_post_gap=MIN_POST_GAP, logger=None):
+        self.webhook_url = webhook_url
+        self.username = username
+        self.icon_emoji = icon_emoji
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.max_queue = max_queue
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_lines = max_lines
+        self.min_post_gap = min_post_gap
+        self.logger = logger
+        self.sent = 0  # 전송한 웹훅 요청 수
+        self.delivered = 0  # 전송한 알림 수 (다이제스트 안의 알림 포함)
+        self.dropped = 0
+        self.failed = 0
+        
+        self._queue = collections.deque()  # (종류, 메시지, 넣은 시각)
+        self._condition = threading.Condition()
+        self._pending = {}  # 종류 -> [(메시지, 넣은 시각)]
+        self._last_sent = {}  # 종류 -> 마지막 전송 시각
+        self._last_post = None
+        self._resume_at = None  # 429 응답 후 다시 보낼 수 있는 시각
+        self._unreported_drops = 0
+        self._closing = False
+        self._thread = None
+        self._session = requests.Session()
+    
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
+    
+    def start(self):
+        """전송 스레드 시작 (notify에서 자동으로 호출됨)"""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slack-notifier", daemon=True)
+                self._thread.start()
+        return self
+    
+    def notify(self, message, category='info'):
+        """
+        알림을 대기열에 넣고 바로 반환
+        
+        Returns:
+            대기열이 가득 차 가장 오래된 알림을 버렸으면 False
+        """
+        if self._thread is None:
+            self.start()
+        with self._condition:
+            if self._closing:
+                return False
+            accepted = True
+            if len(self._queue) + self._pending_count() >= self.max_queue:
+                self._drop_oldest()
+                accepted = False
+            self._queue.append((category, message, time.monotonic()))
+            self._condition.notify()
+        return accepted
+    
+    def _pending_count(self):
+        return sum(len(messages) for messages in self._pending.values())
+    
+    def _drop_oldest(self):
+        if self._queue:
+            self._queue.popleft()
+        else:
+            # 대기열이 비어 있으면 모으는 중인 알림 가운데 가장 오래된 것을 버림
+            category = min(self._pending, key=lambda c: self._pending[c][0][1])
+            self._pending[category].pop(0)
+            if not self._pending[category]:
+                del self._pending[category]
+        self.dropped += 1
+        self._unreported_drops += 1
+    
+    def _send_at(self, category, now):
+        """category 알림을 보낼 수 있는 시각"""
+        first = self._pending[category][0][1]
+        at = first + self.batch_window
+        last = self._last_sent.get(category)
+        if last is not None:
+            at = max(at, last + self.intervals.get(category, DEFAULT_INTERVAL))
+        if self._last_post is not None:
+            at = max(at, self._last_post + self.min_post_gap)
+        if self._resume_at is not None:
+            at = max(at, self._resume_at)
+        return now if self._closing else at
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    while self._queue:
+                        category, message, queued = self._queue.popleft()
+                        self._pending.setdefault(category, []).append((message, queued))
+                    if not self._pending:
+                        if self._closing:
+                            return
+                        self._condition.wait()
+                        continue
+                    now = time.monotonic()
+                    category = min(self._pending, key=lambda c: self._send_at(c, now))
+                    wait = self._send_at(category, now) - now
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                
+                messages = [message for message, _ in self._pending.pop(category)]
+                drops, self._unreported_drops = self._unreported_drops, 0
+            
+            try:
+                text = format_digest(messages, self.max_lines)
+                if drops:
+                    text += f"\n⚠️ 알림 대기열이 가득 차 {drops}건을 버렸습니다."
+                ok, retry_after = self._post(text)
+            except Exception as e:
+                # 예상하지 못한 오류로 전송 스레드가 멈추지 않도록 이번 묶음만 실패로 처리
+                self.failed += 1
+                self._log('error', f"슬랙 알림 전송 중 예상하지 못한 오류 발생: {e}")
+                ok, retry_after = False, None
+            
+            with self._condition:
+                now = time.monotonic()
+                self._last_post = now
+                self._last_sent[category] = now
+                if retry_after is not None and not self._closing:
+                    # 요청 제한: 같은 알림을 앞에 다시 넣고 Retry-After만큼 미룸
+                    queued = [(message, now) for message in messages]
+                    self._pending[category] = queued + self._pending.get(category, [])
+                    self._resume_at = now + retry_after
+                    self._unreported_drops += drops
+                elif ok:
+                    self.delivered += len(messages)
+                elif retry_after is not None:
+                    self.failed += 1  # 종료 중이라 다시 보내지 않음
+    
+    def _post(self, text):
+        """
+        웹훅 전송
+        
+        Returns:
+            (성공 여부, 429 응답이면 다시 보낼 때까지 기다릴 시간(초) 아니면 None)
+        """
+        payload = {
+            "text": text,
+            "username": self.username,
+            "icon_emoji": self.icon_emoji,
+        }
+        try:
+            response = self._session.post(self.webhook_url, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self.failed += 1
+            self._log('error', f"슬랙 알림 전송 중 오류 발생: {e}")
+            return False, None
+        
+        if response.status_code == 429:
+            self._log('warning', "슬랙 알림 요청 제한에 걸려 잠시 후 다시 보냅니다.")
+            return False, retry_after_seconds(response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            self.failed += 1
+            self._log('error', f"슬랙 알림 전송 실패: {response.text}")
+            return False, None
+        self.sent += 1
+        return True, None
+    
+    def close(self, timeout=10.0):
+        """남은 알림을 바로 보내고 전송 스레드 종료 (최대 timeout초 대기)"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._session.close()
+    
+    def stats(self):
+        """전송 통계"""
+        with self._condition:
+            queued = len(self._queue) + self._pending_count()
+        return {
+            'sent': self.sent,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queued': queued,
+        }
@@ -0,0 +1,265 @@
+import asyncio
+import time
+
+from src.upbit_api import LatencyHistogram
+
+# 더 이상 체결되지 않는 주문 상태 (시장가 매수는 잔여 금액이 취소되어 'cancel'로 끝날 수 있음)
+FINAL_STATES = ('done', 'cancel')
+
+# 잔량이 이보다 작으면 보유하지 않은 것으로 봄 (업비트 수량은 소수점 8자리)
+DUST_VOLUME = 1e-8
+
+
+def empty_position():
+    """보유하지 않은 상태의 포지션 dict"""
+    return {'has_position': False, 'volume': 0, 'avg_buy_price': 0}
+
+
+def parse_accounts(accounts, currency):
+    """
+    계좌 조회 결과에서 (포지션, 원화 잔액) 추출
+    
+    Returns:
+        ({'has_position', 'volume', 'avg_buy_price'}, 원화 잔액), 계좌 정보가 올바르지 않으면 None
+    """
+    if not accounts or isinstance(accounts, str) or not isinstance(accounts, list):
+        return None
+    position = empty_position()
+    krw_balance = 0.0
+    for account in accounts:
+        if not isinstance(account, dict) or 'currency' not in account:
+            continue
+        if account['currency'] == 'KRW':
+            krw_balance = float(account['balance'])
+        elif account['currency'] == currency and float(account['balance']) > 0:
+            position['has_position'] = True
+            position['volume'] = float(account['balance'])
+            position['avg_buy_price'] = float(account['avg_buy_price'])
+    return position, krw_balance
+
+
+def order_fills(order):
+    """
+    주문 조회 결과의 체결 합계
+    
+    Returns:
+        (체결 수량, 체결 금액, 지불 수수료)
+    """
+    trades = order.get('trades') or []
+    volume = sum(float(trade['volume']) for trade in trades)
+    funds = sum(float(trade['funds']) for trade in trades)
+    if not trades:
+        volume = float(order.get('executed_volume') or 0)
+    return volume, funds, float(order.get('paid_fee') or 0)
+
+
+def fill_price(order):
+    """주문의 평균 체결가 (체결 수량이 없으면 None)"""
+    volume, funds, _ = order_fills(order)
+    return funds / volume if volume > 0 and funds > 0 else None
+
+
+class OrderTracker:
+    """
+    주문 체결 추적과 포지션/원화 잔액 관리 (마켓 하나)
+    
+    주문 후 get_order를 짧은 간격부터 늘려 가며(initial_delay x backoff, 최대 max_delay) 조회하고,
+    체결 내역으로 보유 수량, 평균 매수가, 원화 잔액을 직접 갱신한다. 계좌 전체 조회는
+    reconcile_interval초마다 한 번, 또는 체결 확인이 timeout초 안에 끝나지 않았을 때만 한다.
+    
+    position은 같은 dict를 제자리에서 갱신하므로 봇이 참조를 그대로 들고 있어도 된다.
+    평균 매수가는 업비트 계좌와 같이 수수료를 뺀 체결 금액 기준이다.
+    """
+    
+    def __init__(self, api, market, logger=None, initial_delay=0.05, max_delay=1.0, backoff=2.0,
+                 timeout=30.0, reconcile_interval=300.0):
+        self.api = api
+        self.market = market
+        self.currency = market.split('-')[1]
+        self.logger = logger
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+        self.reconcile_interval = reconcile_interval
+        self.position = empty_position()
+        self.krw_balance = 0.0
+        self.last_reconcile = None
+        self.latency = LatencyHistogram()  # 주문 후 체결 확인까지 걸린 시간
+    
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
+    
+    def reconcile(self):
+        """계좌 조회 결과로 포지션과 원화 잔액을 맞춤 (성공 여부 반환)"""
+        parsed = parse_accounts(self.api.get_accounts(), self.currency)
+        if parsed is None:
+            self._log('warning', "계정 정보를 가져올 수 없어 포지션을 맞추지 못했습니다.")
+            return False
+        position, self.krw_balance = parsed
+        self.position.update(position)
+        self.last_reconcile = time.monotonic()
+        return True
+    
+    def reconcile_due(self):
+        """마지막 계좌 조회 후 reconcile_interval초가 지났는지 (조회한 적이 없거나 실패했으면 True)"""
+        return self.last_reconcile is None or time.monotonic() - self.last_reconcile >= self.reconcile_interval
+    
+    def maybe_reconcile(self):
+        """주기가 되었을 때만 계좌 조회"""
+        if self.reconcile_due():
+            return self.reconcile()
+        return True
+    
+    def wait(self, order):
+        """
+        주문이 끝날 때까지 get_order 조회
+        
+        Returns:
+            마지막으로 조회한 주문 (timeout 안에 끝나지 않았으면 진행 중 상태 그대로)
+        """
+        uuid_value = order['uuid']
+        deadline = time.monotonic() + self.timeout
+        delay = self.initial_delay
+        while True:
+            result = self.api.get_order(uuid_value)
+            if isinstance(result, dict) and 'error' not in result:
+                order = result
+                if order.get('state') in FINAL_STATES:
+                    return order
+            else:
+                self._log('warning', f"주문 조회 실패: {result}")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return order
+            time.sleep(min(delay, remaining))
+            delay = min(self.max_delay, delay * self.backoff)
+    
+    def apply(self, order):
+        """
+        끝난 주문의 체결 내역을 포지션과 원화 잔액에 반영
+        
+        Returns:
+            반영했으면 True, 체결 금액을 알 수 없으면 False (계좌 조회 필요)
+        """
+        volume, funds, fee = order_fills(order)
+        if volume <= 0:
+            return True
+        if funds <= 0:
+            return False
+        
+        position = self.position
+        if order['side'] == 'bid':
+            total = position['volume'] + volume
+            position['avg_buy_price'] = (position['volume'] * position['avg_buy_price'] + funds) / total
+            position['volume'] = total
+            position['has_position'] = True
+            self.krw_balance -= funds + fee
+        else:
+            position['volume'] = max(0.0, position['volume'] - volume)
+            if position['volume'] < DUST_VOLUME:
+                position.update(empty_position())
+            self.krw_balance += funds - fee
+        return True
+    
+    def track(self, order):
+        """
+        주문 접수 결과(order)를 받아 체결을 확인하고 포지션에 반영
+        
+        timeout 안에 끝나지 않으면 체결 내역 대신 계좌 조회로 포지션을 맞춘다.
+        
+        Returns:
+            마지막으로 조회한 주문
+        """
+        started = time.perf_counter()
+        order = self.wait(order)
+        if order.get('state') not in FINAL_STATES:
+            self._log('warning', f"주문 체결을 {self.timeout}초 안에 확인하지 못해 계좌를 조회합니다: {order['uuid']}")
+            self.reconcile()
+        elif not self.apply(order):
+            self._log('warning', f"체결 내역이 없어 계좌를 조회합니다: {order['uuid']}")
+            self.reconcile()
+        else:
+            self.latency.observe('fill', time.perf_counter() - started)
+        return order
+
+
+class AsyncOrderTracker(OrderTracker):
+    """
+    OrderTracker의 asyncio 버전 (AsyncUpbitAPI 사용)
+    
+    체결 반영(apply)은 같고 주문 조회, 대기, 계좌 조회만 이벤트 루프를 막지 않는 코루틴이다.
+    """
+    
+    async def reconcile(self):
+        """계좌 조회 결과로 포지션과 원화 잔액을 맞춤 (성공 여부 반환)"""
+        try:
+            accounts = await self.api.get_accounts()
+        except Exception as e:
+            accounts = None
+            self._log('warning', f"계좌 조회 실패: {e}")
+        parsed = parse_accounts(accounts, self.currency)
+        if parsed is None:
+            self._log('warning', "계정 정보를 가져올 수 없어 포지션을 맞추지 못했습니다.")
+            return False
+        position, self.krw_balance = parsed
+        self.position.update(position)
+        self.last_reconcile = time.monotonic()
+        return True
+    
+    async def maybe_reconcile(self):
+        """주기가 되었을 때만 계좌 조회"""
+        if self.reconcile_due():
+            return await self.reconcile()
+        return True
+    
+    async def wait(self, order):
+        """
+        주문이 끝날 때까지 get_order 조회
+        
+        Returns:
+            마지막으로 조회한 주문 (timeout 안에 끝나지 않았으면 진행 중 상태 그대로)
+        """
+        uuid_value = order['uuid']
+        deadline = time.monotonic() + self.timeout
+        delay = self.initial_delay
+        while True:
+            try:
+                result = await self.api.get_order(uuid_value)
+            except Exception as e:
+                result = {'error': str(e)}
+            if isinstance(result, dict) and 'error' not in result:
+                order = result
+                if order.get('state') in FINAL_STATES:
+                    return order
+            else:
+                self._log('warning', f"주문 조회 실패: {result}")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return order
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(self.max_delay, delay * self.backoff)
+    
+    async def track(self, order):
+        """
+        주문 접수 결과(order)를 받아 체결을 확인하고 포지션에 반영
+        
+        timeout 안에 끝나지 않으면 체결 내역 대신 계좌 조회로 포지션을 맞춘다.
+        
+        Returns:
+            마지막으로 조회한 주문
+        """
+        started = time.perf_counter()
+        order = await self.wait(order)
+        if order.get('state') not in FINAL_STATES:
+            self._log('warning', f"주문 체결을 {self.timeout}초 안에 확인하지 못해 계좌를 조회합니다: {order['uuid']}")
+            await self.reconcile()
+        elif not self.apply(order):
+            self._log('warning', f"체결 내역이 없어 계좌를 조회합니다: {order['uuid']}")
+            await self.reconcile()
+        else:
+            self.latency.observe('fill', time.perf_counter() - started)
+        return order
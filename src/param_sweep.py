@@ -0,0 +1,297 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_engine import backtest_stats
+from src.dca_kernel import backtest_percentage
+from src.result_cache import data_fingerprint, result_key
+from src.trading_strategies import (
+    MACrossStrategy, RSIStrategy, MACDStrategy, BollingerBandStrategy,
+    VolatilityBreakoutStrategy, PercentageStrategy, CombinedStrategy
+)
+
+# backtest.py --strategy 이름과 같은 전략 등록표
+STRATEGIES = {
+    'ma': MACrossStrategy,
+    'rsi': RSIStrategy,
+    'macd': MACDStrategy,
+    'bb': BollingerBandStrategy,
+    'volatility': VolatilityBreakoutStrategy,
+    'percentage': PercentageStrategy,
+    'combined': CombinedStrategy,
+}
+
+# 전략별 기본 파라미터 격자
+DEFAULT_GRIDS = {
+    'ma': {'short_window': [3, 5, 10, 15], 'long_window': [20, 30, 60, 120]},
+    'rsi': {'oversold': [20, 25, 30, 35, 40], 'overbought': [60, 65, 70, 75, 80]},
+    'macd': {},
+    'bb': {},
+    'volatility': {'k': [round(0.1 * i, 1) for i in range(1, 10)]},
+    'percentage': {
+        'buy_pct': [0.05, 0.1, 0.15, 0.2, 0.25],
+        'sell_pct': [0.02, 0.03, 0.05, 0.08, 0.1],
+        'k': [round(0.1 * i, 1) for i in range(3, 8)],
+    },
+    'combined': {},
+}
+
+# 결과 순위 기준
+RANK_BY = 'total_return'
+
+
+def expand_grid(grid):
+    """{파라미터: 값 목록} 격자를 파라미터 dict 목록으로 펼침"""
+    if not grid:
+        return [{}]
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+class SharedFrame:
+    """
+    지표 데이터프레임의 숫자 컬럼을 공유 메모리에 올린 블록
+    
+    워커 프로세스는 spec으로 같은 메모리를 붙여 쓰므로 데이터프레임을 작업마다 피클링하지 않는다.
+    거래일 구분에 쓰는 datetime 컬럼은 초 단위 숫자로 마지막 열에 함께 올린다.
+    생성한 프로세스에서 close()로 해제해야 한다.
+    """
+    
+    def __init__(self, df):
+        columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+        data = df[columns].to_numpy(dtype=np.float64)
+        if 'datetime' in df:
+            seconds = df['datetime'].to_numpy().astype('datetime64[s]').astype(np.int64)
+            data = np.column_stack([data, seconds.astype(np.float64)])
+            columns.append('datetime')
+        self.shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        np.ndarray(data.shape, dtype=np.float64, buffer=self.shm.buf)[:] = data
+        self.spec = (self.shm.name, data.shape, columns)
+    
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_frame(spec):
+    """SharedFrame.spec으로 공유 메모리를 붙여 복사 없는 데이터프레임 생성"""
+    name, shape, columns = spec
+    shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    if columns and columns[-1] == 'datetime':
+        df = pd.DataFrame(data[:, :-1], columns=columns[:-1], copy=False)
+        df['datetime'] = data[:, -1].astype(np.int64).astype('datetime64[s]').astype('datetime64[ns]')
+        return shm, df
+    return shm, pd.DataFrame(data, columns=columns, copy=False)
+
+
+# 워커 프로세스별 공유 데이터프레임 {마켓: (공유 메모리, 데이터프레임)}
+_worker_frames = {}
+
+
+def _init_worker(specs):
+    for market, spec in specs.items():
+        _worker_frames[market] = attach_frame(spec)
+
+
+def _result_row(task, stats):
+    market, strategy_name, params, _ = task
+    result = {'market': market, 'strategy': strategy_name, **params}
+    result.update(
+        total_return=stats['total_return'],
+        final_capital=stats['final_capital'],
+        buy_count=stats['buy_count'],
+        sell_count=stats['sell_count'],
+    )
+    return result
+
+
+def sweep_evaluator(strategy):
+    """sweep_stats가 strategy에 쓰는 평가기 이름 (결과 캐시 키 구분용)"""
+    return 'dca' if isinstance(strategy, PercentageStrategy) else 'vector'
+
+
+def sweep_stats(df, strategy, initial_capital=1000000, window=None):
+    """
+    조합 하나의 백테스트 통계
+    
+    퍼센트 전략은 평균 매수가, 추가 매수(buy_pct), 매도(sell_pct)를 모두 반영하는
+    dca_kernel.backtest_percentage로, 나머지는 backtest_stats로 계산한다.
+    변동성 돌파 전략은 거래일(df['datetime'])마다 k로 목표가를 다시 정한다.
+    window=(start, stop)이면 신호는 df 전체에서 계산하고 그 구간에서만 거래한다.
+    """
+    if isinstance(strategy, PercentageStrategy):
+        if window is None:
+            return backtest_percentage(df, strategy, initial_capital)[1]
+        return backtest_percentage(df, strategy, initial_capital, start=window[0], stop=window[1])[1]
+    if window is None:
+        return backtest_stats(df, strategy, initial_capital)
+    return backtest_stats(df, strategy, initial_capital, *window)
+
+
+def _run_task(task):
+    """작업 하나의 통계 (실패하면 오류 메시지 문자열)"""
+    market, strategy_name, params, initial_capital = task
+    try:
+        strategy = STRATEGIES[strategy_name](**params)
+        df = _worker_frames[market][1]
+        return sweep_stats(df, strategy, initial_capital)
+    except Exception as e:
+        return str(e)
+
+
+def _run_indexed_task(item):
+    index, task = item
+    return index, _run_task(task)
+
+
+def _task_result(task, stats):
+    if isinstance(stats, str):
+        market, strategy_name, params, _ = task
+        return {'market': market, 'strategy': strategy_name, **params, 'error': stats}
+    return _result_row(task, stats)
+
+
+def make_tasks(markets, strategy_grids, initial_capital=1000000):
+    """(마켓, 전략 이름, 파라미터, 초기 자본금) 작업 목록"""
+    return [
+        (market, name, params, initial_capital)
+        for market in markets
+        for name, grid in strategy_grids.items()
+        for params in expand_grid(grid)
+    ]
+
+
+def iter_sweep(frames, strategy_grids, initial_capital=1000000, max_workers=None, chunksize=None, cache=None):
+    """
+    파라미터 조합을 프로세스 풀에 나눠 백테스트하고 끝나는 순서대로 결과를 생성
+    
+    Args:
+        frames: {마켓: 지표가 계산된 데이터프레임}
+        strategy_grids: {전략 이름: {파라미터: 값 목록}} (예: {'rsi': {'oversold': [20, 30]}})
+        initial_capital: 초기 자본금
+        max_workers: 워커 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 실행)
+        chunksize: 워커에 한 번에 넘길 작업 수 (기본값: 작업 수에 맞춰 계산)
+        cache: ResultCache (캐시에 있는 조합은 바로 생성하고 나머지만 실행해 저장)
+    
+    Yields:
+        {'market', 'strategy', 파라미터..., 'total_return', 'final_capital', 'buy_count', 'sell_count'}
+        실패한 조합은 'error' 키에 오류 메시지가 들어있다.
+    """
+    for name in strategy_grids:
+        if name not in STRATEGIES:
+            raise ValueError(f"지원하지 않는 전략입니다: {name}")
+    
+    tasks = make_tasks(frames, strategy_grids, initial_capital)
+    
+    keys = []
+    if cache is not None:
+        fingerprints = {market: data_fingerprint(df) for market, df in frames.items()}
+        current_time = datetime.now().time()
+        for market, name, params, _ in tasks:
+            strategy = STRATEGIES[name](**params)
+            keys.append(result_key(fingerprints[market], strategy, initial_capital, current_time,
+                                   evaluator=sweep_evaluator(strategy)))
+        cached = cache.get_many(keys)
+        pending = []
+        for task, key in zip(tasks, keys):
+            if key in cached:
+                yield _result_row(task, cached[key])
+            else:
+                pending.append((task, key))
+        if not pending:
+            return
+        tasks, keys = [task for task, _ in pending], [key for _, key in pending]
+    
+    computed = []
+    
+    def finish(index, stats):
+        # 성공한 결과만 모아서 한 번에 캐시에 저장
+        if cache is not None and not isinstance(stats, str):
+            computed.append((keys[index], stats))
+            if len(computed) >= 1000:
+                cache.put_many(computed)
+                computed.clear()
+        return _task_result(tasks[index], stats)
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    shared = {market: SharedFrame(df) for market, df in frames.items()}
+    specs = {market: frame.spec for market, frame in shared.items()}
+    
+    try:
+        if max_workers == 1 or len(tasks) <= 1:
+            _init_worker(specs)
+            try:
+                for index, task in enumerate(tasks):
+                    yield finish(index, _run_task(task))
+            finally:
+                for shm, _ in _worker_frames.values():
+                    shm.close()
+                _worker_frames.clear()
+            return
+        
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (max_workers * 8))
+        with multiprocessing.Pool(max_workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            for index, stats in pool.imap_unordered(_run_indexed_task, enumerate(tasks), chunksize=chunksize):
+                yield finish(index, stats)
+    finally:
+        if computed:
+            cache.put_many(computed)
+        for frame in shared.values():
+            frame.close()
+
+
+def run_sweep(frames, strategy_grids, initial_capital=1000000, max_workers=None, top=None, progress=None,
+              cache=None):
+    """
+    파라미터 탐색 결과를 수익률 순위표로 반환
+    
+    Args:
+        cache: ResultCache (iter_sweep 참고)
+        top: 상위 N개만 유지 (None이면 전체, 조합이 많을 때 메모리 절약)
+        progress: 결과 하나를 받을 때마다 호출할 함수 (완료 수, 전체 수, 결과)
+    
+    Returns:
+        수익률 내림차순 데이터프레임 (실패한 조합 제외)
+    """
+    total = len(make_tasks(frames, strategy_grids, initial_capital))
+    ranked = []
+    counter = itertools.count()  # 수익률이 같을 때 dict 비교를 피하기 위한 순번
+    
+    for done, result in enumerate(iter_sweep(frames, strategy_grids, initial_capital, max_workers, cache=cache), 1):
+        if progress is not None:
+            progress(done, total, result)
+        if 'error' in result:
+            continue
+        entry = (result[RANK_BY], next(counter), result)
+        if top is None:
+            ranked.append(entry)
+        elif len(ranked) < top:
+            heapq.heappush(ranked, entry)
+        else:
+            heapq.heappushpop(ranked, entry)
+    
+    rows = [entry[2] for entry in sorted(ranked, key=lambda entry: (-entry[0], entry[1]))]
+    return pd.DataFrame(rows).reset_index(drop=True)
+
+
+def insensitive_grids(results, columns=('total_return', 'buy_count', 'sell_count')):
+    """
+    조합이 여러 개인데 모든 조합의 통계(columns)가 같은 (마켓, 전략) 목록
+    
+    파라미터가 백테스트에 반영되지 않는 경우를 찾기 위한 점검이다.
+    """
+    if results.empty:
+        return []
+    return [
+        (market, strategy)
+        for (market, strategy), group in results.groupby(['market', 'strategy'], sort=False)
+        if len(group) > 1 and len(group[list(columns)].drop_duplicates()) == 1
+    ]
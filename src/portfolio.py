@@ -0,0 +1,89 @@
+import requests
+
+
+def _get_ticker(api, markets):
+    """현재가 조회 (요청 실패나 잘못된 응답이면 None)"""
+    try:
+        return api.get_ticker(markets)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+def fetch_prices(api, markets):
+    """
+    여러 마켓의 현재가를 한 번의 /ticker 요청으로 조회
+    
+    원화 마켓이 없는 코인이 섞여 있거나 요청이 실패하면 일괄 조회 결과를 쓸 수 없으므로,
+    이때만 마켓별로 다시 조회하고 조회되지 않는 마켓(연결 오류, 타임아웃 포함)은 제외한다.
+    
+    Returns:
+        {마켓: 현재가}
+    """
+    if not markets:
+        return {}
+    
+    tickers = _get_ticker(api, ",".join(markets))
+    if not isinstance(tickers, list):
+        tickers = []
+        for market in markets:
+            ticker = _get_ticker(api, market)
+            if isinstance(ticker, list):
+                tickers.extend(ticker)
+    
+    return {ticker['market']: float(ticker['trade_price']) for ticker in tickers}
+
+
+def value_portfolio(api, accounts):
+    """
+    계좌 목록의 원화 평가금액, 수익률, 비중 계산
+    
+    보유 코인의 현재가는 fetch_prices로 한 번에 조회한다.
+    
+    Returns:
+        {
+            'krw_balance': 원화 잔액,
+            'holdings': [{'currency', 'market', 'balance', 'avg_buy_price', 'current_price',
+                          'krw_value', 'profit_loss', 'allocation'}, ...],
+            'total_value': 총 자산가치 (원),
+        }
+        현재가를 조회하지 못한 코인은 current_price, krw_value, profit_loss, allocation이 None이다.
+    """
+    krw_balance = 0.0
+    holdings = []
+    
+    for account in accounts:
+        if account['currency'] == 'KRW':
+            krw_balance = float(account['balance'])
+        else:
+            holdings.append({
+                'currency': account['currency'],
+                'market': f"KRW-{account['currency']}",
+                'balance': float(account['balance']),
+                'avg_buy_price': float(account['avg_buy_price']),
+            })
+    
+    prices = fetch_prices(api, [holding['market'] for holding in holdings])
+    
+    total_value = krw_balance
+    for holding in holdings:
+        current_price = prices.get(holding['market'])
+        holding['current_price'] = current_price
+        if current_price is None:
+            holding['krw_value'] = None
+            holding['profit_loss'] = None
+            continue
+        
+        holding['krw_value'] = holding['balance'] * current_price
+        avg_buy_price = holding['avg_buy_price']
+        holding['profit_loss'] = (current_price - avg_buy_price) / avg_buy_price * 100 if avg_buy_price else 0.0
+        total_value += holding['krw_value']
+    
+    for holding in holdings:
+        value = holding['krw_value']
+        holding['allocation'] = value / total_value * 100 if value is not None and total_value else None
+    
+    return {
+        'krw_balance': krw_balance,
+        'holdings': holdings,
+        'total_value': total_value,
+    }
@@ -0,0 +1,172 @@
+import copy
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_engine import ensure_indicators, strategy_signals
+from src.trading_strategies import BUY, SELL
+
+# TradingBot.execute_trade와 같은 매수 조건 (원화 잔액이 이보다 적으면 매수하지 않음)
+MIN_BALANCE = 10000
+
+# 업비트 최소 주문 금액
+MIN_ORDER = 5000
+
+
+def align_markets(frames):
+    """
+    마켓별 데이터프레임을 datetime 기준 공통 시간축에 맞춤
+    
+    Returns:
+        (공통 시간축 DatetimeIndex, {마켓: 공통 시간축에서의 캔들 위치 배열})
+    """
+    for market, df in frames.items():
+        if 'datetime' not in df:
+            raise ValueError(f"{market} 데이터에 datetime 컬럼이 없습니다.")
+    
+    times = [df['datetime'].to_numpy() for df in frames.values()]
+    index = pd.DatetimeIndex(np.unique(np.concatenate(times))) if times else pd.DatetimeIndex([])
+    positions = {market: index.get_indexer(t) for market, t in zip(frames, times)}
+    return index, positions
+
+
+def portfolio_signals(frames, strategy, current_time=None):
+    """
+    공통 시간축의 (캔들, 마켓) 신호 행렬과 종가 행렬
+    
+    신호는 마켓마다 자기 캔들로 계산한 strategy_signals이며, 캔들이 없는 시각은 홀드다.
+    변동성 돌파처럼 상태(목표가)를 가진 전략이 마켓끼리 섞이지 않도록 마켓마다 전략을 복사한다.
+    종가는 캔들이 없는 시각에 직전 종가를 쓴다 (첫 캔들 전에는 NaN).
+    
+    Args:
+        frames: {마켓: 전처리된 캔들 데이터프레임}
+        strategy: 모든 마켓에 쓸 전략 객체 또는 {마켓: 전략 객체}
+    
+    Returns:
+        (공통 시간축, 신호 행렬 int8, 종가 행렬 float64)
+    """
+    index, positions = align_markets(frames)
+    signals = np.zeros((len(index), len(frames)), dtype=np.int8)
+    prices = np.full((len(index), len(frames)), np.nan)
+    
+    for j, (market, df) in enumerate(frames.items()):
+        market_strategy = strategy[market] if isinstance(strategy, dict) else copy.deepcopy(strategy)
+        pos = positions[market]
+        signals[pos, j] = strategy_signals(ensure_indicators(df), market_strategy, current_time=current_time)
+        prices[pos, j] = df['trade_price'].to_numpy(dtype=np.float64)
+    
+    prices = pd.DataFrame(prices).ffill().to_numpy()
+    return index, signals, prices
+
+
+def backtest_portfolio(frames, strategy, initial_capital=1000000, buy_amount_pct=0.3, fee=0.0005,
+                       min_balance=MIN_BALANCE, min_order=MIN_ORDER, current_time=None):
+    """
+    하나의 원화 잔액을 여러 마켓이 나눠 쓰는 포트폴리오 백테스트
+    
+    TradingBot을 마켓마다 실행한 것과 같이 동작한다.
+        - 보유 중인 마켓의 매도 신호에서 전량 매도, 보유하지 않은 마켓의 매수 신호에서
+          그 시점 원화 잔액의 buy_amount_pct만큼 매수 (신호 캔들의 종가에 체결)
+        - 같은 캔들에서는 매도를 먼저 처리하고, 매수는 frames 순서대로 차례로 잔액을 줄여가며 처리
+        - 원화 잔액이 min_balance보다 적거나 매수 금액이 min_order보다 적으면 매수하지 않음
+        - 매수/매도 모두 fee만큼 수수료를 뗌
+    신호가 있는 캔들만 순서대로 처리하고, 한 캔들 안의 계산은 마켓 축으로 벡터화한다.
+    
+    Args:
+        frames: {마켓: 전처리된 캔들 데이터프레임 (datetime 컬럼 필요)}
+        strategy: 모든 마켓에 쓸 전략 객체 또는 {마켓: 전략 객체}
+        initial_capital: 초기 원화 잔액
+        buy_amount_pct: 매수 시 사용할 원화 잔액 비율
+        fee: 매수/매도 수수료율
+        current_time: 변동성 돌파 09:00 리셋 판단 시각 (기본값: 현재 시각)
+    
+    Returns:
+        (curve, trades, stats)
+            curve: 시각별 'cash', 'holdings', 'equity', 'drawdown' 데이터프레임
+            trades: 'datetime', 'market', 'side', 'price', 'volume', 'amount' 거래 데이터프레임
+            stats: 통계 dict (남은 물량은 마지막 종가로 평가)
+    """
+    markets = list(frames)
+    if current_time is None:
+        current_time = datetime.now().time()
+    index, signals, prices = portfolio_signals(frames, strategy, current_time)
+    n_bars, n_markets = signals.shape
+    
+    cash = float(initial_capital)
+    volume = np.zeros(n_markets)
+    cost = np.zeros(n_markets)  # 현재 포지션에 들어간 원화 (수수료 포함)
+    holding = np.zeros(n_markets, dtype=bool)
+    sell_count = win_count = 0
+    
+    # 거래가 있었던 캔들의 잔액/보유 수량 (나머지 캔들은 직전 값을 이어 씀)
+    cash_at = np.full(n_bars, np.nan)
+    volume_at = np.full((n_bars, n_markets), np.nan)
+    trades = []
+    growth = (1 - buy_amount_pct) ** np.arange(n_markets)
+    
+    for t in np.flatnonzero(signals.any(axis=1)):
+        row = signals[t]
+        price = prices[t]
+        traded = False
+        
+        sell = np.flatnonzero((row == SELL) & holding)
+        if len(sell):
+            proceeds = volume[sell] * price[sell] * (1 - fee)
+            cash += proceeds.sum()
+            sell_count += len(sell)
+            win_count += int((proceeds > cost[sell]).sum())
+            trades.extend(zip([t] * len(sell), sell, ['sell'] * len(sell), price[sell], volume[sell], proceeds))
+            volume[sell] = 0.0
+            cost[sell] = 0.0
+            holding[sell] = False
+            traded = True
+        
+        buy = np.flatnonzero((row == BUY) & ~holding)
+        if len(buy):
+            # 앞 마켓이 매수할 때마다 잔액이 (1 - buy_amount_pct)배가 되므로 매수 금액을 한 번에 계산
+            before = cash * growth[:len(buy)]
+            spend = before * buy_amount_pct
+            ok = (before >= min_balance) & (spend >= min_order)
+            # 잔액은 줄어들기만 하므로 한 번 매수하지 못하면 뒤 마켓도 매수하지 못함
+            filled = len(ok) if ok.all() else int(ok.argmin())
+            buy, spend = buy[:filled], spend[:filled]
+            if filled:
+                volume[buy] = spend * (1 - fee) / price[buy]
+                cost[buy] = spend
+                holding[buy] = True
+                cash -= spend.sum()
+                trades.extend(zip([t] * filled, buy, ['buy'] * filled, price[buy], volume[buy], spend))
+                traded = True
+        
+        if traded:
+            cash_at[t] = cash
+            volume_at[t] = volume
+    
+    cash_curve = pd.Series(cash_at).ffill().fillna(float(initial_capital)).to_numpy()
+    volumes = pd.DataFrame(volume_at).ffill().fillna(0.0).to_numpy()
+    holdings = np.nansum(volumes * prices, axis=1)
+    equity = cash_curve + holdings
+    peak = np.maximum.accumulate(equity) if n_bars else equity
+    drawdown = equity / peak - 1 if n_bars else equity
+    
+    curve = pd.DataFrame({'cash': cash_curve, 'holdings': holdings, 'equity': equity, 'drawdown': drawdown}, index=index)
+    trades = pd.DataFrame(trades, columns=['bar', 'market', 'side', 'price', 'volume', 'amount'])
+    trades.insert(0, 'datetime', index[trades.pop('bar').to_numpy(dtype=np.int64)])
+    trades['market'] = [markets[j] for j in trades['market']]
+    
+    final_capital = float(equity[-1]) if n_bars else float(initial_capital)
+    buy_count = int((trades['side'] == 'buy').sum())
+    stats = {
+        'initial_capital': initial_capital,
+        'final_capital': final_capital,
+        'total_return': (final_capital - initial_capital) / initial_capital * 100,
+        'max_drawdown': float(-drawdown.min() * 100) if n_bars else 0.0,
+        'buy_count': buy_count,
+        'sell_count': sell_count,
+        'win_rate': win_count / sell_count * 100 if sell_count else None,
+        'markets': n_markets,
+        'open_positions': int(holding.sum()),
+        'cash': cash,
+    }
+    return curve, trades, stats
@@ -0,0 +1,99 @@
+import threading
+import time
+
+# 업비트 요청 수 제한 (초당)
+# - quotation: 시세 조회 API (IP 단위)
+# - exchange: 계좌/주문 조회 등 거래소 API (계정 단위)
+# - order: 주문 생성 API (계정 단위)
+RATE_LIMITS = {
+    'quotation': 10,
+    'exchange': 30,
+    'order': 8,
+}
+
+
+class TokenBucket:
+    """토큰 버킷 방식 요청 수 제한기"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)  # 초당 토큰 충전량
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+    
+    def reserve(self, tokens=1):
+        """
+        토큰을 예약하고 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환
+        
+        토큰이 부족하면 잔량이 음수가 되어 뒤이은 호출자가 순서대로 대기한다.
+        동기(time.sleep)와 비동기(asyncio.sleep) 호출자 모두 이 메서드를 사용한다.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self, tokens=1):
+        """토큰을 얻을 때까지 블로킹"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def update_remaining(self, remaining):
+        """
+        서버가 알려준 남은 요청 수(Remaining-Req의 sec 값)로 잔량 보정
+        
+        같은 IP/계정을 쓰는 다른 프로세스가 있으면 서버 잔량이 더 적을 수 있으므로
+        로컬 잔량보다 작을 때만 낮춘다.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, float(remaining))
+    
+    def penalize(self, seconds=1.0):
+        """429 응답을 받았을 때 일정 시간 동안 토큰 지급 중단"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(group):
+    """그룹별 요청 제한기 반환 (프로세스 내 모든 UpbitAPI 인스턴스가 공유)"""
+    with _limiters_lock:
+        limiter = _limiters.get(group)
+        if limiter is None:
+            limiter = TokenBucket(RATE_LIMITS.get(group, RATE_LIMITS['quotation']))
+            _limiters[group] = limiter
+        return limiter
+
+
+def parse_remaining_req(header):
+    """
+    Remaining-Req 헤더 파싱
+    
+    예: "group=default; min=1800; sec=29" -> {'group': 'default', 'min': 1800, 'sec': 29}
+    """
+    result = {}
+    if not header:
+        return result
+    for part in header.split(';'):
+        if '=' not in part:
+            continue
+        key, value = part.split('=', 1)
+        key = key.strip()
+        value = value.strip()
+        result[key] = int(value) if value.isdigit() else value
+    return result
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+
+from src.backtest_engine import ENGINE_VERSION, backtest_stats
+from src.trading_strategies import is_reset_time
+
+# 지문 계산에 쓰는 캔들 컬럼 (백테스트 결과를 결정하는 입력)
+FINGERPRINT_COLUMNS = ('opening_price', 'high_price', 'low_price', 'trade_price', 'datetime')
+
+# 기본 캐시 크기 상한 (바이트)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def data_fingerprint(df):
+    """캔들 데이터프레임의 가격/시각 컬럼 내용으로 만든 해시 (같은 캔들 구간이면 같은 값)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    for column in FINGERPRINT_COLUMNS:
+        if column in df:
+            digest.update(column.encode())
+            digest.update(np.ascontiguousarray(df[column].to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def strategy_params(strategy):
+    """
+    전략 클래스 이름과 속성을 JSON으로 바꿀 수 있는 구조로 변환
+    
+    CombinedStrategy처럼 다른 전략을 가진 전략은 안쪽 전략까지 펼친다.
+    """
+    if isinstance(strategy, str):
+        return strategy
+    if hasattr(strategy, '__dict__'):
+        return {
+            'class': type(strategy).__name__,
+            **{name: strategy_params(value) for name, value in sorted(vars(strategy).items())},
+        }
+    if isinstance(strategy, (list, tuple)):
+        return [strategy_params(value) for value in strategy]
+    if isinstance(strategy, np.generic):
+        return strategy.item()
+    return strategy
+
+
+def result_key(fingerprint, strategy, initial_capital, current_time=None, evaluator='vector', **extra):
+    """
+    백테스트 결과 캐시 키
+    
+    데이터 지문, 전략 클래스와 파라미터, 초기 자본금, 결과를 계산한 평가기, ENGINE_VERSION으로 만든다.
+    evaluator는 'vector' (backtest_stats) 또는 'dca' (dca_kernel.backtest_percentage)이며,
+    같은 전략이라도 평가기가 다르면 다른 결과이므로 키를 나눈다.
+    변동성 돌파 전략은 09:00~09:05에 결과가 달라지므로 그 구간 여부도 키에 넣는다.
+    """
+    if current_time is None:
+        current_time = datetime.now().time()
+    payload = {
+        'engine': ENGINE_VERSION,
+        'evaluator': evaluator,
+        'data': fingerprint,
+        'strategy': strategy_params(strategy),
+        'initial_capital': initial_capital,
+        'reset': is_reset_time(current_time),
+        **extra,
+    }
+    text = json.dumps(payload, sort_keys=True, default=repr)
+    return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """
+    백테스트 결과를 SQLite 파일에 저장하는 캐시
+    
+    값은 pickle로 저장하고, 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 결과부터 지운다.
+    """
+    
+    def __init__(self, path="data/results.db", max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with closing(self._connect()) as conn:
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            conn.commit()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    
+    def get_many(self, keys):
+        """{키: 값} (없는 키는 제외), 찾은 결과는 최근 사용 시각을 갱신"""
+        keys = list(keys)
+        found = {}
+        with closing(self._connect()) as conn:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((key, pickle.loads(value)) for key, value in rows)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, key) for key in found])
+                conn.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+    
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+    
+    def put_many(self, items):
+        """{키: 값} 또는 (키, 값) 목록 저장 후 크기 상한을 넘으면 정리"""
+        if isinstance(items, dict):
+            items = items.items()
+        now = time.time()
+        rows = []
+        for key, value in items:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+        with closing(self._connect()) as conn:
+            conn.executemany("INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)", rows)
+            self._evict(conn)
+            conn.commit()
+    
+    def put(self, key, value):
+        self.put_many([(key, value)])
+    
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 오래 사용하지 않은 순서로 넘친 크기만큼 삭제
+        excess = total - self.max_bytes
+        removed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            removed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", removed)
+    
+    def size(self):
+        """(저장된 결과 수, 전체 크기 바이트)"""
+        with closing(self._connect()) as conn:
+            return tuple(conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone())
+    
+    def clear(self):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM results")
+            conn.commit()
+
+
+def cached_backtest_stats(cache, df, strategy, initial_capital=1000000, fingerprint=None):
+    """
+    캐시에 있으면 저장된 통계를, 없으면 backtest_stats를 실행해 저장한 뒤 반환
+    
+    cache가 None이면 캐시 없이 실행한다. 같은 데이터로 여러 전략을 실행할 때는
+    data_fingerprint(df)를 한 번 계산해 fingerprint로 넘기면 된다.
+    """
+    if cache is None:
+        return backtest_stats(df, strategy, initial_capital)
+    
+    key = result_key(fingerprint or data_fingerprint(df), strategy, initial_capital, evaluator='vector')
+    stats = cache.get(key)
+    if stats is None:
+        stats = backtest_stats(df, strategy, initial_capital)
+        cache.put(key, stats)
+    return stats
@@ -0,0 +1,211 @@
+import copy
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_analyzer import DataAnalyzer
+from src.param_sweep import SharedFrame, attach_frame, sweep_stats
+
+# 방법별 가격 경로 생성 방식
+METHODS = ('bootstrap', 'start')
+
+# 경로별로 기록하는 통계
+METRICS = ('total_return', 'max_drawdown', 'win_rate')
+
+PRICE_COLUMNS = ['opening_price', 'high_price', 'low_price', 'trade_price']
+
+
+def default_block_size(n):
+    """블록 부트스트랩 기본 블록 길이 (캔들 수의 세제곱근)"""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+def bar_ratios(df):
+    """
+    캔들을 직전 종가 기준 비율로 분해 (로그 수익률, 시가/직전 종가, 고가/종가, 저가/종가)
+    
+    비율 묶음을 캔들 단위로 다시 뽑아 이어 붙이면 고가 >= max(시가, 종가) 같은 캔들 모양이 유지된다.
+    """
+    opening, high, low, close = (df[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS)
+    previous = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+    return np.log(close / previous), opening / previous, high / close, low / close
+
+
+def path_times(df, length):
+    """
+    경로 캔들 시각 (원본 첫 캔들부터 같은 간격, 원본에 datetime이 없으면 None)
+    
+    변동성 돌파/퍼센트 전략은 캔들 시각으로 거래일을 나누므로 합성 경로에도 시각을 붙인다.
+    """
+    if 'datetime' not in df:
+        return None
+    times = pd.DatetimeIndex(df['datetime'])
+    step = times[1] - times[0] if len(times) > 1 else pd.Timedelta(days=1)
+    return times[0] + step * np.arange(length)
+
+
+def bootstrap_path(df, rng, length=None, block_size=None, ratios=None):
+    """
+    수익률을 블록 단위로 복원 추출해 만든 가격 경로
+    
+    연속한 block_size개 캔들의 비율 묶음을 무작위 위치에서 뽑아 이어 붙이고,
+    원래 첫 종가에서 시작해 가격을 다시 쌓는다. 블록 안에서는 변동성 군집 같은 자기상관이 유지된다.
+    
+    Args:
+        df: 캔들 데이터프레임 (시가/고가/저가/종가)
+        rng: np.random.Generator
+        length: 경로 캔들 수 (기본값: df 길이)
+        block_size: 블록 길이 (기본값: default_block_size)
+        ratios: bar_ratios(df) 결과 (여러 경로를 만들 때 한 번만 계산해 넘김)
+    
+    Returns:
+        시가/고가/저가/종가 데이터프레임 (원본에 datetime이 있으면 path_times 포함)
+    """
+    n = len(df)
+    length = length or n
+    block_size = min(block_size or default_block_size(n), n - 1)
+    log_return, open_ratio, high_ratio, low_ratio = ratios if ratios is not None else bar_ratios(df)
+    
+    # 첫 캔들은 직전 종가가 없으므로 두 번째 캔들부터 블록 시작 위치를 뽑음
+    starts = rng.integers(1, n - block_size + 1, size=-(-length // block_size))
+    idx = (starts[:, None] + np.arange(block_size)).ravel()[:length]
+    
+    first_close = df['trade_price'].iloc[0]
+    close = first_close * np.exp(np.cumsum(log_return[idx]))
+    previous = np.concatenate(([first_close], close[:-1]))
+    path = pd.DataFrame({
+        'opening_price': previous * open_ratio[idx],
+        'high_price': close * high_ratio[idx],
+        'low_price': close * low_ratio[idx],
+        'trade_price': close,
+    })
+    times = path_times(df, length)
+    if times is not None:
+        path['datetime'] = times
+    return path
+
+
+def random_start_path(df, rng, length):
+    """무작위 시작 캔들부터 length개 캔들 (실제 가격과 캔들 시각, 시작 시점만 바뀜)"""
+    start = int(rng.integers(0, len(df) - length + 1))
+    columns = PRICE_COLUMNS + ['datetime'] if 'datetime' in df else PRICE_COLUMNS
+    return start, df[columns].iloc[start:start + length].reset_index(drop=True)
+
+
+# 워커 프로세스 상태 (공유 메모리, 데이터프레임, 비율 묶음, 설정)
+_worker_state = None
+
+
+def _init_worker(spec, config):
+    global _worker_state
+    shm, df = attach_frame(spec)
+    ratios = bar_ratios(df) if config['method'] == 'bootstrap' else None
+    _worker_state = (shm, df, ratios, config)
+
+
+def _run_path(index):
+    _, df, ratios, config = _worker_state
+    # 경로 번호로 난수를 만들어 워커 수/순서와 관계없이 같은 경로 생성
+    rng = np.random.default_rng([config['seed'], index])
+    start = None
+    if config['method'] == 'bootstrap':
+        path = bootstrap_path(df, rng, config['length'], config['block_size'], ratios)
+    else:
+        start, path = random_start_path(df, rng, config['length'])
+    
+    path = DataAnalyzer().calculate_indicators(path)
+    stats = sweep_stats(path, copy.deepcopy(config['strategy']), config['initial_capital'])
+    return {
+        'path': index,
+        'start': start,
+        **{metric: stats[metric] for metric in METRICS},
+        'buy_count': stats['buy_count'],
+        'sell_count': stats['sell_count'],
+    }
+
+
+def run_robustness(df, strategy, n_paths=1000, method='bootstrap', length=None, block_size=None,
+                   initial_capital=1000000, max_workers=None, seed=0):
+    """
+    가격 경로를 여러 개 만들어 같은 전략을 실행하는 강건성(몬테카를로) 분석
+    
+    원본 캔들은 공유 메모리에 한 번 올리고, 워커 프로세스가 경로 번호마다 경로를 만들어
+    지표 계산과 백테스트를 실행한다. 백테스트는 파라미터 탐색/워크포워드와 같은 sweep_stats를
+    쓰므로 퍼센트 전략은 dca_kernel로 평가한다.
+    
+    Args:
+        df: 전처리된 캔들 데이터프레임
+        strategy: 전략 객체 (경로마다 복사해서 사용)
+        n_paths: 경로 수
+        method: 'bootstrap' (블록 부트스트랩) 또는 'start' (무작위 시작 시점)
+        length: 경로 캔들 수 (기본값: bootstrap은 전체 길이, start는 전체 길이의 절반)
+        block_size: 부트스트랩 블록 길이 (기본값: default_block_size)
+        initial_capital: 초기 자본금
+        max_workers: 워커 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 실행)
+        seed: 난수 시드
+    
+    Returns:
+        경로별 'path', 'start', 'total_return', 'max_drawdown', 'win_rate', 'buy_count', 'sell_count' 데이터프레임
+    """
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 방법입니다: {method}")
+    if len(df) < 2:
+        raise ValueError("캔들이 2개 이상 필요합니다.")
+    
+    if length is None:
+        length = len(df) if method == 'bootstrap' else len(df) // 2
+    if method == 'start' and not 0 < length <= len(df):
+        raise ValueError(f"경로 길이는 1~{len(df)} 사이여야 합니다.")
+    
+    config = {
+        'method': method,
+        'length': length,
+        'block_size': block_size,
+        'strategy': strategy,
+        'initial_capital': initial_capital,
+        'seed': seed,
+    }
+    max_workers = min(max_workers or os.cpu_count() or 1, n_paths)
+    shared = SharedFrame(df[PRICE_COLUMNS + ['datetime'] if 'datetime' in df else PRICE_COLUMNS])
+    
+    try:
+        if max_workers <= 1:
+            _init_worker(shared.spec, config)
+            try:
+                rows = [_run_path(i) for i in range(n_paths)]
+            finally:
+                _worker_state[0].close()
+        else:
+            chunksize = max(1, n_paths // (max_workers * 8))
+            with multiprocessing.Pool(max_workers, initializer=_init_worker, initargs=(shared.spec, config)) as pool:
+                rows = list(pool.imap_unordered(_run_path, range(n_paths), chunksize=chunksize))
+    finally:
+        shared.close()
+    
+    return pd.DataFrame(rows).sort_values('path').reset_index(drop=True)
+
+
+def summarize(result):
+    """
+    경로별 결과의 분포 요약
+    
+    Returns:
+        {통계 이름: {'mean', 'std', 'p5', 'p25', 'p50', 'p75', 'p95'}, 'paths', 'loss_probability'}
+        승률은 거래가 없는 경로를 제외하고 계산한다.
+    """
+    summary = {'paths': len(result)}
+    for metric in METRICS:
+        values = result[metric].dropna().to_numpy(dtype=np.float64) if len(result) else np.array([])
+        if not len(values):
+            summary[metric] = None
+            continue
+        p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+        summary[metric] = {
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'p5': float(p5), 'p25': float(p25), 'p50': float(p50), 'p75': float(p75), 'p95': float(p95),
+        }
+    summary['loss_probability'] = float((result['total_return'] < 0).mean() * 100) if len(result) else None
+    return summary
@@ -0,0 +1,197 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_engine import (
+    START_INDEX, _equity_curve, _max_drawdown, _position_trades, _stats, strategy_signals
+)
+from src.data_analyzer import DataAnalyzer, parse_candles
+from src.trading_strategies import BUY, PercentageStrategy
+
+# 컬럼 파일로 내보내는 캔들 컬럼
+COLUMN_FIELDS = ('opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume', 'timestamp', 'datetime')
+
+# 가장 긴 지표 창 (MA120) - 구간 경계에서 앞 구간 끝부분을 이만큼 이어 붙여 계산
+OVERLAP = 120
+
+# 이전 구간 값을 이어서 계산하는 EMA 컬럼 (컬럼, 입력 컬럼, span)
+EMA_COLUMNS = (('ema12', 'trade_price', 12), ('ema26', 'trade_price', 26))
+
+
+def export_columns(store, market, unit, directory, batch_size=100000):
+    """
+    CandleStore의 캔들을 컬럼별 .npy 파일로 내보냄
+    
+    저장소를 batch_size개씩 읽어 np.lib.format.open_memmap으로 만든 파일에 바로 쓰므로
+    전체 기간을 메모리에 올리지 않는다.
+    
+    Returns:
+        내보낸 캔들 수
+    """
+    os.makedirs(directory, exist_ok=True)
+    total = store.count(market, unit)
+    files = {}
+    written = 0
+    
+    for batch in store.iter_candles(market, unit, batch_size):
+        columns = parse_candles(batch)
+        for field in COLUMN_FIELDS:
+            if field not in columns:
+                continue
+            if field not in files:
+                files[field] = np.lib.format.open_memmap(
+                    os.path.join(directory, f"{field}.npy"), mode='w+',
+                    dtype=columns[field].dtype, shape=(total,),
+                )
+            files[field][written:written + len(columns[field])] = columns[field]
+        written += len(batch)
+    
+    for array in files.values():
+        array.flush()
+    return written
+
+
+def open_columns(directory):
+    """export_columns로 만든 컬럼 파일을 메모리 맵으로 열기 ({컬럼: 읽기 전용 배열})"""
+    return {
+        name[:-4]: np.load(os.path.join(directory, name), mmap_mode='r')
+        for name in os.listdir(directory) if name.endswith('.npy')
+    }
+
+
+def _chunk_indicators(raw, prev_tail, analyzer):
+    """
+    이전 구간 끝부분(prev_tail)에 이어서 이번 구간의 지표 계산
+    
+    이동평균/표준편차/RSI는 앞 구간 OVERLAP개를 이어 붙여 다시 계산하고,
+    EMA와 MACD 시그널은 앞 구간 마지막 값을 첫 값으로 넣어 이어서 계산한다.
+    
+    Returns:
+        prev_tail 행을 포함한 지표 데이터프레임
+    """
+    if prev_tail is None:
+        return analyzer.calculate_indicators(raw)
+    
+    overlap = len(prev_tail)
+    frame = pd.concat([prev_tail[raw.columns], raw], ignore_index=True)
+    frame = analyzer.calculate_indicators(frame)
+    
+    # ewm(adjust=False)은 직전 값만으로 다음 값이 정해지므로 직전 값을 앞에 붙이면 그대로 이어진다
+    for column, source, span in EMA_COLUMNS:
+        values = np.concatenate(([prev_tail[column].iloc[-1]], raw[source].to_numpy()))
+        frame.loc[overlap:, column] = pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()[1:]
+    frame['macd'] = frame['ema12'] - frame['ema26']
+    signal = np.concatenate(([prev_tail['macd_signal'].iloc[-1]], frame['macd'].to_numpy()[overlap:]))
+    frame.loc[overlap:, 'macd_signal'] = pd.Series(signal).ewm(span=9, adjust=False).mean().to_numpy()[1:]
+    
+    # 겹치는 행은 앞 구간에서 계산한 값을 그대로 사용
+    frame.iloc[:overlap] = prev_tail[frame.columns].to_numpy()
+    frame['macd_hist'] = frame['macd'] - frame['macd_signal']
+    return frame
+
+
+def _previous_day_start(times, i):
+    """i번째 캔들이 속한 거래일(KST 09:00 기준)의 전 거래일 첫 캔들 위치 (times는 KST 캔들 시각 배열)"""
+    day = (np.datetime64(times[i], 's') - np.timedelta64(9, 'h')).astype('datetime64[D]') - 1
+    return int(np.searchsorted(times, day.astype('datetime64[s]') + np.timedelta64(9, 'h')))
+
+
+def stream_backtest(columns, strategy, initial_capital=1000000, chunk_size=500000, current_time=None):
+    """
+    메모리 맵 컬럼 파일을 구간별로 읽어 실행하는 백테스트
+    
+    지표 계산 상태(앞 구간 끝부분, EMA 값)와 포지션(보유 여부, 매수가)을 구간 경계에서 이어받아
+    전체를 한 번에 run_backtest로 실행한 것과 같은 거래와 통계를 만든다. 메모리 사용량은
+    전체 기간이 아니라 chunk_size에 비례한다.
+    
+    Args:
+        columns: export_columns로 만든 디렉터리 또는 {컬럼: 배열} (메모리 맵 배열 가능)
+        strategy: generate_signals를 지원하는 전략 객체 ('volatility_breakout' 문자열과
+            신호가 평균 매수가에 따라 달라지는 PercentageStrategy는 지원하지 않음)
+        initial_capital: 초기 자본금
+        chunk_size: 한 번에 읽을 캔들 수 (OVERLAP의 2배 이상)
+        current_time: 변동성 돌파 09:00 리셋 판단 시각 (기본값: 시작 시점의 현재 시각)
+    
+    Returns:
+        run_backtest와 같은 통계 dict
+    """
+    if not hasattr(strategy, 'generate_signals'):
+        raise ValueError("스트리밍 백테스트는 generate_signals를 지원하는 전략 객체만 사용할 수 있습니다.")
+    if isinstance(strategy, PercentageStrategy):
+        # 구간 경계에서 평균 매수가 시뮬레이션 상태를 이어받을 수 없음
+        raise ValueError("퍼센트 전략은 스트리밍 백테스트를 지원하지 않습니다. dca_kernel.backtest_percentage를 사용하세요.")
+    if chunk_size < OVERLAP * 2:
+        raise ValueError(f"chunk_size는 {OVERLAP * 2} 이상이어야 합니다.")
+    if isinstance(columns, str):
+        columns = open_columns(columns)
+    if current_time is None:
+        current_time = datetime.now().time()
+    
+    fields = ('opening_price', 'high_price', 'low_price', 'trade_price')
+    n = len(columns['trade_price'])
+    times = columns.get('datetime')
+    analyzer = DataAnalyzer()
+    
+    prev_tail = None
+    holding, buy_price = False, 0.0
+    buy_count, profits = 0, []
+    realized, peak, max_drawdown = 0.0, 1.0, 0.0
+    last_price = None
+    
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        # 메모리 맵에서 이번 구간만 복사해 읽음
+        raw = pd.DataFrame({f: np.asarray(columns[f][start:stop], dtype=np.float64) for f in fields})
+        frame = _chunk_indicators(raw, prev_tail, analyzer)
+        overlap = 0 if prev_tail is None else len(prev_tail)
+        
+        first = start - overlap
+        if times is not None and prev_tail is not None:
+            # 변동성 돌파 목표가에 필요한 전 거래일 캔들부터 가격만 앞에 붙임 (run_backtest와 같이 START_INDEX - 1 이후)
+            first = min(max(_previous_day_start(times, start), START_INDEX - 1), first)
+            prefix = pd.DataFrame({f: np.asarray(columns[f][first:start - overlap], dtype=np.float64) for f in fields})
+            frame = pd.concat([prefix, frame], ignore_index=True)
+        if times is not None:
+            frame['datetime'] = np.asarray(times[first:stop]).astype('datetime64[ns]')
+        
+        if prev_tail is None:
+            # 첫 구간은 run_backtest와 같이 START_INDEX번째 캔들부터 평가
+            signals = strategy_signals(frame, strategy, current_time=current_time)
+        else:
+            # 앞 구간 끝부분을 같이 넘겨 직전 캔들이 필요한 신호(MACD 교차 등)를 이어서 계산
+            signals = strategy.generate_signals(frame, current_time=current_time)[start - first:]
+        
+        buy_idx, sell_idx = _position_trades(signals, start=0, holding=holding)
+        close = raw['trade_price'].to_numpy()
+        chunk_start = (holding, buy_price if holding else np.nan, realized)
+        
+        # 매수/매도가 번갈아 나오므로 시간 순서대로 수익률 누적
+        events = sorted([(i, BUY) for i in buy_idx] + [(i, -BUY) for i in sell_idx])
+        closed = []
+        for i, kind in events:
+            if kind == BUY:
+                buy_price = close[i]
+                buy_count += 1
+            else:
+                profit = (close[i] - buy_price) / buy_price
+                closed.append(profit)
+                realized += profit
+        profits.extend(closed)
+        if events:
+            holding = events[-1][1] == BUY
+        
+        # 구간 사이의 최고 평가 자산을 이어받아 최대 낙폭 계산
+        equity = _equity_curve(close, buy_idx, close[buy_idx], sell_idx, closed, *chunk_start)
+        max_drawdown = max(max_drawdown, _max_drawdown(equity, peak))
+        peak = max(peak, float(equity.max()))
+        
+        last_price = close[-1]
+        prev_tail = frame.iloc[-OVERLAP:].reset_index(drop=True)
+    
+    if holding:
+        # 마지막 거래 이후 포지션이 남아있는 경우 청산 (마지막 가격으로)
+        profits.append((last_price - buy_price) / buy_price)
+    
+    return _stats(buy_count, profits, initial_capital, max_drawdown)
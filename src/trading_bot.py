@@ -1,18 +1,87 @@
+import asyncio
 import time
 import logging
 import os
-import json
-import requests
 from datetime import datetime, timedelta
 import traceback
 
 from src.upbit_api import UpbitAPI
+from src.candle_buffer import DELTA_COUNT, CandleFeed
 from src.data_analyzer import DataAnalyzer
+from src.event_scheduler import EventScheduler, candle_unit, ma_windows, price_triggers
+from src.notifier import SlackNotifier
+from src.order_tracker import OrderTracker, fill_price
+from src.upbit_websocket import UpbitWebSocket
 from src.trading_strategies import (
     MACrossStrategy, RSIStrategy, MACDStrategy, BollingerBandStrategy,
     VolatilityBreakoutStrategy, PercentageStrategy, CombinedStrategy
 )
 
+# 이벤트 방식에서 이벤트 하나당 시장 분석을 다시 시도하는 최대 횟수
+ANALYZE_RETRIES = 3
+
+def setup_logger(name):
+    """콘솔과 일별 로그 파일(logs/trading_YYYYMMDD.log)에 기록하는 로거"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    
+    # 로그 디렉토리 확인
+    if not os.path.exists("logs"):
+        os.makedirs("logs")
+    
+    # 콘솔 핸들러
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    
+    # 파일 핸들러
+    today = datetime.now().strftime("%Y%m%d")
+    file_handler = logging.FileHandler(f"logs/trading_{today}.log")
+    file_handler.setLevel(logging.INFO)
+    
+    # 포맷 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    console_handler.setFormatter(formatter)
+    file_handler.setFormatter(formatter)
+    
+    # 핸들러 추가
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    
+    return logger
+
+def create_strategy(strategy_name, strategy_params=None):
+    """전략 이름과 파라미터로 전략 객체 생성"""
+    strategy_params = strategy_params or {}
+    
+    if strategy_name == "ma":
+        short_window = strategy_params.get("short_window", 5)
+        long_window = strategy_params.get("long_window", 20)
+        return MACrossStrategy(short_window=short_window, long_window=long_window)
+    
+    elif strategy_name == "rsi":
+        oversold = strategy_params.get("oversold", 30)
+        overbought = strategy_params.get("overbought", 70)
+        return RSIStrategy(oversold=oversold, overbought=overbought)
+    
+    elif strategy_name == "macd":
+        return MACDStrategy()
+    
+    elif strategy_name == "bb":
+        return BollingerBandStrategy()
+    
+    elif strategy_name == "volatility":
+        k = strategy_params.get("k", 0.5)
+        return VolatilityBreakoutStrategy(k=k)
+    
+    elif strategy_name == "percentage":
+        k = strategy_params.get("k", 0.5)
+        buy_pct = strategy_params.get("buy_pct", 0.20)
+        sell_pct = strategy_params.get("sell_pct", 0.05)
+        return PercentageStrategy(buy_pct=buy_pct, sell_pct=sell_pct, k=k)
+    
+    else:  # 기본값은 복합 전략
+        return CombinedStrategy()
+
 class TradingBot:
     def __init__(self, access_key, secret_key, market="KRW-BTC", strategy=None, 
                  strategy_params=None, slack_webhook_url=None):
@@ -22,122 +91,44 @@ class TradingBot:
         self.strategy_name = strategy if isinstance(strategy, str) else "combined"
         self.strategy_params = strategy_params or {}
         self.strategy = self._create_strategy()
+        self.candles = CandleFeed(candle_unit(self.strategy), ma_windows=ma_windows(self.strategy))
         self.logger = self._setup_logger()
-        self.position = self._get_current_position()
+        # 포지션과 원화 잔액은 주문 체결 내역으로 갱신하고, 계좌 조회는 주기적으로만 함
+        self.orders = OrderTracker(self.api, market, logger=self.logger)
+        self.position = self.orders.position
+        self.update_position()
         self.slack_webhook_url = slack_webhook_url
-        self.last_notification_time = None
-        self.notification_cooldown = 3600  # 알림 발송 제한 시간 (초)
+        # 알림은 종류별 전송 간격과 다이제스트로 묶어 백그라운드 스레드에서 전송
+        self.notifier = SlackNotifier(slack_webhook_url, logger=self.logger) if slack_webhook_url else None
         
     def _setup_logger(self):
-        logger = logging.getLogger("trading_bot")
-        logger.setLevel(logging.INFO)
-        
-        # 로그 디렉토리 확인
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
-        
-        # 콘솔 핸들러
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # 파일 핸들러
-        today = datetime.now().strftime("%Y%m%d")
-        file_handler = logging.FileHandler(f"logs/trading_{today}.log")
-        file_handler.setLevel(logging.INFO)
-        
-        # 포맷 설정
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-        
-        # 핸들러 추가
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-        
-        return logger
+        return setup_logger("trading_bot")
     
     def _create_strategy(self):
         """전략 객체 생성"""
-        if self.strategy_name == "ma":
-            short_window = self.strategy_params.get("short_window", 5)
-            long_window = self.strategy_params.get("long_window", 20)
-            return MACrossStrategy(short_window=short_window, long_window=long_window)
-        
-        elif self.strategy_name == "rsi":
-            oversold = self.strategy_params.get("oversold", 30)
-            overbought = self.strategy_params.get("overbought", 70)
-            return RSIStrategy(oversold=oversold, overbought=overbought)
-        
-        elif self.strategy_name == "macd":
-            return MACDStrategy()
-        
-        elif self.strategy_name == "bb":
-            return BollingerBandStrategy()
-        
-        elif self.strategy_name == "volatility":
-            k = self.strategy_params.get("k", 0.5)
-            return VolatilityBreakoutStrategy(k=k)
-        
-        elif self.strategy_name == "percentage":
-            k = self.strategy_params.get("k", 0.5)
-            buy_pct = self.strategy_params.get("buy_pct", 0.20)
-            sell_pct = self.strategy_params.get("sell_pct", 0.05)
-            return PercentageStrategy(buy_pct=buy_pct, sell_pct=sell_pct, k=k)
-        
-        else:  # 기본값은 복합 전략
-            return CombinedStrategy()
-    
-    def _get_current_position(self):
-        """현재 포지션 확인"""
-        accounts = self.api.get_accounts()
-        
-        position = {'has_position': False, 'volume': 0, 'avg_buy_price': 0}
-        
-        # 확인용 로그 추가
-        self.logger.info(f"계정 정보: {accounts}")
-        
-        if not accounts or isinstance(accounts, str):
-            self.logger.warning(f"계정 정보를 가져올 수 없습니다: {accounts}")
-            return position
-            
-        try:
-            for account in accounts:
-                if isinstance(account, dict) and 'currency' in account:
-                    if account['currency'] == self.market.split('-')[1]:
-                        if float(account['balance']) > 0:
-                            position['has_position'] = True
-                            position['volume'] = float(account['balance'])
-                            position['avg_buy_price'] = float(account['avg_buy_price'])
-                        break
-        except Exception as e:
-            self.logger.error(f"포지션 확인 중 오류 발생: {e}")
-        
-        return position
+        return create_strategy(self.strategy_name, self.strategy_params)
     
     def update_position(self):
-        """포지션 업데이트"""
-        self.position = self._get_current_position()
-        self.logger.info(f"현재 포지션: {self.position}")
+        """계좌 조회로 포지션과 원화 잔액을 맞춤"""
+        self.orders.reconcile()
+        self.logger.info(f"현재 포지션: {self.position}, 원화 잔액: {self.orders.krw_balance:,.0f}")
+    
+    def _fetch_candles(self, count):
+        """전략 캔들 단위의 최근 캔들 count개 (변동성 돌파 전략은 일봉, 다른 전략은 15분봉)"""
+        if self.candles.unit == 'day':
+            return self.api.get_day_candles(self.market, count=count)
+        return self.api.get_minute_candles(self.market, unit=self.candles.unit, count=count)
     
     def analyze_market(self):
         """시장 분석"""
         try:
-            # 전략에 따라 다른 데이터 가져오기
-            if isinstance(self.strategy, (VolatilityBreakoutStrategy, PercentageStrategy)):
-                # 일봉 데이터 가져오기 (변동성 돌파 전략용)
-                candles = self.api.get_day_candles(self.market, count=10)
-            else:
-                # 15분 캔들 데이터 가져오기 (다른 전략용)
-                candles = self.api.get_minute_candles(self.market, unit=15, count=120)
-            
-            # 데이터 전처리
-            df = self.analyzer.preprocess_candles(candles)
-            
-            # 지표 계산
-            df = self.analyzer.calculate_indicators(df)
+            # 워밍업 이후에는 최근 캔들만 받아 링버퍼와 증분 지표에 병합
+            if self.candles.needs_warmup or not self.candles.merge(self._fetch_candles(DELTA_COUNT)):
+                # 처음 실행했거나 중간 캔들이 빠진 경우 전체 캔들로 다시 워밍업
+                self.candles.warm(self._fetch_candles(self.candles.capacity))
             
             # 추세 분석
-            trend = self.analyzer.analyze_trend(df)
+            trend = self.candles.trend()
             
             self.logger.info(f"현재 가격: {trend['current_price']}, RSI: {trend['rsi']:.2f}, MACD: {trend['macd']['macd']:.2f}")
             
@@ -145,81 +136,26 @@ class TradingBot:
         
         except Exception as e:
             self.logger.error(f"시장 분석 중 오류 발생: {e}")
-            self.send_notification(f"🚨 시장 분석 오류: {e}")
+            self.send_notification(f"🚨 시장 분석 오류: {e}", "error")
             return None
     
-    def send_notification(self, message):
-        """슬랙으로 알림 전송"""
-        if not self.slack_webhook_url:
-            return
-        
-        # 알림 쿨다운 확인
-        now = datetime.now()
-        if (self.last_notification_time and 
-            (now - self.last_notification_time).total_seconds() < self.notification_cooldown):
-            return
-        
-        try:
-            payload = {
-                "text": message,
-                "username": "TradingBot",
-                "icon_emoji": ":chart_with_upwards_trend:"
-            }
-            
-            response = requests.post(
-                self.slack_webhook_url,
-                data=json.dumps(payload),
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code != 200:
-                self.logger.error(f"슬랙 알림 전송 실패: {response.text}")
-            else:
-                self.last_notification_time = now
-                
-        except Exception as e:
-            self.logger.error(f"슬랙 알림 전송 중 오류 발생: {e}")
+    def send_notification(self, message, category='info'):
+        """슬랙 알림 (백그라운드 전송기에 넣고 바로 반환)"""
+        if self.notifier is not None:
+            self.notifier.notify(message, category)
     
     def execute_trade(self, signal, trend):
         """거래 실행"""
         current_price = trend['current_price']
         
         if signal == 'buy' and not self.position['has_position']:
-            # 보유 현금 조회
-            krw_account = None
-            accounts = self.api.get_accounts()
-            
-            # 계정 정보 유효성 확인
-            if not accounts or isinstance(accounts, str):
-                error_msg = f"계정 정보를 가져올 수 없습니다: {accounts}"
-                self.logger.error(error_msg)
-                self.send_notification(f"⚠️ {error_msg}")
-                return
-            
-            try:
-                for account in accounts:
-                    if isinstance(account, dict) and 'currency' in account:
-                        if account['currency'] == 'KRW':
-                            krw_account = account
-                            break
-            except Exception as e:
-                error_msg = f"계정 정보 확인 중 오류 발생: {e}"
-                self.logger.error(error_msg)
-                self.send_notification(f"⚠️ {error_msg}")
-                return
-            
-            if not krw_account:
-                error_msg = "KRW 계좌를 찾을 수 없습니다."
-                self.logger.error(error_msg)
-                self.send_notification(f"⚠️ {error_msg}")
-                return
-            
-            krw_balance = float(krw_account['balance'])
+            # 원화 잔액은 체결 내역으로 갱신한 값 사용 (계좌 조회 없음)
+            krw_balance = self.orders.krw_balance
             
             if krw_balance < 10000:  # 최소 주문 금액
                 error_msg = f"매수에 필요한 KRW가 부족합니다: {krw_balance}"
                 self.logger.warning(error_msg)
-                self.send_notification(f"⚠️ {error_msg}")
+                self.send_notification(f"⚠️ {error_msg}", "error")
                 return
             
             # 매수 금액 설정 (가용 자산의 30%)
@@ -232,67 +168,85 @@ class TradingBot:
             if 'error' in result:
                 error_msg = f"매수 주문 실패: {result['error']}"
                 self.logger.error(error_msg)
-                self.send_notification(f"🚨 {error_msg}")
+                self.send_notification(f"🚨 {error_msg}", "error")
                 return
             
-            self.logger.info(f"매수 주문 성공: {result}")
-            self.send_notification(f"🟢 매수 체결: {self.market} - {buy_amount:,.0f}원 (가격: {current_price:,.0f}원)")
-            time.sleep(2)  # API 요청 제한 방지
-            self.update_position()
+            # 체결 확인 후 포지션 반영
+            order = self.orders.track(result)
+            price = fill_price(order) or current_price
+            self.logger.info(f"매수 주문 성공: {order['uuid']} ({order.get('state')}), 체결가: {price}, 포지션: {self.position}")
+            self.send_notification(f"🟢 매수 체결: {self.market} - {buy_amount:,.0f}원 (가격: {price:,.0f}원)", "trade")
         
         elif signal == 'sell' and self.position['has_position']:
             # 시장가 매도 주문
             volume = self.position['volume']
             avg_buy_price = self.position['avg_buy_price']
-            profit_pct = (current_price - avg_buy_price) / avg_buy_price * 100
             
-            self.logger.info(f"매도 주문 실행: {volume} {self.market.split('-')[1]} (가격: {current_price}, 손익: {profit_pct:.2f}%)")
+            self.logger.info(f"매도 주문 실행: {volume} {self.market.split('-')[1]} (가격: {current_price})")
             result = self.api.sell_market_order(self.market, volume)
             
             if 'error' in result:
                 error_msg = f"매도 주문 실패: {result['error']}"
                 self.logger.error(error_msg)
-                self.send_notification(f"🚨 {error_msg}")
+                self.send_notification(f"🚨 {error_msg}", "error")
                 return
             
-            self.logger.info(f"매도 주문 성공: {result}")
+            # 체결 확인 후 포지션 반영, 손익은 실제 체결가 기준
+            order = self.orders.track(result)
+            price = fill_price(order) or current_price
+            profit_pct = (price - avg_buy_price) / avg_buy_price * 100
+            self.logger.info(f"매도 주문 성공: {order['uuid']} ({order.get('state')}), 체결가: {price}, 손익: {profit_pct:.2f}%")
             
             # 수익/손실 이모지 설정
             emoji = "🔴" if profit_pct < 0 else "🟢"
-            self.send_notification(f"{emoji} 매도 체결: {self.market} - {volume} 개 (가격: {current_price:,.0f}원, 손익: {profit_pct:.2f}%)")
-            time.sleep(2)  # API 요청 제한 방지
-            self.update_position()
+            self.send_notification(f"{emoji} 매도 체결: {self.market} - {volume} 개 (가격: {price:,.0f}원, 손익: {profit_pct:.2f}%)", "trade")
+    
+    def close_notifier(self):
+        """남은 알림을 보내고 알림 전송 스레드 종료"""
+        if self.notifier is not None:
+            self.notifier.close()
+    
+    def evaluate(self, trend):
+        """분석 결과로 신호를 생성하고 거래 실행"""
+        # 체결 내역으로 관리하는 포지션을 주기적으로 계좌와 맞춤
+        self.orders.maybe_reconcile()
+        
+        # 현재가 및 포지션 정보
+        current_price = trend['current_price']
+        avg_buy_price = self.position.get('avg_buy_price', 0)
+        
+        # 신호 생성 (모든 전략이 같은 시그니처를 사용)
+        current_time = datetime.now().time()
+        signal = self.strategy.generate_signal(trend, current_price, avg_buy_price, current_time)
+        
+        self.logger.info(f"생성된 신호: {signal}")
+        
+        # 거래 실행
+        self.execute_trade(signal, trend)
+        return signal
     
     def run(self, interval=60):
         """봇 실행"""
         self.logger.info(f"Trading Bot 시작 - 마켓: {self.market}, 전략: {self.strategy_name}")
-        self.send_notification(f"🤖 Trading Bot 시작 - 마켓: {self.market}, 전략: {self.strategy_name}")
+        self.send_notification(f"🤖 Trading Bot 시작 - 마켓: {self.market}, 전략: {self.strategy_name}", "status")
         
         try:
+            failures = 0
             while True:
                 # 시장 분석
                 trend = self.analyze_market()
                 
                 if trend is None:
-                    self.logger.warning("시장 데이터를 가져오는데 실패했습니다. 재시도 중...")
-                    time.sleep(10)  # 짧은 대기 후 재시도
+                    # 장애가 계속되면 재시도 간격을 지수적으로 늘림 (UpbitAPI와 같은 백오프)
+                    delay = self.api.backoff(failures)
+                    failures += 1
+                    self.logger.warning(f"시장 데이터를 가져오는데 실패했습니다. {delay:.1f}초 후 재시도 중...")
+                    time.sleep(delay)
                     continue
+                failures = 0
                 
-                # 현재가 및 포지션 정보
-                current_price = trend['current_price']
-                avg_buy_price = self.position.get('avg_buy_price', 0)
-                
-                # 신호 생성
-                if isinstance(self.strategy, (VolatilityBreakoutStrategy, PercentageStrategy)):
-                    current_time = datetime.now().time()
-                    signal = self.strategy.generate_signal(trend, current_price, avg_buy_price, current_time)
-                else:
-                    signal = self.strategy.generate_signal(trend)
-                
-                self.logger.info(f"생성된 신호: {signal}")
-                
-                # 거래 실행
-                self.execute_trade(signal, trend)
+                # 신호 생성 및 거래 실행
+                self.evaluate(trend)
                 
                 # 대기
                 self.logger.info(f"{interval}초 대기 중...")
@@ -300,13 +254,84 @@ class TradingBot:
         
         except KeyboardInterrupt:
             self.logger.info("사용자에 의한 프로그램 종료")
-            self.send_notification("🛑 사용자에 의한 Trading Bot 종료")
+            self.send_notification("🛑 사용자에 의한 Trading Bot 종료", "status")
+        
+        except Exception as e:
+            error_msg = f"오류 발생: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            self.send_notification(f"🚨 Trading Bot 오류: {error_msg}\n{traceback.format_exc()}", "error")
+            
+        finally:
+            self.logger.info("Trading Bot 종료")
+            self.send_notification("🔄 Trading Bot 종료", "status")
+            self.close_notifier()
+    
+    async def _evaluate_event(self, event, trend):
+        """이벤트 하나 처리 (가격 이벤트는 직전 분석 결과에 이벤트 가격만 반영해 바로 평가)"""
+        if event['type'] == 'price' and trend is not None:
+            # 캔들은 그대로이므로 캔들 조회/지표 계산 없이 평가
+            trend = dict(trend, current_price=event['price'])
+        else:
+            analyzed = await asyncio.to_thread(self.analyze_market)
+            for attempt in range(ANALYZE_RETRIES):
+                if analyzed is not None:
+                    break
+                # 이벤트 하나에서는 제한된 횟수만 백오프하며 재시도 (UpbitAPI와 같은 백오프)
+                delay = self.api.backoff(attempt)
+                self.logger.warning(f"시장 데이터를 가져오는데 실패했습니다. {delay:.1f}초 후 재시도 중...")
+                await asyncio.sleep(delay)
+                analyzed = await asyncio.to_thread(self.analyze_market)
+            
+            if analyzed is None:
+                if event['type'] != 'reset' or trend is None:
+                    # 이번 이벤트는 건너뛰고 다음 이벤트에서 다시 분석
+                    self.logger.warning(f"시장 분석에 실패해 {event['type']} 이벤트를 건너뜁니다.")
+                    return trend
+                # 09:00 리셋 매도는 캔들과 관계없으므로 직전 분석 결과로 평가
+                self.logger.warning("시장 분석에 실패해 직전 분석 결과로 리셋 이벤트를 평가합니다.")
+            else:
+                trend = analyzed
+        
+        self.logger.info(f"{event['type']} 이벤트 평가 (가격: {trend['current_price']})")
+        await asyncio.to_thread(self.evaluate, trend)
+        return trend
+    
+    async def _run_events(self, ws_url=None):
+        websocket = UpbitWebSocket([self.market], channels=('ticker',), url=ws_url or os.environ.get('UPBIT_WS_URL'))
+        scheduler = EventScheduler([self.market], candle_unit(self.strategy), websocket=websocket)
+        
+        # 시작 시 한 번 평가해 목표가 등 가격 조건 준비
+        trend = await self._evaluate_event({'type': 'start', 'price': None}, None)
+        scheduler.set_triggers(self.market, *price_triggers(self.strategy, self.position))
+        
+        async for event in scheduler:
+            trend = await self._evaluate_event(event, trend)
+            # 평가 후 목표가/포지션이 바뀌었을 수 있으므로 가격 조건 다시 지정
+            scheduler.set_triggers(self.market, *price_triggers(self.strategy, self.position))
+    
+    def run_events(self, ws_url=None):
+        """
+        이벤트 방식 봇 실행
+        
+        고정 간격으로 폴링하지 않고 전략 캔들 마감, 09:00 리셋/09:05 매수 금지 구간 종료,
+        WebSocket 시세가 목표가 등 전략 가격 조건을 넘는 시점에만 평가한다.
+        """
+        self.logger.info(f"Trading Bot 시작 (이벤트 방식) - 마켓: {self.market}, 전략: {self.strategy_name}")
+        self.send_notification(f"🤖 Trading Bot 시작 (이벤트 방식) - 마켓: {self.market}, 전략: {self.strategy_name}", "status")
+        
+        try:
+            asyncio.run(self._run_events(ws_url))
+        
+        except KeyboardInterrupt:
+            self.logger.info("사용자에 의한 프로그램 종료")
+            self.send_notification("🛑 사용자에 의한 Trading Bot 종료", "status")
         
         except Exception as e:
             error_msg = f"오류 발생: {e}"
             self.logger.error(error_msg, exc_info=True)
-            self.send_notification(f"🚨 Trading Bot 오류: {error_msg}\n{traceback.format_exc()}")
+            self.send_notification(f"🚨 Trading Bot 오류: {error_msg}\n{traceback.format_exc()}", "error")
             
         finally:
             self.logger.info("Trading Bot 종료")
-            self.send_notification("🔄 Trading Bot 종료")
\ No newline at end of file
+            self.send_notification("🔄 Trading Bot 종료", "status")
+            self.close_notifier()
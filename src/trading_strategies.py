@@ -1,7 +1,29 @@
+import asyncio
 import numpy as np
 import pandas as pd
 from datetime import datetime, time
 
+from src.async_upbit_api import AsyncUpbitAPI
+from src.dca_kernel import breakout_inputs, percentage_signals
+
+# generate_signals가 반환하는 캔들별 신호 값
+BUY, HOLD, SELL = 1, 0, -1
+SIGNAL_NAMES = {BUY: 'buy', HOLD: 'hold', SELL: 'sell'}
+
+
+def combine_signals(buy, sell):
+    """매수/매도 불리언 배열을 신호 배열로 변환 (둘 다 참이면 매수 우선)"""
+    signals = np.zeros(len(buy), dtype=np.int8)
+    signals[buy] = BUY
+    signals[sell & ~buy] = SELL
+    return signals
+
+
+def is_reset_time(current_time):
+    """변동성 돌파 일봉 리셋 구간(09:00~09:05)인지 여부"""
+    return time(9, 0) <= current_time <= time(9, 5)
+
+
 class MACrossStrategy:
     """이동평균선 교차 전략"""
     
@@ -10,22 +32,72 @@ class MACrossStrategy:
         self.long_window = long_window
         self.position = None
     
-    def generate_signal(self, trend):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
+        """
+        마지막 캔들의 교차 신호
+        
+        기본값 5/20은 trend['ma_trend'] 플래그를 쓰고, 다른 창은 trend['ma'](IncrementalIndicators)나
+        trend['candle_data'](DataAnalyzer)에서 이동평균을 구한다. 데이터가 부족하면 'hold'.
+        """
+        if (self.short_window, self.long_window) == (5, 20):
+            ma_trend = trend['ma_trend']
+            above_short = ma_trend['above_ma5']
+            above_long = ma_trend['above_ma20']
+            short_above_long = ma_trend['ma5_above_ma20']
+        else:
+            averages = self._latest_averages(trend)
+            if averages is None:
+                return 'hold'
+            short_ma, long_ma = averages
+            price = trend['current_price']
+            above_short = price > short_ma
+            above_long = price > long_ma
+            short_above_long = short_ma > long_ma
+        
         signal = 'hold'
         
         # 단기 이동평균이 장기 이동평균을 상향돌파 (골든 크로스)
-        if (not trend['ma_trend']['ma5_above_ma20'] and 
-            trend['ma_trend']['above_ma5'] and 
-            trend['ma_trend']['above_ma20']):
+        if not short_above_long and above_short and above_long:
             signal = 'buy'
         
         # 단기 이동평균이 장기 이동평균을 하향돌파 (데드 크로스)
-        elif (trend['ma_trend']['ma5_above_ma20'] and 
-              not trend['ma_trend']['above_ma5'] and 
-              not trend['ma_trend']['above_ma20']):
+        elif short_above_long and not above_short and not above_long:
             signal = 'sell'
         
         return signal
+    
+    def _latest_averages(self, trend):
+        """trend에서 단기/장기 이동평균의 마지막 값 (구할 수 없으면 None)"""
+        averages = trend.get('ma', {})
+        if self.short_window in averages and self.long_window in averages:
+            return averages[self.short_window], averages[self.long_window]
+        
+        df = trend.get('candle_data')
+        if df is None or len(df) < max(self.short_window, self.long_window):
+            return None
+        return tuple(df[f'ma{w}'].iloc[-1] if f'ma{w}' in df else df['trade_price'].iloc[-w:].mean()
+                     for w in (self.short_window, self.long_window))
+    
+    def _moving_average(self, df, window):
+        column = f'ma{window}'
+        if column in df:
+            return df[column].to_numpy()
+        return df['trade_price'].rolling(window=window).mean().to_numpy()
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """
+        지표 데이터프레임의 모든 캔들에 대한 신호 배열 (1: 매수, -1: 매도, 0: 홀드)
+        
+        short_window/long_window 이동평균을 사용한다 (generate_signal과 같은 조건).
+        """
+        close = df['trade_price'].to_numpy()
+        short_ma = self._moving_average(df, self.short_window)
+        long_ma = self._moving_average(df, self.long_window)
+        above_short = close > short_ma
+        above_long = close > long_ma
+        short_above_long = short_ma > long_ma
+        return combine_signals(~short_above_long & above_short & above_long,
+                               short_above_long & ~above_short & ~above_long)
 
 
 class RSIStrategy:
@@ -36,7 +108,7 @@ class RSIStrategy:
         self.overbought = overbought
         self.position = None
     
-    def generate_signal(self, trend):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
         signal = 'hold'
         
         # 과매도 구간에서 매수
@@ -48,6 +120,11 @@ class RSIStrategy:
             signal = 'sell'
         
         return signal
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """지표 데이터프레임의 모든 캔들에 대한 신호 배열 (1: 매수, -1: 매도, 0: 홀드)"""
+        rsi = df['rsi'].to_numpy()
+        return combine_signals(rsi < self.oversold, rsi > self.overbought)
 
 
 class MACDStrategy:
@@ -56,7 +133,7 @@ class MACDStrategy:
     def __init__(self):
         self.position = None
     
-    def generate_signal(self, trend):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
         signal = 'hold'
         
         # MACD 선이 시그널 선을 상향돌파 (골든 크로스)
@@ -68,6 +145,17 @@ class MACDStrategy:
             signal = 'sell'
         
         return signal
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """지표 데이터프레임의 모든 캔들에 대한 신호 배열 (1: 매수, -1: 매도, 0: 홀드)"""
+        macd = df['macd'].to_numpy()
+        signal = df['macd_signal'].to_numpy()
+        bullish = np.zeros(len(macd), dtype=bool)
+        bearish = np.zeros(len(macd), dtype=bool)
+        # 직전 캔들 대비 교차 여부 (첫 캔들은 직전 값이 없어 홀드)
+        bullish[1:] = (macd[:-1] < signal[:-1]) & (macd[1:] > signal[1:])
+        bearish[1:] = (macd[:-1] > signal[:-1]) & (macd[1:] < signal[1:])
+        return combine_signals(bullish, bearish)
 
 
 class BollingerBandStrategy:
@@ -76,7 +164,7 @@ class BollingerBandStrategy:
     def __init__(self):
         self.position = None
     
-    def generate_signal(self, trend):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
         signal = 'hold'
         
         # 가격이 하단 밴드에 접근하면 매수
@@ -88,6 +176,15 @@ class BollingerBandStrategy:
             signal = 'sell'
         
         return signal
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """지표 데이터프레임의 모든 캔들에 대한 신호 배열 (1: 매수, -1: 매도, 0: 홀드)"""
+        close = df['trade_price'].to_numpy()
+        upper = df['upper_band'].to_numpy()
+        lower = df['lower_band'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bb_position = (close - lower) / (upper - lower)
+        return combine_signals(bb_position < 0.05, bb_position > 0.95)
 
 
 class VolatilityBreakoutStrategy:
@@ -109,14 +206,16 @@ class VolatilityBreakoutStrategy:
         self.target_price = target
         return target
     
-    def generate_signal(self, trend, current_price, current_time=None):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
         signal = 'hold'
         
+        if current_price is None:
+            current_price = trend['current_price']
         if current_time is None:
             current_time = datetime.now().time()
         
         # 9:00~09:05에는 매도 신호 (일봉 기준 리셋 시간)
-        if time(9, 0) <= current_time <= time(9, 5):
+        if is_reset_time(current_time):
             signal = 'sell'
             self.target_price = None
             return signal
@@ -130,6 +229,17 @@ class VolatilityBreakoutStrategy:
             signal = 'buy'
         
         return signal
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """
+        캔들별 신호 배열 (거래일마다 목표가를 다시 계산)
+        
+        거래일(KST 09:00 기준, df['datetime'])마다 당일 시가 + 전일 (고가 - 저가) * k를 목표가로 하여
+        종가가 목표가 이상이면 매수, 다음 거래일의 첫 캔들(09:00 리셋)에서 매도한다. 분봉은 09:00~09:05에
+        매수하지 않는다. 리셋 캔들은 current_time이 아니라 캔들 시각으로 정하며 target_price는 바꾸지 않는다.
+        """
+        _, _, close, target, tradable, reset = breakout_inputs(df, self.k)
+        return combine_signals((close >= target) & tradable, reset)
 
 
 class PercentageStrategy:
@@ -142,9 +252,11 @@ class PercentageStrategy:
         self.vb_strategy = VolatilityBreakoutStrategy(k=k)
         self.position = None
     
-    def generate_signal(self, trend, current_price, avg_buy_price=None, current_time=None):
+    def generate_signal(self, trend, current_price=None, avg_buy_price=None, current_time=None):
         # 기본 변동성 돌파 전략 신호
-        vb_signal = self.vb_strategy.generate_signal(trend, current_price, current_time)
+        if current_price is None:
+            current_price = trend['current_price']
+        vb_signal = self.vb_strategy.generate_signal(trend, current_price, current_time=current_time)
         
         # 보유 중이 아닐 때 (매수 판단)
         if avg_buy_price is None or avg_buy_price == 0:
@@ -162,6 +274,16 @@ class PercentageStrategy:
             return 'buy'
         
         return vb_signal
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """
+        캔들별 신호 배열 (dca_kernel과 같이 매수/추가 매수에 따른 평균 매수가를 따라가며 계산)
+        
+        avg_buy_price가 있으면 그 평균 매수가로 보유 중인 상태에서 시작한다.
+        백테스트 엔진은 보유 중 매수 신호(추가 매수)를 체결하지 않으므로 추가 매수 손익까지 보려면
+        dca_kernel.backtest_percentage를 사용한다.
+        """
+        return percentage_signals(df, self, avg_buy_price)
 
 
 class CombinedStrategy:
@@ -183,7 +305,7 @@ class CombinedStrategy:
         rsi_signal = self.rsi_strategy.generate_signal(trend)
         macd_signal = self.macd_strategy.generate_signal(trend)
         bb_signal = self.bb_strategy.generate_signal(trend)
-        vb_signal = self.vb_strategy.generate_signal(trend, current_price, current_time)
+        vb_signal = self.vb_strategy.generate_signal(trend, current_price, current_time=current_time)
         
         buy_count = sum(1 for signal in [ma_signal, rsi_signal, macd_signal, bb_signal, vb_signal] if signal == 'buy')
         sell_count = sum(1 for signal in [ma_signal, rsi_signal, macd_signal, bb_signal, vb_signal] if signal == 'sell')
@@ -195,18 +317,103 @@ class CombinedStrategy:
             return 'sell'
         else:
             return 'hold'
+    
+    def generate_signals(self, df, avg_buy_price=None, current_time=None):
+        """전략별 신호 배열의 매수/매도 표 수로 계산한 복합 신호 배열"""
+        votes = np.stack([
+            self.ma_strategy.generate_signals(df),
+            self.rsi_strategy.generate_signals(df),
+            self.macd_strategy.generate_signals(df),
+            self.bb_strategy.generate_signals(df),
+            self.vb_strategy.generate_signals(df, current_time=current_time),
+        ])
+        buy_count = (votes == BUY).sum(axis=0)
+        sell_count = (votes == SELL).sum(axis=0)
+        return combine_signals((buy_count >= 3) & (buy_count > sell_count),
+                               (sell_count >= 3) & (sell_count > buy_count))
+
+
+def make_k_range(k_step=0.1, k_min=0.1, k_max=0.9):
+    """k_min부터 k_max까지 k_step 간격의 k값 목록"""
+    steps = int(round((k_max - k_min) / k_step))
+    return [round(k_min + k_step * i, 10) for i in range(steps + 1)]
+
+
+def fetch_day_candles_many(coins, count, base_url=None, max_concurrency=10):
+    """여러 코인의 일봉을 동시에 조회 ({코인: 캔들 목록}, 조회 실패한 코인은 제외)"""
+    async def run():
+        async with AsyncUpbitAPI(max_concurrency=max_concurrency, base_url=base_url) as client:
+            return await client.get_day_candles_many(coins, count=count)
+    
+    results = asyncio.run(run())
+    return {coin: candles for coin, candles in results.items() if isinstance(candles, list) and candles}
+
+
+def volatility_breakout_returns(candles_by_coin, k_range, fee=0.0, compound=False):
+    """
+    (코인, k, 일) 3차원 배열로 변동성 돌파 전략 수익률 계산
+    
+    매일 목표가(당일 시가 + 전일 변동폭 * k)를 돌파하면 목표가에 매수하고 종가에 매도한다고 본다.
+    
+    Args:
+        candles_by_coin: {코인: 최신순 일봉 목록}
+        k_range: k값 목록
+        fee: 매수/매도 시 각각 적용할 수수료율 (예: 0.0005)
+        compound: True면 일별 수익률을 복리로, False면 단순 합으로 누적
+    
+    Returns:
+        (코인 목록, k 배열, 코인 x k 누적 수익률 배열)
+    """
+    coins = list(candles_by_coin)
+    k = np.asarray(k_range, dtype=np.float64)
+    days = max((len(c) for c in candles_by_coin.values()), default=0)
+    
+    # 최신순 캔들을 (코인, 일) 배열로 정렬 (캔들이 적은 코인은 NaN으로 채움)
+    fields = ('opening_price', 'high_price', 'low_price', 'trade_price')
+    prices = np.full((len(fields), len(coins), days), np.nan)
+    for c, coin in enumerate(coins):
+        candles = candles_by_coin[coin]
+        for f, field in enumerate(fields):
+            prices[f, c, :len(candles)] = [candle[field] for candle in candles]
+    opening, high, low, close = prices
+    
+    # 당일(i-1)과 전일(i)의 쌍: 최신 캔들부터 과거 순서
+    today_open, today_high, today_close = opening[:, :-1], high[:, :-1], close[:, :-1]
+    yesterday_range = high[:, 1:] - low[:, 1:]
+    
+    target = today_open[:, None, :] + yesterday_range[:, None, :] * k[None, :, None]
+    hit = today_high[:, None, :] >= target
+    if fee:
+        trade_return = today_close[:, None, :] * (1 - fee) / (target * (1 + fee)) - 1
+    else:
+        trade_return = (today_close[:, None, :] - target) / target
+    daily = np.where(hit, trade_return, 0.0)
+    
+    if daily.shape[-1] == 0:
+        return coins, k, np.zeros((len(coins), len(k)))
+    if compound:
+        total = np.prod(1 + daily, axis=-1) - 1
+    else:
+        # 최신순으로 차례대로 더한 값 (cumsum은 순차 합산이라 기존 루프와 같은 결과)
+        total = np.cumsum(daily, axis=-1)[..., -1]
+    return coins, k, total
 
 
 # 최적의 k값과 코인을 찾는 함수
-def find_best_k_and_coin(api, coins, days=7, k_range=None):
+def find_best_k_and_coin(api, coins, days=7, k_range=None, k_step=None, fee=0.0, compound=False):
     """
     여러 코인과 k값에 대해 백테스팅하여 최적의 조합을 찾음
     
+    모든 코인의 일봉을 동시에 조회한 뒤 (코인, k, 일) 조합을 한 번의 배열 연산으로 평가한다.
+    
     Args:
-        api: UpbitAPI 객체
+        api: UpbitAPI 객체 (시세 조회 주소로 사용)
         coins: 분석할 코인 목록 (예: ['KRW-BTC', 'KRW-ETH', ...])
         days: 분석할 기간 (일)
         k_range: 테스트할 k값 범위 (예: [0.1, 0.2, ..., 0.9])
+        k_step: k_range가 없을 때 0.1~0.9를 이 간격으로 탐색 (예: 0.01)
+        fee: 매수/매도 시 각각 적용할 수수료율
+        compound: 일별 수익률을 복리로 누적할지 여부
     
     Returns:
         best_coin: 최적의 코인
@@ -214,39 +421,17 @@ def find_best_k_and_coin(api, coins, days=7, k_range=None):
         best_profit: 최대 수익률
     """
     if k_range is None:
-        k_range = [round(0.1 * i, 1) for i in range(5, 10)]  # 0.5 ~ 0.9
-    
-    best_profit = -float('inf')
-    best_coin = None
-    best_k = None
-    
-    for coin in coins:
-        # 일봉 데이터 가져오기
-        candles = api.get_day_candles(coin, count=days+1)
-        
-        for k in k_range:
-            profit = 0
-            strategy = VolatilityBreakoutStrategy(k=k)
-            
-            for i in range(1, len(candles)):
-                yesterday = candles[i]
-                today = candles[i-1]
-                
-                # 시가 기준 변동성 돌파 전략
-                open_price = today['opening_price']
-                high_price = today['high_price']
-                
-                # 목표가 계산
-                target_price = open_price + (yesterday['high_price'] - yesterday['low_price']) * k
-                
-                # 목표가에 도달했는지 확인
-                if high_price >= target_price:
-                    # 매수 후 종가에 매도했을 때의 수익률
-                    profit += (today['trade_price'] - target_price) / target_price
-            
-            if profit > best_profit:
-                best_profit = profit
-                best_coin = coin
-                best_k = k
-    
-    return best_coin, best_k, best_profit
\ No newline at end of file
+        if k_step is not None:
+            k_range = make_k_range(k_step)
+        else:
+            k_range = [round(0.1 * i, 1) for i in range(5, 10)]  # 0.5 ~ 0.9
+    
+    candles_by_coin = fetch_day_candles_many(coins, days+1, base_url=getattr(api, 'base_url', None))
+    if not candles_by_coin:
+        return None, None, -float('inf')
+    
+    coins, k, total = volatility_breakout_returns(candles_by_coin, k_range, fee, compound)
+    
+    # 코인 순서, k 순서로 처음 나온 최댓값 선택
+    c, i = np.unravel_index(np.argmax(total), total.shape)
+    return coins[c], k_range[i], float(total[c, i])
@@ -2,15 +2,83 @@ import os
 import jwt
 import uuid
 import hashlib
+import random
+import threading
 import requests
 import time
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode, unquote
 
+from src.rate_limiter import get_rate_limiter, parse_remaining_req
+
+DEFAULT_BASE_URL = "https://api.upbit.com/v1"
+
+
+class LatencyHistogram:
+    """엔드포인트별 API 호출 지연시간 히스토그램"""
+    
+    # 버킷 상한 (초)
+    BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float('inf'))
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._sums = {}
+    
+    def observe(self, endpoint, seconds):
+        """지연시간 기록"""
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0] * len(self.BUCKETS))
+            for i, upper in enumerate(self.BUCKETS):
+                if seconds <= upper:
+                    counts[i] += 1
+                    break
+            self._sums[endpoint] = self._sums.get(endpoint, 0.0) + seconds
+    
+    def snapshot(self):
+        """엔드포인트별 호출 횟수, 평균 지연시간, 버킷 분포 반환"""
+        with self._lock:
+            result = {}
+            for endpoint, counts in self._counts.items():
+                total = sum(counts)
+                result[endpoint] = {
+                    'count': total,
+                    'mean': self._sums[endpoint] / total if total else 0.0,
+                    'buckets': dict(zip(self.BUCKETS, counts)),
+                }
+            return result
+    
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+
 class UpbitAPI:
-    def __init__(self, access_key, secret_key):
+    # 재시도 대상 상태 코드 (요청 제한, 서버 오류)
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, access_key, secret_key, pool_size=10, timeout=(3.05, 10),
+                 max_retries=3, backoff_factor=0.5, max_backoff=8.0, base_url=None):
         self.access_key = access_key
         self.secret_key = secret_key
-        self.base_url = "https://api.upbit.com/v1"
+        # UPBIT_API_URL 환경 변수로 모의 서버 등 다른 주소를 지정할 수 있음
+        self.base_url = base_url or os.environ.get('UPBIT_API_URL', DEFAULT_BASE_URL)
+        self.timeout = timeout  # (연결 타임아웃, 읽기 타임아웃)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.latency = LatencyHistogram()
+        
+        # Keep-Alive 커넥션 풀 세션 (재시도는 _request에서 직접 처리)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def close(self):
+        """세션 종료"""
+        self.session.close()
     
     def _get_headers(self, query=None):
         if query:
@@ -36,17 +104,68 @@ class UpbitAPI:
         # PyJWT 버전에 따른 반환 타입 처리
         if isinstance(jwt_token, bytes):
             jwt_token = jwt_token.decode('utf-8')
-            
+        
         authorization = f"Bearer {jwt_token}"
         
         return {"Authorization": authorization}
     
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (지수 백오프 + full jitter, 봇 재시도 루프에서도 사용)"""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+    
+    def _request(self, method, path, endpoint=None, params=None, body=None, auth=False,
+                 idempotent=True, group=None):
+        """
+        세션을 통한 API 요청
+        
+        idempotent=True인 요청만 429/5xx 및 연결 오류 시 재시도한다.
+        주문 생성처럼 중복 실행되면 안 되는 요청은 idempotent=False로 호출한다.
+        group은 요청 수 제한 그룹이며 생략하면 인증 여부로 quotation/exchange를 정한다.
+        """
+        url = f"{self.base_url}{path}"
+        endpoint = endpoint or path
+        retries = self.max_retries if idempotent else 0
+        limiter = get_rate_limiter(group or ('exchange' if auth else 'quotation'))
+        
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            # nonce가 재사용되지 않도록 시도마다 새 토큰 발급
+            headers = self._get_headers(params or body) if auth else None
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, json=body,
+                                                headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.latency.observe(endpoint, time.perf_counter() - start)
+                if attempt >= retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            
+            self.latency.observe(endpoint, time.perf_counter() - start)
+            
+            # 서버가 알려준 남은 요청 수로 제한기 보정
+            remaining = parse_remaining_req(response.headers.get('Remaining-Req')).get('sec')
+            if remaining is not None:
+                limiter.update_remaining(remaining)
+            if response.status_code == 429:
+                limiter.penalize()
+            
+            if response.status_code in self.RETRY_STATUS_CODES and attempt < retries:
+                time.sleep(self.backoff(attempt))
+                continue
+            return response
+        
+        return response
+    
+    def get_latency_stats(self):
+        """엔드포인트별 지연시간 통계"""
+        return self.latency.snapshot()
+    
     def get_accounts(self):
         """계좌 조회"""
-        url = f"{self.base_url}/accounts"
-        headers = self._get_headers()
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", "/accounts", auth=True)
             response.raise_for_status()  # 응답 상태 코드 확인
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -56,64 +175,68 @@ class UpbitAPI:
             print(f"JSON 파싱 중 오류 발생: {e}, 응답: {response.text}")
             return []  # JSON 파싱 실패 시 빈 리스트 반환
     
+    def get_markets(self, quote='KRW'):
+        """거래 가능한 마켓 코드 목록 (quote가 None이면 전체)"""
+        response = self._request("GET", "/market/all")
+        markets = [item['market'] for item in response.json()]
+        if quote:
+            markets = [m for m in markets if m.startswith(f"{quote}-")]
+        return markets
+    
     def get_ticker(self, markets):
         """현재가 조회"""
-        url = f"{self.base_url}/ticker"
         params = {'markets': markets}
-        response = requests.get(url, params=params)
+        response = self._request("GET", "/ticker", params=params)
         return response.json()
     
     def get_orderbook(self, markets):
         """호가 정보 조회"""
-        url = f"{self.base_url}/orderbook"
         params = {'markets': markets}
-        response = requests.get(url, params=params)
+        response = self._request("GET", "/orderbook", params=params)
         return response.json()
     
-    def get_minute_candles(self, market, unit=1, count=200):
+    def get_minute_candles(self, market, unit=1, count=200, to=None):
         """분 캔들 조회"""
-        url = f"{self.base_url}/candles/minutes/{unit}"
         params = {'market': market, 'count': count}
-        response = requests.get(url, params=params)
+        if to:
+            params['to'] = to  # 마지막 캔들 시각 (exclusive, UTC)
+        response = self._request("GET", f"/candles/minutes/{unit}", endpoint="/candles/minutes", params=params)
         return response.json()
     
-    def get_day_candles(self, market, count=200):
+    def get_day_candles(self, market, count=200, to=None):
         """일 캔들 조회"""
-        url = f"{self.base_url}/candles/days"
         params = {'market': market, 'count': count}
-        response = requests.get(url, params=params)
+        if to:
+            params['to'] = to  # 마지막 캔들 시각 (exclusive, UTC)
+        response = self._request("GET", "/candles/days", params=params)
         return response.json()
     
     def buy_market_order(self, market, price):
         """시장가 매수"""
-        url = f"{self.base_url}/orders"
         query = {
             'market': market,
             'side': 'bid',
             'price': str(price),
             'ord_type': 'price',
         }
-        headers = self._get_headers(query)
-        response = requests.post(url, json=query, headers=headers)
+        response = self._request("POST", "/orders", body=query, auth=True,
+                                 idempotent=False, group="order")
         return response.json()
     
     def sell_market_order(self, market, volume):
         """시장가 매도"""
-        url = f"{self.base_url}/orders"
         query = {
             'market': market,
             'side': 'ask',
             'volume': str(volume),
             'ord_type': 'market',
         }
-        headers = self._get_headers(query)
-        response = requests.post(url, json=query, headers=headers)
+        response = self._request("POST", "/orders", body=query, auth=True,
+                                 idempotent=False, group="order")
         return response.json()
     
     def get_order(self, uuid_value):
         """주문 조회"""
-        url = f"{self.base_url}/order"
         query = {'uuid': uuid_value}
-        headers = self._get_headers(query)
-        response = requests.get(url, params=query, headers=headers)
+        response = self._request("GET", "/order", params=query, auth=True)
         return response.json()
\ No newline at end of file
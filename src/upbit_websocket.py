@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+import json
+import random
+import uuid
+
+import websockets
+
+# 구독 가능한 채널
+CHANNELS = ('ticker', 'trade', 'orderbook')
+
+
+class UpbitWebSocket:
+    """
+    업비트 공개 WebSocket 시세 스트리밍 클라이언트
+    
+    ticker, trade, orderbook 채널을 구독하고 수신한 메시지를 dict로 파싱해 전달한다.
+    연결이 끊기면 지수 백오프로 재연결한 뒤 같은 마켓을 다시 구독한다.
+    
+    사용 예:
+        ws = UpbitWebSocket(['KRW-BTC', 'KRW-ETH'], channels=('ticker',))
+        async for event in ws:
+            print(event['code'], event['trade_price'])
+        
+        # 또는 콜백 방식
+        await UpbitWebSocket(['KRW-BTC'], callback=on_event).run()
+    """
+    
+    URL = "wss://api.upbit.com/websocket/v1"
+    
+    def __init__(self, markets, channels=CHANNELS, url=None, callback=None,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0, ping_interval=20):
+        for channel in channels:
+            if channel not in CHANNELS:
+                raise ValueError(f"지원하지 않는 채널입니다: {channel}")
+        self.markets = list(markets)
+        self.channels = tuple(channels)
+        self.url = url or self.URL
+        self.callback = callback
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.reconnect_count = 0
+        self._connection = None
+        self._stopped = False
+    
+    def subscribe_message(self):
+        """구독 요청 메시지"""
+        message = [{'ticket': str(uuid.uuid4())}]
+        for channel in self.channels:
+            message.append({'type': channel, 'codes': self.markets})
+        message.append({'format': 'DEFAULT'})
+        return json.dumps(message)
+    
+    async def update_markets(self, markets):
+        """구독 마켓 변경 (연결 중이면 즉시 다시 구독)"""
+        self.markets = list(markets)
+        if self._connection is not None:
+            await self._connection.send(self.subscribe_message())
+    
+    def stop(self):
+        """스트리밍 중지"""
+        self._stopped = True
+        if self._connection is not None:
+            asyncio.ensure_future(self._connection.close())
+    
+    @staticmethod
+    def parse_message(message):
+        """수신 메시지 파싱 (시세 이벤트가 아니면 None)"""
+        if isinstance(message, bytes):
+            message = message.decode('utf-8')
+        data = json.loads(message)
+        if not isinstance(data, dict) or data.get('type') not in CHANNELS:
+            return None  # {"status": "UP"} 등 상태 메시지
+        return data
+    
+    async def __aiter__(self):
+        """재연결을 포함해 시세 이벤트를 계속 생성하는 비동기 이터레이터"""
+        self._stopped = False
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url, ping_interval=self.ping_interval) as connection:
+                    self._connection = connection
+                    await connection.send(self.subscribe_message())
+                    delay = self.reconnect_delay
+                    async for message in connection:
+                        event = self.parse_message(message)
+                        if event is not None:
+                            yield event
+            except (websockets.ConnectionClosed, OSError, asyncio.TimeoutError):
+                pass
+            finally:
+                self._connection = None
+            
+            if self._stopped:
+                break
+            # 지수 백오프 + 지터 후 재연결 (재구독은 연결 직후 자동 수행)
+            self.reconnect_count += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(self.max_reconnect_delay, delay * 2)
+    
+    async def run(self):
+        """수신한 이벤트마다 callback 호출 (동기 함수와 코루틴 함수 모두 가능)"""
+        if self.callback is None:
+            raise ValueError("callback이 지정되지 않았습니다.")
+        async for event in self:
+            result = self.callback(event)
+            if inspect.isawaitable(result):
+                await result
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_engine import ensure_indicators
+from src.param_sweep import DEFAULT_GRIDS, RANK_BY, STRATEGIES, SharedFrame, attach_frame, expand_grid, sweep_stats
+
+
+def make_folds(n, train_size, test_size, step=None, anchored=False):
+    """
+    학습/검증 구간 인덱스 목록
+    
+    Args:
+        n: 전체 캔들 수
+        train_size: 학습 구간 캔들 수
+        test_size: 검증 구간 캔들 수
+        step: 다음 구간까지 이동할 캔들 수 (기본값: test_size, 검증 구간이 겹치지 않음)
+        anchored: True면 학습 구간 시작을 처음 캔들에 고정하고 끝만 늘림
+    
+    Returns:
+        [(학습 시작, 학습 끝=검증 시작, 검증 끝), ...] (끝 인덱스는 포함하지 않음)
+    """
+    step = step or test_size
+    folds = []
+    train_start, train_end = 0, train_size
+    while train_end + test_size <= n:
+        folds.append((train_start, train_end, train_end + test_size))
+        train_end += step
+        if not anchored:
+            train_start += step
+    return folds
+
+
+# 워커 프로세스의 공유 지표 데이터프레임 (공유 메모리, 데이터프레임)
+_worker_frame = None
+
+
+def _init_worker(spec):
+    global _worker_frame
+    _worker_frame = attach_frame(spec)
+
+
+def _optimize(df, window, strategy_name, params_list, initial_capital):
+    """학습 구간(window)에서 순위 기준이 가장 높은 파라미터와 그 통계"""
+    best_params, best_stats = None, None
+    for params in params_list:
+        stats = sweep_stats(df, STRATEGIES[strategy_name](**params), initial_capital, window)
+        if best_stats is None or stats[RANK_BY] > best_stats[RANK_BY]:
+            best_params, best_stats = params, stats
+    return best_params, best_stats
+
+
+def _run_fold(task):
+    index, (train_start, train_end, test_end), strategy_name, params_list, initial_capital = task
+    df = _worker_frame[1]
+    
+    # 지표와 신호는 전체 구간에서 계산하고 거래만 구간 안에서 하므로 구간 앞부분을 워밍업으로 잃지 않음
+    best_params, train_stats = _optimize(df, (train_start, train_end), strategy_name, params_list, initial_capital)
+    test_stats = sweep_stats(df, STRATEGIES[strategy_name](**best_params), initial_capital, (train_end, test_end))
+    
+    return {
+        'fold': index,
+        'train_start': train_start,
+        'test_start': train_end,
+        'test_end': test_end,
+        **best_params,
+        'train_return': train_stats[RANK_BY],
+        'test_return': test_stats[RANK_BY],
+        'test_trades': test_stats['buy_count'],
+    }
+
+
+def walk_forward(df, strategy_name, train_size, test_size, grid=None, step=None, anchored=False,
+                 initial_capital=1000000, max_workers=None):
+    """
+    워크포워드 최적화
+    
+    구간마다 학습 구간에서 파라미터 격자 중 최고 수익률 조합을 고르고 바로 다음 검증 구간에서
+    그 조합의 수익률을 측정한다. 지표는 전체 데이터에서 한 번만 계산해 공유 메모리에 올리고,
+    신호도 전체 데이터에서 계산한 뒤 각 구간 안에서만 거래하므로 구간마다 워밍업 캔들을 잃지 않는다.
+    구간(fold)들은 프로세스 풀에서 병렬로 실행한다.
+    
+    Args:
+        df: 전처리된 캔들 데이터프레임 (지표 컬럼이 없으면 계산)
+        strategy_name: 전략 이름 (param_sweep.STRATEGIES 키)
+        train_size, test_size, step, anchored: make_folds 인자 (캔들 수)
+        grid: {파라미터: 값 목록} (기본값: DEFAULT_GRIDS[strategy_name])
+        initial_capital: 초기 자본금
+        max_workers: 워커 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 실행)
+    
+    Returns:
+        구간별 결과 데이터프레임 (fold 순서, datetime 컬럼이 있으면 구간 시작/끝 시각 포함)
+    """
+    if strategy_name not in STRATEGIES:
+        raise ValueError(f"지원하지 않는 전략입니다: {strategy_name}")
+    
+    df = ensure_indicators(df)
+    params_list = expand_grid(DEFAULT_GRIDS[strategy_name] if grid is None else grid)
+    folds = make_folds(len(df), train_size, test_size, step, anchored)
+    if not folds:
+        return pd.DataFrame()
+    
+    tasks = [(i, fold, strategy_name, params_list, initial_capital) for i, fold in enumerate(folds)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    shared = SharedFrame(df)
+    
+    try:
+        if max_workers == 1:
+            _init_worker(shared.spec)
+            try:
+                rows = [_run_fold(task) for task in tasks]
+            finally:
+                _worker_frame[0].close()
+        else:
+            with multiprocessing.Pool(max_workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+                rows = list(pool.imap_unordered(_run_fold, tasks))
+    finally:
+        shared.close()
+    
+    result = pd.DataFrame(rows).sort_values('fold').reset_index(drop=True)
+    if 'datetime' in df:
+        times = df['datetime'].to_numpy()
+        result['train_from'] = times[result['train_start']]
+        result['test_from'] = times[result['test_start']]
+        result['test_to'] = times[result['test_end'] - 1]
+    return result
+
+
+def summarize(result):
+    """검증 구간 수익률 요약 (구간 수익률을 이어서 복리로 누적)"""
+    if result.empty:
+        return {'folds': 0, 'oos_return': 0.0, 'mean_test_return': None, 'positive_folds': 0}
+    test_returns = result['test_return'].to_numpy() / 100
+    return {
+        'folds': len(result),
+        'oos_return': float((np.prod(1 + test_returns) - 1) * 100),
+        'mean_test_return': float(result['test_return'].mean()),
+        'positive_folds': int((test_returns > 0).sum()),
+    }